@@ -0,0 +1,63 @@
+"""
+Benchmark: per-request latency of CostTracker.log_request as the log grows.
+
+Compares the legacy JSON array log (rewritten on every request) with the
+append-only JSON Lines log. Run from the codebase directory:
+
+    python benchmarks/bench_cost_log.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cost_tracker import CostTracker
+
+HISTORY_SIZES = [0, 1_000, 10_000, 50_000]
+CALLS_PER_SIZE = 20
+
+
+def seed_log(tracker: CostTracker, size: int):
+    """Fill a tracker's log with ``size`` synthetic entries"""
+    entry = {
+        "timestamp": "2025-11-01T12:00:00",
+        "model": "gpt-3.5-turbo",
+        "input_tokens": 100,
+        "output_tokens": 50,
+        "cost": 0.000125,
+        "project": "benchmark",
+        "notes": None,
+    }
+    tracker.costs = [dict(entry) for _ in range(size)]
+    tracker._save_log()
+
+
+def time_log_request(suffix: str, size: int) -> float:
+    """Return mean seconds per log_request call with ``size`` entries logged"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_file = os.path.join(tmp_dir, f"cost_log{suffix}")
+        seed_log(CostTracker(log_file), size)
+
+        tracker = CostTracker(log_file)
+        start = time.perf_counter()
+        for _ in range(CALLS_PER_SIZE):
+            tracker.log_request("gpt-3.5-turbo", 100, 50, project="benchmark")
+        return (time.perf_counter() - start) / CALLS_PER_SIZE
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("COST LOG BENCHMARK (mean time per log_request)")
+    print("=" * 60)
+    print(f"{'History':>10} {'JSON (.json)':>18} {'JSONL (.jsonl)':>18}")
+
+    for size in HISTORY_SIZES:
+        json_time = time_log_request(".json", size)
+        jsonl_time = time_log_request(".jsonl", size)
+        print(
+            f"{size:>10,} {json_time * 1000:>15.3f} ms {jsonl_time * 1000:>15.3f} ms"
+        )
+
+    print("=" * 60)
@@ -0,0 +1,83 @@
+"""
+Benchmark: count_tokens against the original uncached implementation.
+
+Simulates enhanced_memory.py, which recounts every message in the
+conversation on every turn. Run from the codebase directory:
+
+    python benchmarks/bench_count_tokens.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.helpers import clear_token_cache, count_tokens, count_tokens_many
+
+TURNS = 100
+MODELS = ["gpt-3.5-turbo", "claude-3-haiku"]  # claude-3-haiku is unknown to tiktoken
+
+
+def count_tokens_uncached(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """The original count_tokens: resolves the encoder on every call"""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model(model)
+        return len(encoding.encode(text))
+    except ImportError:
+        return len(text) // 4
+    except Exception:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return len(encoding.encode(text))
+
+
+def make_messages(turns: int) -> list:
+    return [
+        f"Message {i}: tell me more about topic {i % 7}, with an example. " * (1 + i % 5)
+        for i in range(turns)
+    ]
+
+
+def run_conversation(count, messages: list, model: str) -> float:
+    """Recount the whole history on every turn, like enhanced_memory.py"""
+    start = time.perf_counter()
+    for turn in range(1, len(messages) + 1):
+        sum(count(m, model) for m in messages[:turn])
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    messages = make_messages(TURNS)
+
+    print("=" * 60)
+    print(f"TOKEN COUNTING BENCHMARK ({TURNS}-turn conversation)")
+    print("=" * 60)
+
+    for model in MODELS:
+        count_tokens_uncached("warm up", model)
+        clear_token_cache()
+
+        uncached = run_conversation(count_tokens_uncached, messages, model)
+        cached = run_conversation(count_tokens, messages, model)
+
+        print(f"\n{model}:")
+        print(f"  Original count_tokens: {uncached * 1000:9.1f} ms")
+        print(f"  Cached count_tokens:   {cached * 1000:9.1f} ms ({uncached / cached:.0f}x)")
+
+    clear_token_cache()
+    start = time.perf_counter()
+    count_tokens_many(messages)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for message in messages:
+        count_tokens_uncached(message)
+    single = time.perf_counter() - start
+
+    print(f"\nCold count of {TURNS} messages:")
+    print(f"  One by one (original): {single * 1000:9.1f} ms")
+    print(f"  count_tokens_many:     {batch * 1000:9.1f} ms")
+    print("=" * 60)
@@ -0,0 +1,118 @@
+"""
+Benchmark: memory per session, dict-based history vs. compact History.
+
+Builds many sessions the way a server does (messages parsed from JSON, so
+every session has its own copy of the role strings and system prompt) and
+measures the memory each representation holds, plus the cost of preparing
+one request. Run from the codebase directory:
+
+    python benchmarks/bench_history_memory.py
+    python benchmarks/bench_history_memory.py --sessions 10000 --turns 40
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.compact_history import History
+from utils.conversation import Conversation
+from utils.mock_server import generate_text
+
+SYSTEM_PROMPT = (
+    "You are a helpful and knowledgeable assistant for an online store. Answer "
+    "questions about orders, shipping, returns and products. Be friendly and "
+    "concise, ask for the order number when you need it, and never make up "
+    "policies you were not told about. "
+) * 3
+
+
+def make_turns(turns: int, reply_words: int) -> list:
+    """One session's messages as JSON text, like a request body or session log"""
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Question {i}: where is my order #{1000 + i}?"})
+        reply = "".join(generate_text(str(i).encode(), None, reply_words))
+        messages.append({"role": "assistant", "content": reply})
+    return json.dumps([{"role": "system", "content": SYSTEM_PROMPT}] + messages)
+
+
+def build_dicts(data: str):
+    return json.loads(data)
+
+
+def build_conversation(data: str):
+    conversation = Conversation()
+    for message in json.loads(data):
+        conversation.append(message, tokens=len(message["content"]) // 4)
+    return conversation
+
+
+def build_history(data: str):
+    history = History()
+    for message in json.loads(data):
+        history.append(message, tokens=len(message["content"]) // 4)
+    return history
+
+
+def build_history_compressed(data: str):
+    history = build_history(data)
+    history.compress_cold(keep_recent=6)
+    return history
+
+
+def measure(build, data_per_session: list) -> tuple:
+    """Bytes held per session and time to serialize one request"""
+    gc.collect()
+    tracemalloc.start()
+    sessions = [build(data) for data in data_per_session]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    history = sessions[0]
+    messages = history if isinstance(history, list) else history.messages
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(100):
+            json.dumps([dict(m) for m in messages])
+        timings.append((time.perf_counter() - start) / 100)
+    request_ms = min(timings) * 1000
+
+    del sessions
+    return current / len(data_per_session), request_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare history memory footprints")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=20, help="User/assistant pairs per session")
+    parser.add_argument("--reply-words", type=int, default=60)
+    args = parser.parse_args()
+
+    data = make_turns(args.turns, args.reply_words)
+    data_per_session = [data] * args.sessions
+
+    print("=" * 72)
+    print(f"HISTORY MEMORY BENCHMARK ({args.sessions:,} sessions x "
+          f"{2 * args.turns + 1} messages)")
+    print("=" * 72)
+    print(f"{'representation':<32}{'bytes/session':>15}{'total MB':>11}{'request ms':>13}")
+
+    baseline = None
+    for name, build in [
+        ("list of dicts", build_dicts),
+        ("Conversation (dicts + ledger)", build_conversation),
+        ("History", build_history),
+        ("History, cold turns zlib", build_history_compressed),
+    ]:
+        per_session, request_ms = measure(build, data_per_session)
+        baseline = baseline or per_session
+        print(f"{name:<32}{per_session:>15,.0f}{per_session * args.sessions / 1e6:>11.1f}"
+              f"{request_ms:>13.3f}   ({per_session / baseline:.0%})")
+    print("=" * 72)
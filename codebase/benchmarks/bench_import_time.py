@@ -0,0 +1,103 @@
+"""
+Benchmark: import time of the utils package, checked against a budget.
+
+Runs each import in a fresh interpreter with ``python -X importtime`` and
+fails (exit code 1) if the median cost goes over budget or a heavy
+dependency is imported eagerly again. tests/test_import_time.py asserts the
+same budgets under pytest; this script prints the numbers. Run from the
+codebase directory:
+
+    python benchmarks/bench_import_time.py
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+CODEBASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 7
+
+# Import statement -> budget in milliseconds (generous; typical is far lower)
+BUDGETS = {
+    "import utils": 10,
+    "from utils import count_tokens": 40,
+    "from utils import Config": 60,
+    "from utils import CostTracker": 80,
+    "from utils import Conversation": 50,
+}
+
+# Modules that must not be loaded by ``import utils``
+HEAVY = ("openai", "anthropic", "langchain", "numpy", "tiktoken", "asyncio", "sqlite3", "dotenv")
+
+
+def measure(statement: str):
+    """Return (milliseconds, imported module names) for one fresh import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=CODEBASE,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    modules = set()
+    after_site = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip() == "cumulative":
+            continue  # Header line
+        name = name.rstrip()[1:]  # Drop the space after "|"; the rest is nesting
+        top_level = not name.startswith(" ")
+        name = name.strip()
+
+        # Everything up to and including "site" is interpreter startup
+        if not after_site:
+            after_site = top_level and name == "site"
+            continue
+        modules.add(name)
+        if top_level:
+            total_us += int(cumulative)
+
+    return total_us / 1000, modules
+
+
+def median_ms(statement: str, runs: int = RUNS) -> float:
+    """Median import time of ``statement`` over ``runs`` fresh interpreters"""
+    return statistics.median(measure(statement)[0] for _ in range(runs))
+
+
+def heavy_modules(statement: str = "import utils") -> list:
+    """HEAVY modules loaded by ``statement``"""
+    _, modules = measure(statement)
+    return sorted({m.split(".")[0] for m in modules} & set(HEAVY))
+
+
+if __name__ == "__main__":
+    failures = []
+
+    print("=" * 60)
+    print(f"IMPORT TIME (median of {RUNS} fresh interpreters)")
+    print("=" * 60)
+
+    for statement, budget in BUDGETS.items():
+        median = median_ms(statement)
+
+        status = "ok" if median <= budget else "OVER BUDGET"
+        print(f"  {statement:<34} {median:7.1f} ms  (budget {budget} ms) {status}")
+        if median > budget:
+            failures.append(f"{statement}: {median:.1f} ms > {budget} ms")
+
+    heavy = heavy_modules()
+    if heavy:
+        failures.append(f"import utils loaded heavy modules: {', '.join(heavy)}")
+
+    print("=" * 60)
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("All imports within budget")
@@ -0,0 +1,275 @@
+"""
+Benchmark: project code paths against the offline mock server.
+
+Starts utils.mock_server in-process and drives the same API call patterns
+as the chatbot, memory chatbot, function-calling, RAG and multi-agent
+projects, reporting throughput, p50/p99 latency and peak Python memory per
+scenario. No API key or network needed. Run from the codebase directory:
+
+    python benchmarks/bench_mock_api.py
+    python benchmarks/bench_mock_api.py --save baseline.json
+    python benchmarks/bench_mock_api.py --compare baseline.json  # exit 1 on regression
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+CODEBASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(CODEBASE)
+sys.path.append(os.path.join(CODEBASE, "project-1-basic-chatbot"))
+from utils.config import Config
+from utils.conversation import TOKENS_PER_MESSAGE, Conversation, message_tokens
+from utils.helpers import get_encoding, percentile
+from utils.mock_server import MockServer
+from utils.streaming import stream_chat
+from personas import build_request
+
+MODEL = "gpt-3.5-turbo"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+WEATHER_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "get_weather",
+        "description": "Get current weather for a city",
+        "parameters": {
+            "type": "object",
+            "properties": {"location": {"type": "string", "description": "City name"}},
+            "required": ["location"],
+        },
+    },
+}
+
+DOCUMENTS = [
+    "Our company offers 20 days of paid vacation per year.",
+    "The remote work policy allows employees to work from home up to 3 days per week.",
+    "Health insurance is provided to all full-time employees.",
+]
+
+
+def chatbot(client, i: int):
+    """project-1: one persona request"""
+    client.chat.completions.create(**build_request("assistant", f"Question {i}: what is AI?"))
+
+
+def chatbot_stream(client, i: int):
+    """project-1/2 with STREAM_RESPONSES: consume a streamed reply"""
+    stream = stream_chat(client, [{"role": "user", "content": f"Tell me a story {i}"}], model=MODEL)
+    for _ in stream:
+        pass
+    return stream.time_to_first_token
+
+
+def estimate_message_tokens(message: dict) -> int:
+    """Offline stand-in for message_tokens (1 token ≈ 4 characters)"""
+    return TOKENS_PER_MESSAGE + len(message.get("content") or "") // 4
+
+
+def message_counter():
+    """message_tokens, or the estimate if the tokenizer can't be loaded (offline)"""
+    try:
+        get_encoding(MODEL)
+    except Exception as e:
+        print(f"Tokenizer unavailable ({type(e).__name__}); memory_chatbot estimates tokens")
+        return estimate_message_tokens
+    return message_tokens
+
+
+def memory_chatbot(client, i: int, turns: int = 5, count=message_tokens):
+    """project-2 enhanced_memory: several turns with token-budget truncation"""
+    conversation = Conversation()
+    system = {"role": "system", "content": "You are helpful."}
+    conversation.append(system, count(system))
+    for turn in range(turns):
+        message = {"role": "user", "content": f"Session {i}, message {turn}"}
+        conversation.append(message, count(message))
+        conversation.truncate_to_tokens(Config.prompt_token_budget())
+        response = client.chat.completions.create(model=MODEL, messages=conversation.messages)
+        reply = {"role": "assistant", "content": response.choices[0].message.content}
+        conversation.append(reply, count(reply))
+
+
+def function_calling(client, i: int):
+    """project-3: tool call round trip"""
+    messages = [{"role": "user", "content": f"What's the weather in Delhi? ({i})"}]
+    response = client.chat.completions.create(model=MODEL, messages=messages, tools=[WEATHER_TOOL])
+    message = response.choices[0].message
+    messages.append(message)
+    for tool_call in message.tool_calls or []:
+        arguments = json.loads(tool_call.function.arguments)
+        messages.append(
+            {
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": f"Sunny, 28°C in {arguments['location']}",
+            }
+        )
+    client.chat.completions.create(model=MODEL, messages=messages)
+
+
+class RAG:
+    """project-4: embed the query, retrieve by cosine similarity, answer"""
+
+    def __init__(self, client):
+        response = client.embeddings.create(model=EMBEDDING_MODEL, input=DOCUMENTS)
+        self.vectors = np.array([d.embedding for d in response.data])
+
+    def __call__(self, client, i: int):
+        question = f"How many vacation days do I get? ({i})"
+        response = client.embeddings.create(model=EMBEDDING_MODEL, input=question)
+        scores = self.vectors @ np.array(response.data[0].embedding)
+        context = "\n\n".join(DOCUMENTS[j] for j in np.argsort(scores)[::-1][:2])
+        client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"}],
+        )
+
+
+def multi_agent(client, i: int):
+    """project-5: researcher then writer"""
+    research = client.chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": f"Research topic {i}: AI in healthcare"}],
+    )
+    client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "user", "content": "Write a blog post.\n\nContext:\n"
+             + research.choices[0].message.content}
+        ],
+    )
+
+
+def run_scenario(name, func, client, server, iterations: int, concurrency: int) -> dict:
+    """Time ``iterations`` calls of ``func`` on ``concurrency`` threads"""
+
+    def timed(i):
+        start = time.perf_counter()
+        extra = func(client, i)
+        return time.perf_counter() - start, extra
+
+    requests_before = sum(server.state.requests.values())
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - start
+    requests = sum(server.state.requests.values()) - requests_before
+
+    # Separate, shorter pass for memory so tracing doesn't skew the timings
+    tracemalloc.start()
+    for i in range(min(iterations, 20)):
+        func(client, i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = sorted(latency for latency, _ in results)
+    result = {
+        "ops_per_second": iterations / elapsed,
+        "api_requests": requests,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_memory_kb": peak / 1024,
+    }
+    ttfts = sorted(extra for _, extra in results if isinstance(extra, float))
+    if ttfts:
+        result["ttft_p50_ms"] = percentile(ttfts, 50) * 1000
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """List regressions beyond ``tolerance`` (a fraction) against a baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["ops_per_second"] < previous["ops_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['ops_per_second']:.1f}/s "
+                f"vs {previous['ops_per_second']:.1f}/s"
+            )
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p99 {current['p99_ms']:.1f} ms vs {previous['p99_ms']:.1f} ms"
+            )
+        if current["peak_memory_kb"] > previous["peak_memory_kb"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: memory {current['peak_memory_kb']:.0f} KB "
+                f"vs {previous['peak_memory_kb']:.0f} KB"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark project code paths on the mock server")
+    parser.add_argument("--iterations", type=int, default=200, help="Operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Threads per scenario")
+    parser.add_argument("--latency", default="lognormal:0.02,0.3", help="Server latency spec")
+    parser.add_argument("--token-latency", default="fixed:0.0005", help="Delay per stream chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of failed requests")
+    parser.add_argument("--scenarios", default="", help="Comma-separated subset to run")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    server = MockServer(
+        latency=args.latency,
+        token_latency=args.token_latency,
+        error_rate=args.error_rate,
+        seed=0,
+    ).start()
+    client = Config.get_openai_client(api_key="mock", base_url=server.base_url)
+
+    scenarios = {
+        "chatbot": chatbot,
+        "chatbot_stream": chatbot_stream,
+        "memory_chatbot": partial(memory_chatbot, count=message_counter()),
+        "function_calling": function_calling,
+        "rag": RAG(client),
+        "multi_agent": multi_agent,
+    }
+    if args.scenarios:
+        selected = args.scenarios.split(",")
+        scenarios = {name: scenarios[name] for name in selected}
+
+    print("=" * 78)
+    print(f"MOCK API BENCHMARK ({args.iterations} ops x {len(scenarios)} scenarios, "
+          f"{args.concurrency} threads, latency {args.latency})")
+    print("=" * 78)
+    print(f"{'scenario':<18}{'ops/s':>9}{'requests':>10}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'TTFT ms':>9}{'peak KB':>10}")
+
+    results = {}
+    for name, func in scenarios.items():
+        result = run_scenario(name, func, client, server, args.iterations, args.concurrency)
+        results[name] = result
+        ttft = f"{result['ttft_p50_ms']:9.1f}" if "ttft_p50_ms" in result else f"{'-':>9}"
+        print(f"{name:<18}{result['ops_per_second']:9.1f}{result['api_requests']:10}"
+              f"{result['p50_ms']:9.1f}{result['p99_ms']:9.1f}{ttft}"
+              f"{result['peak_memory_kb']:10.0f}")
+
+    server.stop()
+    print("=" * 78)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            for regression in regressions:
+                print(f"REGRESSION: {regression}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
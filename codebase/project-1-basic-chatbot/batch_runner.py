@@ -0,0 +1,327 @@
+"""
+Project 1: Batch Runner
+Send a file of prompts through one or more personas concurrently.
+
+Input is JSONL, one prompt per line:
+
+    {"id": "q1", "prompt": "What is a black hole?"}
+    {"id": "q2", "prompt": "Explain recursion", "persona": "tech_expert"}
+
+Lines without a "persona" are sent to every persona given with --personas.
+Results are written to the output JSONL as they complete (in completion
+order, so match them up by "id" and "persona").
+
+Usage:
+    python batch_runner.py prompts.jsonl -o results.jsonl --personas pirate,child
+    python batch_runner.py prompts.jsonl --workers 32 --model-limit gpt-4=4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.config import Config
+from utils.helpers import (
+    count_tokens,
+    percentile,
+    print_colored,
+    retry_with_exponential_backoff,
+)
+from utils.cost_tracker import track_cost
+from utils.rate_limiter import get_rate_limiter
+from personas import PERSONAS, build_request, get_persona
+
+# Jobs queued ahead of the workers (bounds memory for very large inputs)
+QUEUE_FACTOR = 2
+
+
+def read_jobs(path: str, personas: List[str]) -> Iterator[dict]:
+    """
+    Stream jobs from a prompts JSONL file.
+
+    Args:
+        path: Input file
+        personas: Personas for lines that don't name one
+
+    Yields:
+        Jobs with "id", "persona" and "prompt"
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            names = [record["persona"]] if "persona" in record else personas
+            for name in names:
+                get_persona(name)  # Fail fast on unknown personas
+                yield {
+                    "id": record.get("id", line_number),
+                    "persona": name,
+                    "prompt": record["prompt"],
+                }
+
+
+class BatchRunner:
+    """Run persona requests on a bounded thread pool"""
+
+    def __init__(
+        self,
+        client,
+        workers: int = 16,
+        model_limits: Optional[dict] = None,
+        track_costs: bool = True,
+        max_retries: int = 3,
+    ):
+        """
+        Initialize batch runner.
+
+        Args:
+            client: OpenAI client (shared by all workers)
+            workers: Maximum requests in flight overall
+            model_limits: Maximum requests in flight per model, e.g.
+                ``{"gpt-4": 4}`` (models not listed are limited by workers)
+            track_costs: Log each request with the shared cost tracker
+            max_retries: Attempts per request before recording an error
+        """
+        self.workers = workers
+        self.model_limits = model_limits or {}
+        self.track_costs = track_costs
+
+        limiter = get_rate_limiter()
+        estimate_tokens = None
+        if limiter.tokens is not None:
+            # Only tokenize prompts when there is a tokens-per-minute quota
+            def estimate_tokens(**request):
+                prompt = sum(
+                    count_tokens(m["content"], request["model"]) for m in request["messages"]
+                )
+                return prompt + Config.MAX_TOKENS
+
+        self._create = retry_with_exponential_backoff(
+            client.chat.completions.create,
+            max_retries=max_retries,
+            limiter=limiter,
+            estimate_tokens=estimate_tokens,
+        )
+
+    def run_one(self, job: dict) -> dict:
+        """
+        Send one job and build its result record.
+
+        Args:
+            job: Job from read_jobs
+
+        Returns:
+            Result with the response or an "error"
+        """
+        request = build_request(job["persona"], job["prompt"])
+        result = {**job, "model": request["model"]}
+
+        start = time.perf_counter()
+        try:
+            response = self._create(**request)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            result["latency"] = time.perf_counter() - start
+            return result
+        result["latency"] = time.perf_counter() - start
+
+        result["response"] = response.choices[0].message.content
+        if response.usage is not None:
+            result["input_tokens"] = response.usage.prompt_tokens
+            result["output_tokens"] = response.usage.completion_tokens
+            if self.track_costs:
+                result["cost"] = track_cost(
+                    request["model"],
+                    result["input_tokens"],
+                    result["output_tokens"],
+                    project="project-1-batch",
+                )
+        return result
+
+    def run(self, jobs: Iterator[dict], output_file: str, progress: bool = True) -> List[dict]:
+        """
+        Run all jobs, appending each result to ``output_file`` as it arrives.
+
+        Only ``workers * QUEUE_FACTOR`` jobs are queued at a time, so input
+        files of any size stream through with bounded memory. Jobs for a
+        model at its limit wait here rather than in a worker thread, so they
+        never hold up requests to other models.
+
+        Args:
+            jobs: Jobs to run
+            output_file: Results JSONL (appended to)
+            progress: Print a progress line as results arrive
+
+        Returns:
+            Per-request metrics (persona, model, latency, tokens, error)
+        """
+        metrics = []
+        pending = {}  # future -> model
+        in_flight = Counter()
+        waiting = defaultdict(deque)  # model -> jobs over its limit
+        waiting_count = 0
+        window = self.workers * QUEUE_FACTOR
+
+        with open(output_file, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+            max_workers=self.workers
+        ) as pool:
+
+            def submit(job, model):
+                pending[pool.submit(self.run_one, job)] = model
+                in_flight[model] += 1
+
+            def collect():
+                nonlocal waiting_count
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    model = pending.pop(future)
+                    in_flight[model] -= 1
+                    if waiting[model]:
+                        submit(waiting[model].popleft(), model)
+                        waiting_count -= 1
+
+                    result = future.result()
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+                    metrics.append(
+                        {k: v for k, v in result.items() if k not in ("prompt", "response")}
+                    )
+                    if progress:
+                        print(f"\rCompleted {len(metrics)}", end="", flush=True)
+
+            for job in jobs:
+                while len(pending) + waiting_count >= window:
+                    collect()
+
+                model = get_persona(job["persona"])["model"]
+                if in_flight[model] < self.model_limits.get(model, self.workers):
+                    submit(job, model)
+                else:
+                    waiting[model].append(job)
+                    waiting_count += 1
+
+            while pending:
+                collect()
+
+        if progress:
+            print()
+        return metrics
+
+
+def summarize(metrics: List[dict], elapsed: float) -> dict:
+    """
+    Compute throughput and latency percentiles.
+
+    Args:
+        metrics: Per-request metrics from BatchRunner.run
+        elapsed: Wall-clock seconds for the batch
+
+    Returns:
+        Summary overall and per persona
+    """
+
+    def describe(rows):
+        latencies = sorted(r["latency"] for r in rows if "error" not in r)
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for r in rows if "error" in r),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        }
+
+    output_tokens = sum(r.get("output_tokens", 0) for r in metrics)
+    summary = describe(metrics)
+    summary.update(
+        {
+            "elapsed": elapsed,
+            "requests_per_second": len(metrics) / elapsed if elapsed else 0.0,
+            "output_tokens_per_second": output_tokens / elapsed if elapsed else 0.0,
+            "cost": sum(r.get("cost", 0.0) for r in metrics),
+            "by_persona": {
+                name: describe([r for r in metrics if r["persona"] == name])
+                for name in sorted({r["persona"] for r in metrics})
+            },
+        }
+    )
+    return summary
+
+
+def print_summary(summary: dict):
+    """Print a batch summary"""
+    print_colored("\n" + "=" * 70, "cyan")
+    print_colored("BATCH SUMMARY", "green")
+    print_colored("=" * 70, "cyan")
+    print(f"Requests: {summary['requests']:,} ({summary['errors']:,} errors)")
+    print(f"Elapsed: {summary['elapsed']:.1f}s")
+    print(f"Throughput: {summary['requests_per_second']:.1f} requests/s, "
+          f"{summary['output_tokens_per_second']:,.0f} output tokens/s")
+    print(f"Latency: p50 {summary['p50']:.2f}s | p95 {summary['p95']:.2f}s | "
+          f"p99 {summary['p99']:.2f}s")
+    if summary["cost"]:
+        print(f"Cost: ${summary['cost']:.4f}")
+
+    print("\nBy persona:")
+    for name, stats in summary["by_persona"].items():
+        print(f"  {name:12} {stats['requests']:6,} requests, {stats['errors']:,} errors | "
+              f"p50 {stats['p50']:.2f}s p95 {stats['p95']:.2f}s p99 {stats['p99']:.2f}s")
+    print_colored("=" * 70, "cyan")
+
+
+def parse_model_limits(values: List[str]) -> dict:
+    """Parse repeated MODEL=N options"""
+    limits = {}
+    for value in values:
+        model, _, limit = value.partition("=")
+        if not limit.isdigit() or int(limit) < 1:
+            raise argparse.ArgumentTypeError(f"Expected MODEL=N, got '{value}'")
+        limits[model] = int(limit)
+    return limits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts through personas")
+    parser.add_argument("prompts", help="Input JSONL with a 'prompt' per line")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="Results JSONL")
+    parser.add_argument(
+        "--personas",
+        default="assistant",
+        help=f"Comma-separated personas for lines without one ({', '.join(PERSONAS)})",
+    )
+    parser.add_argument("--workers", type=int, default=16, help="Requests in flight overall")
+    parser.add_argument(
+        "--model-limit",
+        action="append",
+        default=[],
+        metavar="MODEL=N",
+        help="Requests in flight for one model (repeatable)",
+    )
+    parser.add_argument("--max-retries", type=int, default=3, help="Attempts per request")
+    args = parser.parse_args()
+
+    personas = [name.strip() for name in args.personas.split(",") if name.strip()]
+    for name in personas:
+        get_persona(name)
+
+    runner = BatchRunner(
+        Config.get_openai_client(),
+        workers=args.workers,
+        model_limits=parse_model_limits(args.model_limit),
+        track_costs=Config.TRACK_COSTS,
+        max_retries=args.max_retries,
+    )
+
+    print_colored(f"Running {args.prompts} through {', '.join(personas)} "
+                  f"with {args.workers} workers...", "yellow")
+    start = time.perf_counter()
+    metrics = runner.run(read_jobs(args.prompts, personas), args.output)
+    print_summary(summarize(metrics, time.perf_counter() - start))
+    print(f"Results written to {args.output}")
@@ -0,0 +1,93 @@
+"""
+Project 1: Persona Registry
+The chatbot personalities from chatbot.py and variations/, in one place.
+
+Each persona is a system prompt plus the model settings that suit it.
+The variation scripts and batch_runner.py both read from here.
+"""
+
+PERSONAS = {
+    "assistant": {
+        "label": "AI",
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.7,
+        "system_prompt": "You are a helpful assistant",
+    },
+    "pirate": {
+        "label": "🏴‍☠️ Captain AI",
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.9,  # Higher for more creative/fun responses
+        "system_prompt": "You are a pirate captain. Always talk like a pirate! "
+        "Use pirate slang like 'arrr', 'matey', 'shiver me timbers', etc. "
+        "Be enthusiastic and colorful in your language!",
+    },
+    "child": {
+        "label": "👶 Kid AI",
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.8,
+        "system_prompt": "You are a 5-year-old child. Use very simple words that a "
+        "kindergartener would understand. Be excited and use your imagination! "
+        "Compare things to toys, games, and things kids love.",
+    },
+    "hindi": {
+        "label": "🇮🇳 AI",
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.7,
+        "system_prompt": "You are a helpful assistant. Always respond in Hindi. "
+        "Use clear, simple Hindi that anyone can understand. "
+        "Be polite and respectful.",
+    },
+    "tech_expert": {
+        "label": "💻 Tech Expert",
+        "model": "gpt-4",  # Using GPT-4 for better technical accuracy
+        "temperature": 0.3,  # Lower temperature for more accurate, focused responses
+        "system_prompt": "You are a senior software engineer and technical expert. "
+        "Provide detailed, accurate technical explanations. Include code examples "
+        "when relevant. Use proper terminology and best practices. "
+        "Format code in markdown with proper syntax highlighting.",
+    },
+}
+
+
+def get_persona(name: str) -> dict:
+    """
+    Look up a persona by name.
+
+    Args:
+        name: Persona name (see PERSONAS)
+
+    Returns:
+        Persona settings
+    """
+    try:
+        return PERSONAS[name]
+    except KeyError:
+        raise ValueError(f"Unknown persona '{name}'. Choose from: {', '.join(PERSONAS)}")
+
+
+def build_request(name: str, user_message: str) -> dict:
+    """
+    Build chat.completions.create arguments for a persona.
+
+    Args:
+        name: Persona name
+        user_message: The user's message
+
+    Returns:
+        Keyword arguments for client.chat.completions.create
+    """
+    persona = get_persona(name)
+    return {
+        "model": persona["model"],
+        "temperature": persona["temperature"],
+        "messages": [
+            {"role": "system", "content": persona["system_prompt"]},
+            {"role": "user", "content": user_message},
+        ],
+    }
+
+
+# Example usage
+if __name__ == "__main__":
+    for name, persona in PERSONAS.items():
+        print(f"{name:12} {persona['model']:14} temperature={persona['temperature']}")
@@ -3,12 +3,13 @@ Variation: 5-Year-Old Bot
 A chatbot that explains things like a 5-year-old child!
 """
 
-from openai import OpenAI
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
+from personas import build_request
 
 client = Config.get_openai_client()
 
@@ -18,18 +19,7 @@ print("=" * 60 + " 👶\n")
 
 user_message = input("You: ")
 
-response = client.chat.completions.create(
-    model="gpt-3.5-turbo",
-    temperature=0.8,
-    messages=[
-        {
-            "role": "system",
-            "content": "You are a 5-year-old child. Use very simple words that a "
-            "kindergartener would understand. Be excited and use your imagination! "
-            "Compare things to toys, games, and things kids love.",
-        },
-        {"role": "user", "content": user_message},
-    ],
-)
+# Model, temperature and system prompt come from the registry in personas.py
+response = client.chat.completions.create(**build_request("child", user_message))
 
 print("\n👶 Kid AI:", response.choices[0].message.content)
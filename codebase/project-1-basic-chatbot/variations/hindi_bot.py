@@ -3,12 +3,13 @@ Variation: Hindi Bot
 A chatbot that responds in Hindi!
 """
 
-from openai import OpenAI
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
+from personas import build_request
 
 client = Config.get_openai_client()
 
@@ -18,19 +19,8 @@ print("=" * 60 + " 🇮🇳\n")
 
 user_message = input("आप: ")
 
-response = client.chat.completions.create(
-    model="gpt-3.5-turbo",
-    temperature=0.7,
-    messages=[
-        {
-            "role": "system",
-            "content": "You are a helpful assistant. Always respond in Hindi. "
-            "Use clear, simple Hindi that anyone can understand. "
-            "Be polite and respectful.",
-        },
-        {"role": "user", "content": user_message},
-    ],
-)
+# Model, temperature and system prompt come from the registry in personas.py
+response = client.chat.completions.create(**build_request("hindi", user_message))
 
 print("\n🇮🇳 AI:", response.choices[0].message.content)
 print("\n💡 Note: Hindi uses more tokens, so it costs ~3x more than English!")
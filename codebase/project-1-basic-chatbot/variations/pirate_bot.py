@@ -3,12 +3,13 @@ Variation: Pirate Bot
 A chatbot that talks like a pirate captain!
 """
 
-from openai import OpenAI
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
+from personas import build_request
 
 client = Config.get_openai_client()
 
@@ -18,18 +19,7 @@ print("=" * 60 + " 🏴‍☠️\n")
 
 user_message = input("You: ")
 
-response = client.chat.completions.create(
-    model="gpt-3.5-turbo",
-    temperature=0.9,  # Higher for more creative/fun responses
-    messages=[
-        {
-            "role": "system",
-            "content": "You are a pirate captain. Always talk like a pirate! "
-            "Use pirate slang like 'arrr', 'matey', 'shiver me timbers', etc. "
-            "Be enthusiastic and colorful in your language!",
-        },
-        {"role": "user", "content": user_message},
-    ],
-)
+# Model, temperature and system prompt come from the registry in personas.py
+response = client.chat.completions.create(**build_request("pirate", user_message))
 
 print("\n🏴‍☠️ Captain AI:", response.choices[0].message.content)
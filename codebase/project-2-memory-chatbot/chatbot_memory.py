@@ -5,12 +5,13 @@ A chatbot that remembers your conversation!
 This is how ChatGPT, Claude, and all modern chatbots work.
 """
 
-from openai import OpenAI
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
+from utils.helpers import streaming_print
+from utils.streaming import stream_chat
 
 # Initialize OpenAI client
 client = Config.get_openai_client()
@@ -44,14 +45,19 @@ while True:
     messages.append({"role": "user", "content": user_input})
 
     try:
-        # Get response (with full history!)
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo", messages=messages  # Full conversation sent
-        )
+        if Config.STREAM_RESPONSES:
+            # Print the response as it arrives (with full history!)
+            ai_message = streaming_print(stream_chat(client, messages, model="gpt-3.5-turbo"))
+            print()
+        else:
+            # Get response (with full history!)
+            response = client.chat.completions.create(
+                model="gpt-3.5-turbo", messages=messages  # Full conversation sent
+            )
 
-        # Extract AI response
-        ai_message = response.choices[0].message.content
-        print(f"AI: {ai_message}\n")
+            # Extract AI response
+            ai_message = response.choices[0].message.content
+            print(f"AI: {ai_message}\n")
 
         # Add AI response to history (important!)
         messages.append({"role": "assistant", "content": ai_message})
@@ -1,9 +1,13 @@
 """
 Project 2: Enhanced Memory Chatbot
 Advanced version with context management, token tracking, and colored output.
+
+Every turn is appended to a session log as it happens. Continue a session:
+    python enhanced_memory.py --resume 20240101_120000
 """
 
-from openai import OpenAI
+import argparse
+import atexit
 import sys
 import os
 import json
@@ -11,42 +15,101 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
-from utils.helpers import truncate_messages, count_tokens, print_colored
+from utils.helpers import count_tokens, print_colored, streaming_print
+from utils.conversation import Conversation
 from utils.cost_tracker import CostTracker
+from utils.budget_guard import BudgetGuard
+from utils.compaction import ConversationCompactor
+from utils.session_log import SessionLog
+from utils.streaming import stream_chat
+
+parser = argparse.ArgumentParser(description="Enhanced memory chatbot")
+parser.add_argument("--resume", metavar="SESSION", help="Continue a logged session")
+parser.add_argument("--session-dir", default=Config.SESSION_DIR, help="Session log directory")
+parser.add_argument(
+    "--compress",
+    action="store_true",
+    default=Config.SESSION_COMPRESS,
+    help="Gzip new session logs",
+)
+args = parser.parse_args()
 
 # Initialize
 client = Config.get_openai_client()
-tracker = CostTracker()
+budget = BudgetGuard(action=Config.COST_ALERT_ACTION)
+tracker = CostTracker(lazy=True, budget_guard=budget)
 
 print_colored("=" * 70, "cyan")
 print_colored("ENHANCED MEMORY CHATBOT - Project 2", "green")
 print_colored("=" * 70, "cyan")
 print("Features: Context management, token tracking, conversation saving")
-print("Commands: 'quit' to exit, 'save' to save conversation, 'stats' for info\n")
-
-# Message history
-messages = [
-    {
-        "role": "system",
-        "content": "You are a helpful and knowledgeable assistant. "
-        "Be friendly and concise in your responses.",
-    }
-]
+print("Commands: 'quit' to exit, 'save' to export conversation, 'stats' for info\n")
 
-# Track conversation metadata
-conversation_start = datetime.now()
-total_cost = 0.0
+if args.resume:
+    # Rebuild history, cost and token counts by replaying the session log
+    conversation = Conversation()
+    try:
+        totals = SessionLog.restore(args.resume, conversation, args.session_dir)
+    except FileNotFoundError as e:
+        print_colored(f"✗ {e}", "red")
+        sys.exit(1)
+    conversation_start = datetime.fromisoformat(totals["started"])
+    total_cost = totals["cost"]
+    session = SessionLog(args.resume, args.session_dir)
+
+    # The budget may have shrunk since the session was saved. Log the
+    # truncation like any other so later compact records (which use message
+    # indices) replay against the same history.
+    if conversation.truncate_to_tokens(Config.prompt_token_budget()):
+        session.truncate(Config.prompt_token_budget())
+    print_colored(
+        f"Resumed session {args.resume}: {len(conversation)} messages, "
+        f"{totals['requests']} requests, ${total_cost:.4f}\n",
+        "yellow",
+    )
+else:
+    # Message history (token counts are tracked as messages are added)
+    conversation = Conversation(
+        [
+            {
+                "role": "system",
+                "content": "You are a helpful and knowledgeable assistant. "
+                "Be friendly and concise in your responses.",
+            }
+        ]
+    )
+
+    # Track conversation metadata
+    conversation_start = datetime.now()
+    total_cost = 0.0
+
+    session = SessionLog(directory=args.session_dir, compress=args.compress)
+    session.message(conversation[0], conversation.token_counts[0])
+
+# Flush the log however the program exits
+atexit.register(session.close)
+
+# Older turns are summarized in the background once the history gets long,
+# so the prompt stays roughly the same size instead of growing every turn
+compactor = None
+if Config.MEMORY_COMPACT_TOKENS:
+    compactor = ConversationCompactor(
+        client,
+        conversation,
+        threshold=Config.MEMORY_COMPACT_TOKENS,
+        keep_recent=Config.MEMORY_KEEP_RECENT,
+    )
 
 
 def save_conversation(filename=None):
-    """Save conversation to JSON file"""
+    """Export conversation to a JSON file"""
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"conversation_{timestamp}.json"
 
     data = {
         "timestamp": conversation_start.isoformat(),
-        "messages": messages,
+        "messages": conversation.messages,
         "total_cost": total_cost,
     }
 
@@ -58,13 +121,13 @@ def save_conversation(filename=None):
 
 def show_stats():
     """Display conversation statistics"""
-    total_tokens = sum(count_tokens(m["content"]) for m in messages)
+    total_tokens = conversation.total_tokens
     duration = (datetime.now() - conversation_start).total_seconds()
 
     print_colored("\n" + "=" * 70, "cyan")
     print_colored("CONVERSATION STATISTICS", "green")
     print_colored("=" * 70, "cyan")
-    print(f"Messages: {len(messages)} (System: 1, User/AI: {len(messages)-1})")
+    print(f"Messages: {len(conversation)} (System: 1, User/AI: {len(conversation)-1})")
     print(f"Total Tokens: ~{total_tokens:,}")
     print(f"Total Cost: ${total_cost:.4f}")
     print(f"Duration: {int(duration)} seconds")
@@ -81,11 +144,11 @@ while True:
         if user_input.lower() in ["quit", "exit", "bye"]:
             print_colored("\nAI: Goodbye! It was nice chatting with you!", "green")
             show_stats()
-
-            # Ask to save
-            save_choice = input("\nSave this conversation? (y/n): ")
-            if save_choice.lower() == "y":
-                save_conversation()
+            print_colored(
+                f"\nSession saved. Continue it with: "
+                f"python enhanced_memory.py --resume {session.session_id}",
+                "cyan",
+            )
             break
 
         if user_input.lower() == "save":
@@ -100,25 +163,74 @@ while True:
         if not user_input.strip():
             continue
 
+        # Swap in a finished background summary before building the prompt
+        try:
+            compacted = compactor.apply() if compactor else None
+        except Exception as e:
+            compacted = None
+            print_colored(f"[Summarizing older messages failed: {e}]", "red")
+        if compacted:
+            # The summary call is paid for even if it arrived too late to use
+            summary_cost = tracker.log_request(
+                model=compacted["model"],
+                input_tokens=compacted["input_tokens"],
+                output_tokens=compacted["output_tokens"],
+                project="project-2",
+            )
+            total_cost += summary_cost
+            session.usage(
+                compacted["model"],
+                compacted["input_tokens"],
+                compacted["output_tokens"],
+                summary_cost,
+            )
+        if compacted and compacted["applied"]:
+            session.compact(
+                compacted["start"], compacted["end"], compacted["message"], compacted["tokens"]
+            )
+            print_colored(
+                f"[Summarized {compacted['end'] - compacted['start']} older messages]", "yellow"
+            )
+
         # Add user message to history
-        messages.append({"role": "user", "content": user_input})
+        tokens = conversation.add("user", user_input)
+        session.message(conversation[-1], tokens)
 
-        # Context management: Truncate if too long
-        if len(messages) > 50:
-            print_colored("[Context getting long, truncating old messages...]", "yellow")
-            messages = truncate_messages(messages, max_messages=30)
+        # Context management: drop the oldest messages that don't fit
+        dropped = conversation.truncate_to_tokens(Config.prompt_token_budget())
+        if dropped:
+            session.truncate(Config.prompt_token_budget())
+            print_colored(f"[Context full, dropped {dropped} old messages]", "yellow")
 
-        # Count input tokens for cost tracking
-        input_tokens = sum(count_tokens(m["content"]) for m in messages)
+        # Input tokens for cost tracking (already counted, no re-tokenizing)
+        input_tokens = conversation.prompt_tokens
 
-        # Get response
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo", temperature=0.7, messages=messages
+        # Check the daily budget before spending more
+        budget.check(
+            estimated_cost=tracker.calculate_cost("gpt-3.5-turbo", input_tokens, 0),
+            project="project-2",
         )
 
-        # Extract AI response
-        ai_message = response.choices[0].message.content
-        output_tokens = count_tokens(ai_message)
+        request = dict(
+            model="gpt-3.5-turbo",
+            temperature=0.7,
+            max_tokens=Config.MAX_TOKENS,
+            messages=conversation.messages,
+        )
+
+        stream = None
+        if Config.STREAM_RESPONSES:
+            # Print the response as it is generated
+            stream = stream_chat(client, **request)
+            ai_message = streaming_print(stream, color="green")
+            output_tokens = stream.output_tokens
+        else:
+            # Get response
+            response = client.chat.completions.create(**request)
+
+            # Extract AI response
+            ai_message = response.choices[0].message.content
+            output_tokens = count_tokens(ai_message)
 
         # Track cost
         cost = tracker.log_request(
@@ -128,19 +240,30 @@ while True:
             project="project-2",
         )
         total_cost += cost
+        session.usage("gpt-3.5-turbo", input_tokens, output_tokens, cost)
 
         # Print response
-        print_colored(f"AI: {ai_message}\n", "green")
+        if stream is None:
+            print_colored(f"AI: {ai_message}\n", "green")
+        else:
+            print()
 
         # Add AI response to history
-        messages.append({"role": "assistant", "content": ai_message})
+        tokens = conversation.add("assistant", ai_message)
+        session.message(conversation[-1], tokens)
+
+        # Summarize older turns in the background if the history is long
+        if compactor:
+            compactor.maybe_start()
 
         # Show mini stats
         print_colored(
-            f"[Messages: {len(messages)} | Tokens: ~{input_tokens + output_tokens:,} | "
+            f"[Messages: {len(conversation)} | Tokens: ~{input_tokens + output_tokens:,} | "
             f"Cost: ${cost:.4f} | Total: ${total_cost:.4f}]",
             "cyan",
         )
+        if stream is not None:
+            print_colored(f"[{stream.stats()}]", "cyan")
         print()
 
     except KeyboardInterrupt:
@@ -151,8 +274,9 @@ while True:
     except Exception as e:
         print_colored(f"\nError: {e}", "red")
         # Remove the user message we just added since we got an error
-        if messages and messages[-1]["role"] == "user":
-            messages.pop()
+        if conversation and conversation[-1]["role"] == "user":
+            conversation.pop()
+            session.pop()
 
 print_colored("\n" + "=" * 70, "cyan")
 print_colored("Thank you for using Enhanced Memory Chatbot!", "green")
@@ -0,0 +1,521 @@
+"""
+Project 2: Multi-Session Chat Server
+The memory chatbot for many users at once, as a small asyncio HTTP server.
+
+Each session keeps its own compact History and session log. Hot sessions
+live in memory under a byte budget; least recently used ones are dropped and
+reloaded from their log on the next request. Requests to the LLM run
+concurrently, but each session handles its messages one at a time, in
+arrival order.
+
+Endpoints (JSON):
+    POST /sessions/<id>/chat   {"message": "Hi!"}  -> {"reply": ..., ...}
+    GET  /sessions/<id>        -> {"messages": [...]} (404 if it was never started)
+    GET  /stats                -> memory, loads, evictions, requests
+
+Usage:
+    python session_server.py --port 8080 --max-mb 256
+    curl -d '{"message": "Hi, I am Sam"}' localhost:8080/sessions/sam/chat
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.config import Config
+from utils.compact_history import History
+from utils.cost_tracker import track_cost
+from utils.helpers import async_retry_with_exponential_backoff, print_colored
+from utils.rate_limiter import get_rate_limiter
+from utils.session_log import SessionLog, find_session
+
+SYSTEM_PROMPT = (
+    "You are a helpful and knowledgeable assistant. Be friendly and concise in your responses."
+)
+
+# Session ids double as file names
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+CHAT_PATH = re.compile(r"^/sessions/([^/]+)/chat$")
+SESSION_PATH = re.compile(r"^/sessions/([^/]+)$")
+
+# Messages kept uncompressed in an idle session (the rest are zlib-compressed)
+KEEP_HOT_MESSAGES = 6
+# Seconds without requests before a session's cold turns are compressed
+IDLE_COMPRESS_SECONDS = 30
+
+MAX_BODY = 1024 * 1024
+
+
+class Session:
+    """One user's conversation, its log and its ordering lock"""
+
+    def __init__(self, session_id: str, conversation: History, log: SessionLog):
+        self.id = session_id
+        self.conversation = conversation
+        self.log = log
+        self.lock = asyncio.Lock()
+        self.active = 0  # Requests holding the session (not evictable while > 0)
+        self.cold = False  # Older turns are zlib-compressed
+        self.idle_timer = None
+        self.bytes = conversation.nbytes()
+
+
+class SessionStore:
+    """
+    Sessions kept in memory up to a byte budget, in LRU order.
+
+    Every change is written to the session's log as it happens, so evicting
+    a session only means closing its log; it is rebuilt from the log when
+    it is next used.
+    """
+
+    def __init__(
+        self,
+        directory: str = Config.SESSION_DIR,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_sessions: int = 512,
+        compress: bool = Config.SESSION_COMPRESS,
+    ):
+        """
+        Initialize session store.
+
+        Args:
+            directory: Directory for session logs
+            max_bytes: Memory budget for hot sessions
+            max_sessions: Hot sessions kept at most (each holds an open log file)
+            compress: Gzip new session logs
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.compress = compress
+
+        self.bytes = 0
+        self.loads = 0
+        self.evictions = 0
+        self._sessions = OrderedDict()  # id -> Session, least recently used first
+        self._loading = {}  # id -> Future[Session], so concurrent requests load once
+        self._closing = {}  # id -> Future of an evicted session's log close
+
+    def _open(self, session_id: str) -> Session:
+        """Reload a session from its log, or start a new one (blocking file I/O)"""
+        conversation = History()
+        try:
+            find_session(session_id, self.directory)
+        except FileNotFoundError:
+            log = SessionLog(session_id, self.directory, compress=self.compress)
+            tokens = conversation.add("system", SYSTEM_PROMPT)
+            log.message(conversation[0], tokens)
+            return Session(session_id, conversation, log)
+
+        SessionLog.restore(session_id, conversation, self.directory)
+        self.loads += 1
+        return Session(session_id, conversation, SessionLog(session_id, self.directory))
+
+    async def exists(self, session_id: str) -> bool:
+        """Whether a session is hot, loading or has a log on disk"""
+        if session_id in self._sessions or session_id in self._loading:
+            return True
+        try:
+            await asyncio.to_thread(find_session, session_id, self.directory)
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def _get(self, session_id: str) -> Session:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+
+        future = self._loading.get(session_id)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = self._loading[session_id] = asyncio.get_running_loop().create_future()
+        try:
+            closing = self._closing.get(session_id)
+            if closing is not None:
+                # Evicted just now: its log must be flushed before it is replayed
+                await asyncio.shield(closing)
+            session = await asyncio.to_thread(self._open, session_id)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._loading[session_id]
+
+        self._sessions[session_id] = session
+        self.bytes += session.bytes
+        future.set_result(session)
+        return session
+
+    @asynccontextmanager
+    async def session(self, session_id: str):
+        """Check out a session for the duration of a request"""
+        session = await self._get(session_id)
+        while self._sessions.get(session_id) is not session:
+            # Evicted while this request waited for another request's load
+            session = await self._get(session_id)
+        session.active += 1
+        if session.idle_timer is not None:
+            session.idle_timer.cancel()
+            session.idle_timer = None
+        if session.cold:
+            # In use again: decompress once rather than on every request
+            session.conversation.decompress()
+            session.cold = False
+            self.resize(session)
+        try:
+            yield session
+        finally:
+            session.active -= 1
+            if not session.active:
+                session.idle_timer = asyncio.get_running_loop().call_later(
+                    IDLE_COMPRESS_SECONDS, self._compress_idle, session
+                )
+            self.resize(session)
+            self.evict()
+
+    def _compress(self, session: Session):
+        """Compress an idle session's older turns"""
+        if session.cold or session.active:
+            return
+        session.conversation.compress_cold(KEEP_HOT_MESSAGES)
+        session.cold = True
+        self.resize(session)
+
+    def _compress_idle(self, session: Session):
+        """Idle timer callback"""
+        session.idle_timer = None
+        if self._sessions.get(session.id) is session:
+            self._compress(session)
+
+    def resize(self, session: Session):
+        """Update the byte budget after a session's messages changed"""
+        size = session.conversation.nbytes()
+        if session.id in self._sessions:
+            self.bytes += size - session.bytes
+        session.bytes = size
+
+    def evict(self):
+        """Drop least recently used idle sessions until within budget"""
+        # Over the memory budget: compressing idle sessions is cheaper than
+        # reloading them from disk later, so try that first
+        for session in list(self._sessions.values()):
+            if self.bytes <= self.max_bytes:
+                break
+            self._compress(session)
+
+        for session_id in list(self._sessions):
+            if self.bytes <= self.max_bytes and len(self._sessions) <= self.max_sessions:
+                return
+            session = self._sessions[session_id]
+            if session.active:
+                continue
+            del self._sessions[session_id]
+            self.bytes -= session.bytes
+            if session.idle_timer is not None:
+                session.idle_timer.cancel()
+            self._close_log(session)
+            self.evictions += 1
+
+    def _close_log(self, session: Session):
+        """Close an evicted session's log on a worker thread"""
+        closing = asyncio.ensure_future(asyncio.to_thread(session.log.close))
+        self._closing[session.id] = closing
+
+        def done(future):
+            if self._closing.get(session.id) is future:
+                del self._closing[session.id]
+            if not future.cancelled() and future.exception() is not None:
+                print_colored(f"Failed to close log for {session.id}: {future.exception()}", "red")
+
+        closing.add_done_callback(done)
+
+    async def close(self):
+        """Close every open session log, including ones still being evicted"""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self.bytes = 0
+
+        def close_all():
+            for session in sessions:
+                session.log.close()
+
+        await asyncio.gather(*self._closing.values(), return_exceptions=True)
+        await asyncio.to_thread(close_all)
+
+    def stats(self) -> dict:
+        return {
+            "hot_sessions": len(self._sessions),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+
+class ChatServer:
+    """HTTP front end: one History per session, LLM calls in parallel"""
+
+    def __init__(
+        self,
+        client,
+        store: SessionStore,
+        model: str = "gpt-3.5-turbo",
+        concurrency: int = 64,
+        track_costs: bool = Config.TRACK_COSTS,
+    ):
+        """
+        Initialize chat server.
+
+        Args:
+            client: AsyncOpenAI client
+            store: Session store
+            model: Chat model
+            concurrency: LLM requests in flight across all sessions
+            track_costs: Log each request with the shared cost tracker
+        """
+        self.store = store
+        self.model = model
+        self.track_costs = track_costs
+        self.requests = 0
+        self.in_flight = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._create = async_retry_with_exponential_backoff(
+            client.chat.completions.create, max_retries=3, limiter=get_rate_limiter()
+        )
+
+    async def chat(self, session_id: str, text: str) -> dict:
+        """
+        Add a user message to a session and get the reply.
+
+        Messages to the same session are answered in the order they arrive.
+
+        Args:
+            session_id: Session to talk to
+            text: User message
+
+        Returns:
+            Reply, usage and cost
+        """
+        async with self.store.session(session_id) as session:
+            async with session.lock:
+                conversation, log = session.conversation, session.log
+
+                # Log writes (and their fsyncs) run off the event loop; the
+                # session lock keeps them in order
+                tokens = conversation.add("user", text)
+                await asyncio.to_thread(log.message, conversation[-1], tokens)
+                budget = Config.prompt_token_budget()
+                if conversation.truncate_to_tokens(budget):
+                    await asyncio.to_thread(log.truncate, budget)
+                input_tokens = conversation.prompt_tokens
+
+                try:
+                    async with self._slots:
+                        self.in_flight += 1
+                        try:
+                            response = await self._create(
+                                model=self.model,
+                                temperature=Config.TEMPERATURE,
+                                max_tokens=Config.MAX_TOKENS,
+                                messages=conversation.messages,
+                            )
+                        finally:
+                            self.in_flight -= 1
+                except Exception:
+                    conversation.pop()
+                    await asyncio.to_thread(log.pop)
+                    raise
+                self.requests += 1
+
+                reply = response.choices[0].message.content or ""
+                tokens = conversation.add("assistant", reply)
+                await asyncio.to_thread(log.message, conversation[-1], tokens)
+
+                if response.usage is not None:
+                    input_tokens = response.usage.prompt_tokens
+                    output_tokens = response.usage.completion_tokens
+                else:
+                    output_tokens = tokens
+                if self.track_costs:
+                    cost = await asyncio.to_thread(
+                        track_cost, self.model, input_tokens, output_tokens, project="project-2-server"
+                    )
+                else:
+                    cost = 0.0
+                await asyncio.to_thread(log.usage, self.model, input_tokens, output_tokens, cost)
+
+                return {
+                    "session": session_id,
+                    "reply": reply,
+                    "messages": len(conversation),
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "cost": cost,
+                }
+
+    async def history(self, session_id: str) -> dict:
+        """Messages of a session (loaded from disk if needed; None if unknown)"""
+        # Only chat requests start sessions; a GET must not create a log
+        if not await self.store.exists(session_id):
+            return None
+        async with self.store.session(session_id) as session:
+            return {
+                "session": session_id,
+                "messages": [dict(m) for m in session.conversation.messages],
+            }
+
+    def stats(self) -> dict:
+        return {**self.store.stats(), "requests": self.requests, "in_flight": self.in_flight}
+
+    async def route(self, method: str, path: str, body: bytes):
+        """Dispatch a request; returns (status, JSON-able payload)"""
+        match = CHAT_PATH.match(path) or SESSION_PATH.match(path)
+        if match and not SESSION_ID.match(match.group(1)):
+            return HTTPStatus.BAD_REQUEST, {"error": "Session ids are 1-64 letters, digits, _ or -"}
+
+        if method == "POST" and CHAT_PATH.match(path):
+            try:
+                text = json.loads(body)["message"]
+            except (ValueError, KeyError, TypeError):
+                return HTTPStatus.BAD_REQUEST, {"error": 'Expected {"message": "..."}'}
+            if not isinstance(text, str) or not text.strip():
+                return HTTPStatus.BAD_REQUEST, {"error": "Empty message"}
+            return HTTPStatus.OK, await self.chat(match.group(1), text)
+
+        if method == "GET" and SESSION_PATH.match(path):
+            history = await self.history(match.group(1))
+            if history is None:
+                return HTTPStatus.NOT_FOUND, {"error": f"No session '{match.group(1)}'"}
+            return HTTPStatus.OK, history
+
+        if method == "GET" and path == "/stats":
+            return HTTPStatus.OK, self.stats()
+
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader):
+        """
+        Read a request line and headers.
+
+        Returns:
+            (method, path, version, headers), or None at end of stream
+
+        Raises:
+            ValueError: Malformed request line or headers
+            asyncio.LimitOverrunError: A line longer than the stream limit
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, version = request_line.decode("latin-1").split()
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method, path, version, headers
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one (keep-alive) connection"""
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    head = await self._read_head(reader)
+                    if head is None:
+                        break
+                    method, path, version, headers = head
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError(f"Negative Content-Length {length}")
+                except (ValueError, asyncio.LimitOverrunError) as e:
+                    # The rest of the stream can't be trusted; answer and hang up
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": f"Malformed request: {e}"}
+                else:
+                    if length > MAX_BODY:
+                        status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}
+                    else:
+                        body = await reader.readexactly(length) if length else b""
+                        try:
+                            status, payload = await self.route(method, path.split("?")[0], body)
+                        except Exception as e:
+                            status, payload = HTTPStatus.BAD_GATEWAY, {"error": f"{type(e).__name__}: {e}"}
+                        keep_alive = (
+                            headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                        )
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def main(args):
+    store = SessionStore(
+        directory=args.session_dir,
+        max_bytes=int(args.max_mb * 1024 * 1024),
+        max_sessions=args.max_sessions,
+    )
+    server = ChatServer(
+        Config.get_async_openai_client(),
+        store,
+        model=args.model,
+        concurrency=args.concurrency,
+    )
+
+    listener = await asyncio.start_server(
+        server.handle_connection, args.host, args.port, limit=MAX_BODY
+    )
+    print_colored(f"Session server on http://{args.host}:{args.port} "
+                  f"(sessions in {args.session_dir}/, {args.max_mb:g} MB hot)", "green")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await store.close()
+        await Config.aclose_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the memory chatbot to many sessions")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--session-dir", default=Config.SESSION_DIR, help="Session log directory")
+    parser.add_argument("--max-mb", type=float, default=256, help="Memory budget for hot sessions")
+    parser.add_argument("--max-sessions", type=int, default=512, help="Hot sessions kept at most")
+    parser.add_argument("--concurrency", type=int, default=64, help="LLM requests in flight")
+    parser.add_argument("--model", default="gpt-3.5-turbo")
+    args = parser.parse_args()
+
+    Config.validate()
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print_colored("\nServer stopped", "yellow")
@@ -5,16 +5,13 @@ AI assistant with multiple tools (weather, calculator, time)
 Demonstrates how AI chooses the right tool for each task.
 """
 
-from openai import OpenAI
-import json
 import sys
 import os
-from datetime import datetime
-import math
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
 from utils.helpers import print_colored
+from tools import registry
 
 client = Config.get_openai_client()
 
@@ -27,131 +24,11 @@ print("          'Calculate 847 * 923'")
 print("          'What time is it?'\n")
 
 
-# Function 1: Weather
-def get_weather(location: str) -> str:
-    """Get current weather for a location"""
-    weather_data = {
-        "delhi": "Sunny, 28°C",
-        "mumbai": "Partly cloudy, 32°C",
-        "bangalore": "Rainy, 22°C",
-        "chennai": "Hot, 35°C",
-    }
-
-    for city in weather_data:
-        if city in location.lower():
-            return f"{weather_data[city]}"
-
-    return "Sunny, 25°C (Simulated)"
-
-
-# Function 2: Calculator
-def calculate(expression: str) -> str:
-    """Safely evaluate mathematical expressions"""
-    try:
-        # Remove any dangerous operations
-        allowed_chars = "0123456789+-*/(). "
-        if not all(c in allowed_chars for c in expression):
-            return "Error: Invalid characters in expression"
-
-        # Evaluate safely
-        result = eval(expression, {"__builtins__": {}}, {"math": math})
-        return str(result)
-
-    except Exception as e:
-        return f"Error: {str(e)}"
-
-
-# Function 3: Get Time
-def get_current_time(timezone: str = "UTC") -> str:
-    """Get current time"""
-    now = datetime.now()
-    return now.strftime("%Y-%m-%d %H:%M:%S")
-
-
-# Function 4: Search (simulated)
-def search_information(query: str) -> str:
-    """Simulated web search"""
-    return f"Search results for '{query}': [Simulated web search - in real app, use SerpAPI or similar]"
-
-
-# Define all tools for the AI
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "get_weather",
-            "description": "Get current weather for a city",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "City name (e.g., Delhi, Mumbai)",
-                    }
-                },
-                "required": ["location"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "calculate",
-            "description": "Perform mathematical calculations. Supports +, -, *, /, parentheses, and math functions.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "expression": {
-                        "type": "string",
-                        "description": "Mathematical expression to evaluate (e.g., '847 * 923', '(100 + 50) / 2')",
-                    }
-                },
-                "required": ["expression"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_current_time",
-            "description": "Get the current date and time",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "timezone": {
-                        "type": "string",
-                        "description": "Timezone (default: UTC)",
-                    }
-                },
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "search_information",
-            "description": "Search for information on the internet",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query",
-                    }
-                },
-                "required": ["query"],
-            },
-        },
-    },
-]
-
-# Function router
-function_map = {
-    "get_weather": get_weather,
-    "calculate": calculate,
-    "get_current_time": get_current_time,
-    "search_information": search_information,
-}
+# Tools (weather, calculator, time, search) and their schemas live in
+# tools.py; this runs the calls from one reply at the same time
+tool_executor = registry.executor(
+    timeout=Config.TOOL_TIMEOUT, max_workers=Config.TOOL_WORKERS
+)
 
 # Message history
 messages = [
@@ -177,9 +54,12 @@ while True:
     messages.append({"role": "user", "content": user_input})
 
     try:
-        # First API call
+        # First API call, offering only the tools that fit the question
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo", messages=messages, tools=tools, tool_choice="auto"
+            model="gpt-3.5-turbo",
+            messages=messages,
+            tools=registry.relevant(user_input, limit=Config.TOOL_LIMIT),
+            tool_choice="auto",
         )
 
         response_message = response.choices[0].message
@@ -189,30 +69,15 @@ while True:
             # AI wants to use tools!
             messages.append(response_message)
 
-            # Process each tool call (AI might call multiple tools)
+            # The AI might call several tools; run them in parallel
             for tool_call in response_message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-
                 print_colored(
-                    f"[Using tool: {function_name} with args: {function_args}]", "yellow"
+                    f"[Using tool: {tool_call.function.name} with args: {tool_call.function.arguments}]",
+                    "yellow",
                 )
 
-                # Execute the function
-                if function_name in function_map:
-                    function_response = function_map[function_name](**function_args)
-                else:
-                    function_response = f"Error: Unknown function {function_name}"
-
-                # Add function result to messages
-                messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "name": function_name,
-                        "content": function_response,
-                    }
-                )
+            # Results come back in tool_call order, errors included
+            messages.extend(tool_executor.run(response_message.tool_calls))
 
             # Second API call with function results
             second_response = client.chat.completions.create(
@@ -0,0 +1,94 @@
+"""
+Project 3: Shared Tools
+The functions the bots can call. Each one's schema is generated from its
+type hints and docstring by the tool registry, so there is no tools list to
+keep in sync by hand.
+"""
+
+import math
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.tool_registry import ToolRegistry
+
+registry = ToolRegistry()
+
+
+@registry.tool(tags=["weather"])
+def get_weather(location: str) -> str:
+    """
+    Get the current weather for a specific location/city. Returns temperature, conditions, and humidity.
+
+    In a real app, you'd call an actual weather API here.
+    For demo, we return simulated data.
+
+    Args:
+        location: The city name, e.g., Delhi, Mumbai, New York, London
+    """
+    # Simulated weather data
+    weather_data = {
+        "delhi": "Sunny, 28°C, Humidity: 45%",
+        "mumbai": "Partly cloudy, 32°C, Humidity: 70%",
+        "bangalore": "Rainy, 22°C, Humidity: 85%",
+        "chennai": "Hot and sunny, 35°C, Humidity: 60%",
+        "kolkata": "Humid, 30°C, Humidity: 75%",
+        "hyderabad": "Clear skies, 29°C, Humidity: 50%",
+    }
+
+    location_lower = location.lower()
+
+    # Check if we have data for this location
+    for city in weather_data:
+        if city in location_lower:
+            return f"Weather in {location}: {weather_data[city]}"
+
+    # Default response for unknown cities
+    return f"Weather in {location}: Sunny, 25°C (Simulated data)"
+
+
+@registry.tool(tags=["math"])
+def calculate(expression: str) -> str:
+    """
+    Perform mathematical calculations. Supports +, -, *, /, parentheses, and math functions.
+
+    Args:
+        expression: Mathematical expression to evaluate (e.g., '847 * 923', '(100 + 50) / 2')
+    """
+    try:
+        # Remove any dangerous operations
+        allowed_chars = "0123456789+-*/(). "
+        if not all(c in allowed_chars for c in expression):
+            return "Error: Invalid characters in expression"
+
+        # Evaluate safely
+        result = eval(expression, {"__builtins__": {}}, {"math": math})
+        return str(result)
+
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@registry.tool
+def get_current_time(timezone: str = "UTC") -> str:
+    """
+    Get the current date and time.
+
+    Args:
+        timezone: Timezone (default: UTC)
+    """
+    now = datetime.now()
+    return now.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# Real search APIs are slow; give this one longer than the default
+@registry.tool(timeout=30)
+def search_information(query: str) -> str:
+    """
+    Search for information on the internet.
+
+    Args:
+        query: Search query
+    """
+    return f"Search results for '{query}': [Simulated web search - in real app, use SerpAPI or similar]"
@@ -5,14 +5,14 @@ AI that can check the weather using function calling!
 This demonstrates how ChatGPT browses web, runs code, etc.
 """
 
-from openai import OpenAI
-import json
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
 from utils.helpers import print_colored
+from utils.tool_registry import ToolArgumentError
+from tools import registry
 
 # Initialize OpenAI client
 client = Config.get_openai_client()
@@ -24,54 +24,13 @@ print("Ask me about the weather in any city!")
 print("Type 'quit' to exit\n")
 
 
-# Define the weather function
-def get_weather(location: str) -> str:
-    """
-    Get current weather for a location.
-    In a real app, you'd call an actual weather API here.
-    For demo, we return simulated data.
-    """
-    # Simulated weather data
-    weather_data = {
-        "delhi": "Sunny, 28°C, Humidity: 45%",
-        "mumbai": "Partly cloudy, 32°C, Humidity: 70%",
-        "bangalore": "Rainy, 22°C, Humidity: 85%",
-        "chennai": "Hot and sunny, 35°C, Humidity: 60%",
-        "kolkata": "Humid, 30°C, Humidity: 75%",
-        "hyderabad": "Clear skies, 29°C, Humidity: 50%",
-    }
-
-    location_lower = location.lower()
-
-    # Check if we have data for this location
-    for city in weather_data:
-        if city in location_lower:
-            return f"Weather in {location}: {weather_data[city]}"
-
-    # Default response for unknown cities
-    return f"Weather in {location}: Sunny, 25°C (Simulated data)"
+# get_weather and its schema are defined in tools.py
+tools = registry.schemas(["get_weather"])
 
-
-# Define function schema for the AI
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "get_weather",
-            "description": "Get the current weather for a specific location/city. Returns temperature, conditions, and humidity.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city name, e.g., Delhi, Mumbai, New York, London",
-                    }
-                },
-                "required": ["location"],
-            },
-        },
-    }
-]
+# Runs the weather lookups (one per city asked about) in parallel
+tool_executor = registry.executor(
+    timeout=Config.TOOL_TIMEOUT, max_workers=Config.TOOL_WORKERS
+)
 
 # Message history
 messages = [
@@ -111,32 +70,24 @@ while True:
         if response_message.tool_calls:
             print_colored("[AI is checking the weather...]", "yellow")
 
-            # Extract function call details
-            tool_call = response_message.tool_calls[0]
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-
-            print_colored(
-                f"[Calling {function_name} with location: {function_args.get('location')}]",
-                "yellow",
-            )
-
-            # Execute the function
-            if function_name == "get_weather":
-                function_response = get_weather(function_args["location"])
-            else:
-                function_response = f"Error: Unknown function {function_name}"
-
-            # Add function call and result to messages
+            # The AI may ask for several cities at once
+            for tool_call in response_message.tool_calls:
+                try:
+                    function_args = registry.parse_arguments(
+                        tool_call.function.name, tool_call.function.arguments
+                    )
+                except (KeyError, ToolArgumentError) as e:
+                    # The executor reports the error back to the model
+                    print_colored(f"[Bad call to {tool_call.function.name}: {e}]", "red")
+                    continue
+                print_colored(
+                    f"[Calling {tool_call.function.name} with location: {function_args['location']}]",
+                    "yellow",
+                )
+
+            # Add function call and results (in tool_call order) to messages
             messages.append(response_message)
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "name": function_name,
-                    "content": function_response,
-                }
-            )
+            messages.extend(tool_executor.run(response_message.tool_calls))
 
             # Second API call - AI uses function result to formulate response
             second_response = client.chat.completions.create(
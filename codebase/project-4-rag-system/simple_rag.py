@@ -5,12 +5,14 @@ Document Q&A using Retrieval Augmented Generation
 This is a starter template. You'll build this in weeks 2-4!
 """
 
+import importlib.util
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import Config
-from utils.helpers import print_colored
+from utils.helpers import print_colored, streaming_print
+from utils.streaming import stream_chat
 
 print_colored("=" * 70, "cyan")
 print_colored("SIMPLE RAG SYSTEM - Project 4 (Starter Template)", "green")
@@ -21,22 +23,30 @@ print("Follow the README.md for step-by-step instructions!\n")
 # TODO: Install required packages
 # pip install langchain chromadb pypdf tiktoken
 
-try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain.embeddings import OpenAIEmbeddings
-    from langchain.vectorstores import Chroma
-    from openai import OpenAI
-
-    client = Config.get_openai_client()
-
-    print_colored("✓ All dependencies installed!", "green")
-
-except ImportError as e:
-    print_colored(f"✗ Missing dependency: {e}", "red")
+# Check that packages are installed without importing them yet (langchain
+# and chromadb take seconds to import; they are loaded in STEP 2)
+missing = [name for name in ("langchain", "chromadb") if importlib.util.find_spec(name) is None]
+if missing:
+    print_colored(f"✗ Missing dependency: {', '.join(missing)}", "red")
     print("\nPlease install required packages:")
     print("pip install langchain chromadb pypdf tiktoken")
     sys.exit(1)
 
+client = Config.get_openai_client()
+# Sampling options shared by the streamed and non-streamed answers
+answer_options = {}
+response_cache = None
+if Config.RESPONSE_CACHE:
+    from utils.response_cache import get_response_cache
+
+    # Repeated questions are answered from disk instead of the API; only
+    # temperature-0 answers are deterministic enough to cache
+    response_cache = get_response_cache()
+    client = response_cache.wrap(client)
+    answer_options["temperature"] = 0
+
+print_colored("✓ All dependencies installed!", "green")
+
 
 # STEP 1: Prepare sample documents
 print_colored("\n[STEP 1] Preparing sample documents...", "yellow")
@@ -69,6 +79,9 @@ print_colored(f"✓ Loaded {len(sample_documents)} document chunks", "green")
 print_colored("\n[STEP 2] Creating embeddings and vector store...", "yellow")
 
 try:
+    from langchain.embeddings import OpenAIEmbeddings
+    from langchain.vectorstores import Chroma
+
     # Initialize embeddings
     embeddings = OpenAIEmbeddings()
 
@@ -98,11 +111,26 @@ print("  - Tell me about health insurance")
 print("\nType 'quit' to exit\n")
 
 
-def answer_question(question: str) -> str:
-    """Query the RAG system"""
+# Answers to earlier questions, matched by embedding similarity so
+# paraphrases ("how many vacation days do I get?") skip retrieval and the LLM
+semantic_cache = None
+if Config.SEMANTIC_CACHE:
+    from utils.semantic_cache import SemanticCache  # Loads numpy
+
+    semantic_cache = SemanticCache(
+        embed=embeddings.embed_query,
+        threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+        max_entries=Config.SEMANTIC_CACHE_SIZE,
+    )
+
+
+def build_messages(question: str, query_vector=None) -> list:
+    """Retrieve relevant chunks and build the prompt for a question"""
 
     # Step 1: Retrieve relevant chunks
-    relevant_docs = vectorstore.similarity_search(question, k=2)
+    if query_vector is None:
+        query_vector = embeddings.embed_query(question)
+    relevant_docs = vectorstore.similarity_search_by_vector(query_vector, k=2)
 
     # Step 2: Create context from retrieved chunks
     context = "\n\n".join([doc.page_content for doc in relevant_docs])
@@ -110,23 +138,40 @@ def answer_question(question: str) -> str:
     # Show what was retrieved
     print_colored(f"\n[Retrieved {len(relevant_docs)} relevant chunks]", "yellow")
 
+    return [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant. Answer the question based "
+            "on the provided context. If the answer is not in the context, "
+            "say 'I don't have information about that in the documents.'",
+        },
+        {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"},
+    ]
+
+
+def answer_question(question: str, query_vector=None) -> str:
+    """Query the RAG system"""
+    messages = build_messages(question, query_vector)
+
     # Step 3: Query LLM with context
     response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a helpful assistant. Answer the question based "
-                "on the provided context. If the answer is not in the context, "
-                "say 'I don't have information about that in the documents.'",
-            },
-            {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"},
-        ],
+        model="gpt-3.5-turbo", messages=messages, **answer_options
     )
 
     return response.choices[0].message.content
 
 
+def stream_answer(question: str, query_vector=None) -> str:
+    """Query the RAG system, printing the answer as it is generated"""
+    messages = build_messages(question, query_vector)
+
+    print()
+    stream = stream_chat(client, messages, model="gpt-3.5-turbo", **answer_options)
+    answer = streaming_print(stream, prefix="Answer: ", color="green")
+    print_colored(f"[{stream.stats()}]\n", "cyan")
+    return answer
+
+
 # Main loop
 while True:
     user_question = input("Your Question: ")
@@ -139,13 +184,34 @@ while True:
         continue
 
     try:
-        answer = answer_question(user_question)
-        print_colored(f"\nAnswer: {answer}\n", "green")
+        # Embed once: the same vector serves the cache lookup and retrieval
+        query_vector = embeddings.embed_query(user_question)
+
+        match = semantic_cache.lookup(user_question, query_vector) if semantic_cache else None
+        if match:
+            answer, cached_question, similarity = match
+            print_colored(f"\n[Cached answer for '{cached_question}' ({similarity:.2f})]", "yellow")
+            print_colored(f"\nAnswer: {answer}\n", "green")
+            continue
+
+        if Config.STREAM_RESPONSES and not Config.RESPONSE_CACHE:
+            answer = stream_answer(user_question, query_vector)
+        else:
+            answer = answer_question(user_question, query_vector)
+            print_colored(f"\nAnswer: {answer}\n", "green")
+
+        if semantic_cache:
+            semantic_cache.put(user_question, answer, query_vector)
 
     except Exception as e:
         print_colored(f"\nError: {e}", "red")
 
 
+if response_cache is not None:
+    print_colored(f"Response cache: {response_cache.stats()}", "cyan")
+if semantic_cache:
+    print_colored(f"Semantic cache: {semantic_cache.stats()}", "cyan")
+
 print_colored("\n" + "=" * 70, "cyan")
 print_colored("Next Steps:", "yellow")
 print("1. Load real PDFs instead of sample documents")
@@ -0,0 +1,135 @@
+import pytest
+
+from utils import budget_guard
+from utils.budget_guard import BudgetExceededError, BudgetGuard, RollingWindow
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Throttling sleeps on the same clock, so tests never wait
+    monkeypatch.setattr(budget_guard.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_window_expires_ring_slots_one_by_one():
+    window = RollingWindow(span=60, buckets=6)  # 10-second buckets
+    window.add(1.0, now=0)
+    window.add(2.0, now=15)
+    window.add(4.0, now=35)
+    assert window.total(now=35) == 7.0
+
+    # Each amount drops out once its bucket is a full span old
+    assert window.total(now=59) == 7.0
+    assert window.total(now=60) == 6.0
+    assert window.total(now=70) == 4.0
+    assert window.total(now=89) == 4.0
+    assert window.total(now=90) == 0.0
+
+
+def test_window_reuses_slots_after_wrapping_around():
+    window = RollingWindow(span=60, buckets=6)
+    for second in range(0, 180, 10):
+        window.add(1.0, now=second)
+        # Never more than one amount per bucket inside the window
+        assert window.total(now=second) == min(second // 10 + 1, 6)
+
+
+def test_window_jump_longer_than_span_clears_everything():
+    window = RollingWindow(span=60, buckets=6)
+    window.add(3.0, now=5)
+    window.add(2.0, now=55)
+    assert window.total(now=1000) == 0.0
+
+    window.add(1.0, now=1000)
+    assert window.total(now=1000) == 1.0
+
+
+def test_window_ignores_amounts_older_than_span():
+    window = RollingWindow(span=60, buckets=6)
+    window.add(1.0, now=100)
+    window.add(5.0, now=10)  # Already outside the window ending at 100
+    assert window.total(now=100) == 1.0
+
+
+def test_window_seconds_until_below():
+    window = RollingWindow(span=60, buckets=6)
+    window.add(1.0, now=0)
+    window.add(1.0, now=30)
+    assert window.seconds_until_below(2.0, now=30) == 0.0
+    assert window.seconds_until_below(1.0, now=30) == 30.0
+    assert window.seconds_until_below(0.0, now=30) == 60.0
+    assert window.seconds_until_below(-1.0, now=30) is None
+
+
+def test_guard_spend_rolls_over(clock):
+    guard = BudgetGuard(limits={"minute": 1.0}, clock=clock)
+    guard.record(0.5, project="a")
+    assert guard.spend("minute") == 0.5
+    assert guard.spend("minute", "a") == 0.5
+
+    clock.now += 61
+    assert guard.spend("minute") == 0.0
+    assert guard.spend("hour") == 0.5
+
+
+def test_guard_warn_returns_false(clock, capsys):
+    guard = BudgetGuard(limits={"minute": 1.0}, action="warn", clock=clock)
+    guard.record(0.9)
+    assert guard.check(0.05) is True
+    assert guard.check(0.2) is False
+    assert "Budget exceeded" in capsys.readouterr().out
+
+
+def test_guard_reject_raises_until_window_rolls(clock):
+    guard = BudgetGuard(limits={"minute": 1.0}, action="reject", clock=clock)
+    guard.record(0.9)
+    with pytest.raises(BudgetExceededError):
+        guard.check(0.2)
+
+    clock.now += 61
+    assert guard.check(0.2) is True
+
+
+def test_guard_project_limit(clock):
+    guard = BudgetGuard(
+        limits={"day": 10.0}, project_limits={"p": {"hour": 0.1}}, action="reject", clock=clock
+    )
+    guard.record(0.08, project="p")
+    assert guard.check(0.05) is True  # Other projects only see the global limit
+    with pytest.raises(BudgetExceededError, match="project 'p'"):
+        guard.check(0.05, project="p")
+
+
+def test_guard_throttle_waits_for_spend_to_expire(clock):
+    guard = BudgetGuard(limits={"minute": 1.0}, action="throttle", buckets=6, clock=clock)
+    start = clock.now
+    guard.record(0.9)
+    assert guard.check(0.2) is True
+    # Waited until the $0.90 bucket left the minute window
+    assert 50 <= clock.now - start <= 60
+    assert guard.spend("minute") == 0.0
+
+
+def test_guard_throttle_rejects_past_max_throttle(clock):
+    guard = BudgetGuard(limits={"hour": 1.0}, action="throttle", max_throttle=60, clock=clock)
+    guard.record(0.9)
+    with pytest.raises(BudgetExceededError):
+        guard.check(0.2)
+
+
+def test_guard_throttle_rejects_cost_over_the_limit(clock):
+    guard = BudgetGuard(limits={"minute": 1.0}, action="throttle", clock=clock)
+    with pytest.raises(BudgetExceededError):
+        guard.check(1.5)
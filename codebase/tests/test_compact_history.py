@@ -0,0 +1,36 @@
+from utils import compact_history
+from utils.compact_history import SHARED_PROMPTS_SIZE, History
+
+
+def new_history(prompt: str) -> History:
+    history = History()
+    history.append({"role": "system", "content": prompt}, tokens=5)
+    return history
+
+
+def test_sessions_share_one_copy_of_the_prompt():
+    a = new_history("".join(["You are a helpful assistant. "] * 20))
+    b = new_history("".join(["You are a helpful assistant. "] * 20))
+    assert a[0]["content"] is b[0]["content"]
+
+
+def test_shared_prompts_are_bounded():
+    histories = [new_history(f"You help user {i}.") for i in range(SHARED_PROMPTS_SIZE * 3)]
+    assert len(compact_history._shared_prompts._data) == SHARED_PROMPTS_SIZE
+    # Prompts dropped from the table still belong to their sessions
+    assert histories[0][0]["content"] == "You help user 0."
+
+
+def test_decompress_restores_cold_turns():
+    history = new_history("prompt")
+    for i in range(10):
+        history.append({"role": "user", "content": f"message {i} " * 100}, tokens=10)
+    before = history.nbytes()
+
+    assert history.compress_cold(keep_recent=2) > 0
+    assert history.nbytes() < before
+    assert history[1]["content"] == "message 0 " * 100
+
+    history.decompress()
+    assert not any(message.compressed for message in history.messages)
+    assert history[1]["content"] == "message 0 " * 100
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils.compaction import ConversationCompactor, is_summary
+from utils.conversation import Conversation
+
+
+class FakeClient:
+    """Stands in for the OpenAI client: returns a fixed summary or raises"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="the summary"))],
+            usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30),
+        )
+
+
+@pytest.fixture(autouse=True)
+def word_count_tokens(monkeypatch):
+    # Summaries are tokenized when swapped in; keep that offline
+    monkeypatch.setattr("utils.conversation.count_tokens", lambda text, model=None: len(text.split()))
+
+
+def build(turns=10):
+    conversation = Conversation()
+    conversation.append({"role": "system", "content": "sys"}, tokens=5)
+    for i in range(turns):
+        conversation.append({"role": "user", "content": f"u{i}"}, tokens=50)
+        conversation.append({"role": "assistant", "content": f"a{i}"}, tokens=50)
+    return conversation
+
+
+def test_apply_swaps_in_summary():
+    conversation = build()
+    compactor = ConversationCompactor(FakeClient(), conversation, threshold=100, keep_recent=4)
+    assert compactor.maybe_start()
+    compactor.wait()
+
+    compacted = compactor.apply()
+    assert compacted["applied"]
+    assert (compacted["input_tokens"], compacted["output_tokens"]) == (120, 30)
+    assert is_summary(conversation[1])
+    assert len(conversation) == 2 + 4
+
+
+def test_discarded_summary_still_reports_usage():
+    conversation = build()
+    compactor = ConversationCompactor(FakeClient(), conversation, threshold=100, keep_recent=4)
+    assert compactor.maybe_start()
+    compactor.wait()
+    conversation.truncate(max_messages=3)  # History changed under the summary
+
+    compacted = compactor.apply()
+    assert compacted is not None and not compacted["applied"]
+    assert (compacted["input_tokens"], compacted["output_tokens"]) == (120, 30)
+    assert not any(is_summary(m) for m in conversation)
+    assert compactor.apply() is None
+
+
+def test_background_error_is_raised_once():
+    conversation = build()
+    compactor = ConversationCompactor(
+        FakeClient(error=RuntimeError("API down")), conversation, threshold=100, keep_recent=4
+    )
+    assert compactor.maybe_start()
+    compactor.wait()
+
+    with pytest.raises(RuntimeError, match="API down"):
+        compactor.apply()
+    assert compactor.apply() is None
+    assert compactor.maybe_start()  # Tries again on the next turn
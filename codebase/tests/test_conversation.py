@@ -0,0 +1,78 @@
+import random
+
+from utils.conversation import REPLY_PRIMING_TOKENS, Conversation
+
+
+def check_ledger(conversation):
+    """The incrementally kept ledger matches one rebuilt from scratch"""
+    fresh = Conversation()
+    for message, tokens in zip(conversation.messages, conversation.token_counts):
+        fresh.append(message, tokens)
+    assert conversation.total_tokens == fresh.total_tokens == sum(conversation.token_counts)
+    assert conversation.system_tokens == fresh.system_tokens
+    assert conversation._system_indices == fresh._system_indices
+    base = conversation._prefix[0]
+    assert [p - base for p in conversation._prefix] == fresh._prefix
+
+
+def build(turns, tokens=10):
+    conversation = Conversation()
+    conversation.append({"role": "system", "content": "prompt"}, tokens=5)
+    for i in range(turns):
+        conversation.append({"role": "user", "content": f"q{i}"}, tokens=tokens)
+        conversation.append({"role": "assistant", "content": f"a{i}"}, tokens=tokens)
+    return conversation
+
+
+def test_truncate_to_tokens_keeps_longest_fitting_suffix():
+    conversation = build(10)
+    budget = 5 + 4 * 10 + REPLY_PRIMING_TOKENS
+    dropped = conversation.truncate_to_tokens(budget)
+
+    assert dropped == 16
+    assert [m["content"] for m in conversation] == ["prompt", "q8", "a8", "q9", "a9"]
+    assert conversation.prompt_tokens <= budget
+    check_ledger(conversation)
+
+
+def test_repeated_truncation_keeps_ledger_consistent():
+    rng = random.Random(0)
+    conversation = Conversation()
+    conversation.append({"role": "system", "content": "prompt"}, tokens=5)
+    for i in range(300):
+        role = rng.choice(["user", "assistant", "assistant", "system"])
+        conversation.append({"role": role, "content": str(i)}, tokens=rng.randint(1, 50))
+        if i % 7 == 0:
+            conversation.truncate_to_tokens(rng.randint(50, 400))
+        if i % 31 == 0 and len(conversation) > 1:
+            conversation.pop()
+        check_ledger(conversation)
+
+
+def test_newest_message_is_kept_even_if_over_budget():
+    conversation = build(3)
+    conversation.append({"role": "user", "content": "huge paste"}, tokens=1000)
+    conversation.truncate_to_tokens(100)
+
+    assert [m["content"] for m in conversation] == ["prompt", "huge paste"]
+    check_ledger(conversation)
+
+
+def test_tool_results_are_kept_with_their_call():
+    conversation = build(3)
+    call = {"id": "call_1", "type": "function", "function": {"name": "f", "arguments": "{}"}}
+    conversation.append({"role": "assistant", "content": None, "tool_calls": [call]}, tokens=20)
+    conversation.append({"role": "tool", "tool_call_id": "call_1", "content": "x"}, tokens=500)
+    conversation.truncate_to_tokens(100)
+
+    assert [m["role"] for m in conversation] == ["system", "assistant", "tool"]
+    check_ledger(conversation)
+
+
+def test_truncate_keeps_messages_list_object():
+    conversation = build(10)
+    messages = conversation.messages
+    conversation.truncate(max_messages=5)
+    assert conversation.messages is messages
+    assert len(conversation) == 5
+    check_ledger(conversation)
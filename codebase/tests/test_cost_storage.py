@@ -0,0 +1,32 @@
+from utils.cost_tracker import CostTracker
+
+
+def test_buffered_sqlite_stats_include_queued_entries(tmp_path):
+    # A long flush interval keeps every entry on the queue until flushed
+    tracker = CostTracker(
+        str(tmp_path / "cost_log.db"), buffered=True, batch_size=100, flush_interval=60
+    )
+    try:
+        for _ in range(4):
+            tracker.log_request("gpt-3.5-turbo", 1000, 1000, project="test")
+
+        stats = tracker.get_stats()
+        assert stats["total_requests"] == 4
+        assert stats["total_cost"] == tracker.query_costs()["cost"]
+        assert tracker.query_costs()["requests"] == 4
+
+        # Totals keep counting after the rollup has been built
+        tracker.log_request("gpt-3.5-turbo", 1000, 1000, project="test")
+        assert tracker.get_stats()["total_requests"] == 5
+    finally:
+        tracker.close()
+
+
+def test_buffered_jsonl_has_no_summarize(tmp_path):
+    tracker = CostTracker(str(tmp_path / "cost_log.jsonl"), buffered=True)
+    try:
+        assert not hasattr(tracker.storage, "summarize")
+        tracker.log_request("gpt-3.5-turbo", 1000, 1000)
+        assert tracker.get_stats()["total_requests"] == 1
+    finally:
+        tracker.close()
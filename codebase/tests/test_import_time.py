@@ -0,0 +1,15 @@
+import pytest
+
+from benchmarks.bench_import_time import BUDGETS, heavy_modules, median_ms
+
+# Fewer fresh interpreters than the benchmark script, to keep the suite quick
+RUNS = 3
+
+
+@pytest.mark.parametrize("statement", list(BUDGETS))
+def test_import_within_budget(statement):
+    assert median_ms(statement, runs=RUNS) <= BUDGETS[statement]
+
+
+def test_import_utils_loads_no_heavy_modules():
+    assert heavy_modules("import utils") == []
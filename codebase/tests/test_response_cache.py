@@ -0,0 +1,40 @@
+from utils.response_cache import ResponseCache
+
+
+def test_size_stays_right_when_another_instance_clears(tmp_path):
+    path = str(tmp_path / "responses.db")
+    a = ResponseCache(path=path, max_bytes=1000)
+    b = ResponseCache(path=path, max_bytes=1000)
+
+    for i in range(5):
+        a.put(f"k{i}", "x" * 150)
+    b.clear()
+    a.put("big", "y" * 400)
+
+    assert a.get("big") == "y" * 400
+    assert a.evictions == 0
+    assert a.stats()["entries"] == 1
+    assert a.stats()["bytes"] == 400
+
+
+def test_lru_eviction_keeps_new_entry(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.db"), max_bytes=500)
+    for i in range(3):
+        cache.put(f"k{i}", "x" * 150)
+    cache.get("k0")  # Most recently used now
+    cache.put("new", "z" * 200)
+
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None and cache.get("new") is not None
+    assert cache.stats()["bytes"] <= 500
+
+
+def test_other_instances_writes_count_toward_budget(tmp_path):
+    path = str(tmp_path / "responses.db")
+    a = ResponseCache(path=path, max_bytes=500)
+    b = ResponseCache(path=path, max_bytes=500)
+    a.put("a", "x" * 300)
+    b.put("b", "y" * 300)
+
+    assert a.stats()["bytes"] == 300
+    assert b.get("b") is not None and b.get("a") is None
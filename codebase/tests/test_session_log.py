@@ -0,0 +1,37 @@
+from utils.conversation import Conversation
+from utils.session_log import SessionLog
+
+
+def contents(conversation):
+    return [m["content"] for m in conversation]
+
+
+def test_resume_truncate_then_compact_replays_identically(tmp_path):
+    directory = str(tmp_path)
+    log = SessionLog("s1", directory)
+    conversation = Conversation()
+    for role, content in [("system", "sys")] + [
+        (role, f"{role[0]}{i}") for i in range(6) for role in ("user", "assistant")
+    ]:
+        tokens = conversation.append({"role": role, "content": content}, tokens=10)
+        log.message(conversation[-1], tokens)
+    log.close()
+
+    # Resume with a smaller budget, the way enhanced_memory does
+    live = Conversation()
+    SessionLog.restore("s1", live, directory)
+    log = SessionLog("s1", directory)
+    budget = 10 + 4 * 10 + 3
+    if live.truncate_to_tokens(budget):
+        log.truncate(budget)
+
+    # Compact records use indices into the truncated history
+    summary = {"role": "system", "content": "Summary of the conversation so far:\nearlier"}
+    tokens = live.replace(1, 3, summary, tokens=8)
+    log.compact(1, 3, summary, tokens)
+    log.close()
+
+    replayed = Conversation()
+    SessionLog.restore("s1", replayed, directory)
+    assert contents(replayed) == contents(live)
+    assert replayed.total_tokens == live.total_tokens
@@ -0,0 +1,50 @@
+import pytest
+
+from utils.tool_registry import ToolArgumentError, ToolRegistry
+
+registry = ToolRegistry()
+
+
+@registry.tool
+def get_weather(location: str) -> str:
+    """
+    Get the weather.
+
+    Args:
+        location: City name
+    """
+    return f"Sunny in {location}"
+
+
+def test_parse_arguments_returns_validated_dict():
+    assert registry.parse_arguments("get_weather", '{"location": "Delhi"}') == {"location": "Delhi"}
+    assert registry.dispatch("get_weather", '{"location": "Delhi"}') == "Sunny in Delhi"
+
+
+@pytest.mark.parametrize("arguments", ["{bad json", None, '{"location": 3}', '{"city": "Delhi"}'])
+def test_parse_arguments_rejects_bad_calls(arguments):
+    with pytest.raises(ToolArgumentError):
+        registry.parse_arguments("get_weather", arguments)
+
+
+def test_parse_arguments_unknown_tool():
+    with pytest.raises(KeyError):
+        registry.parse_arguments("get_time", "{}")
+
+
+def test_relevant_does_not_cache_per_message_subsets():
+    many = ToolRegistry()
+    topics = ["weather", "stocks", "flights", "hotels", "recipes", "movies",
+              "music", "news", "sports", "traffic", "email", "calendar"]
+    for topic in topics:
+        def lookup(query: str) -> str:
+            return query
+        many.tool(lookup, name=f"get_{topic}", description=f"Look up {topic}")
+
+    for i in range(144):
+        words = " ".join(topics[(i + k) % len(topics)] for k in range(i % 4 + 1))
+        schemas = many.relevant(f"what about {words}?", limit=3)
+        assert 1 <= len(schemas) <= 3
+
+    assert len(many._schemas) <= 1
+    assert many.schemas(["get_news"]) is many.schemas(["get_news"])
@@ -4,28 +4,100 @@ Utilities for AI Workshop Projects
 Available modules:
 - config: Configuration and API client setup
 - helpers: Helper functions for common tasks
+- conversation: Message history with a running token ledger
+- compact_history: Slotted messages and compressed history for many sessions
 - cost_tracker: Track and monitor API costs
+- cost_storage: Storage backends for the cost log
+- cost_analytics: NumPy percentiles and what-if repricing (needs numpy)
+- budget_guard: Rolling-window spending limits
+- compaction: Background summarization of older conversation turns
+- session_log: Append-only per-session conversation log with resume
+- rate_limiter: Requests/tokens per minute token buckets
+- response_cache: On-disk LRU cache of deterministic chat completions
+- semantic_cache: Nearest-neighbour answer cache over question embeddings (needs numpy)
+- streaming: Streamed chat replies with time-to-first-token stats
+- tool_executor: Parallel tool-call execution with per-tool timeouts
+- tool_registry: Decorator tool registry with generated schemas and validation
+- mock_server: Offline OpenAI-compatible server for tests and benchmarks
+
+Names are imported lazily (PEP 562): ``from utils import Config`` only
+loads utils.config, so scripts don't pay for modules they never use.
 """
 
-from .config import Config
-from .helpers import (
-    retry_with_exponential_backoff,
-    truncate_messages,
-    count_tokens,
-    format_cost,
-    print_colored,
-    create_system_prompt,
-)
-from .cost_tracker import CostTracker, track_cost
-
-__all__ = [
-    "Config",
-    "retry_with_exponential_backoff",
-    "truncate_messages",
-    "count_tokens",
-    "format_cost",
-    "print_colored",
-    "create_system_prompt",
-    "CostTracker",
-    "track_cost",
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "Config": "config",
+    "retry_with_exponential_backoff": "helpers",
+    "async_retry_with_exponential_backoff": "helpers",
+    "truncate_messages": "helpers",
+    "count_tokens": "helpers",
+    "count_tokens_many": "helpers",
+    "format_cost": "helpers",
+    "print_colored": "helpers",
+    "streaming_print": "helpers",
+    "create_system_prompt": "helpers",
+    "Conversation": "conversation",
+    "History": "compact_history",
+    "Message": "compact_history",
+    "CostTracker": "cost_tracker",
+    "track_cost": "cost_tracker",
+    "BudgetGuard": "budget_guard",
+    "BudgetExceededError": "budget_guard",
+    "ConversationCompactor": "compaction",
+    "SessionLog": "session_log",
+    "RateLimiter": "rate_limiter",
+    "get_rate_limiter": "rate_limiter",
+    "ResponseCache": "response_cache",
+    "get_response_cache": "response_cache",
+    "SemanticCache": "semantic_cache",
+    "ChatStream": "streaming",
+    "stream_chat": "streaming",
+    "ToolExecutor": "tool_executor",
+    "ToolRegistry": "tool_registry",
+    "ToolArgumentError": "tool_registry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .config import Config
+    from .helpers import (
+        retry_with_exponential_backoff,
+        async_retry_with_exponential_backoff,
+        truncate_messages,
+        count_tokens,
+        count_tokens_many,
+        format_cost,
+        print_colored,
+        streaming_print,
+        create_system_prompt,
+    )
+    from .conversation import Conversation
+    from .compact_history import History, Message
+    from .cost_tracker import CostTracker, track_cost
+    from .budget_guard import BudgetGuard, BudgetExceededError
+    from .compaction import ConversationCompactor
+    from .session_log import SessionLog
+    from .rate_limiter import RateLimiter, get_rate_limiter
+    from .response_cache import ResponseCache, get_response_cache
+    from .semantic_cache import SemanticCache
+    from .streaming import ChatStream, stream_chat
+    from .tool_executor import ToolExecutor
+    from .tool_registry import ToolRegistry, ToolArgumentError
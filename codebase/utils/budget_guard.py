@@ -0,0 +1,309 @@
+"""
+Budget guard for AI API usage.
+Enforces spending limits over rolling minute/hour/day windows.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+# Rolling windows and their length in seconds
+WINDOWS = {"minute": 60, "hour": 3600, "day": 86400}
+
+ACTIONS = ("warn", "throttle", "reject")
+
+
+class BudgetExceededError(Exception):
+    """Raised when a request would push spending over a budget limit"""
+
+
+class RollingWindow:
+    """
+    Sliding-window sum kept in a fixed ring of time buckets.
+
+    Adding and reading are O(1) amortized: moving the window forward only
+    clears the buckets that expired since the last call, at most
+    ``buckets`` of them.
+    """
+
+    def __init__(self, span: float, buckets: int = 60):
+        """
+        Initialize rolling window.
+
+        Args:
+            span: Window length in seconds
+            buckets: Number of buckets (resolution is span / buckets)
+        """
+        self.span = span
+        self.buckets = buckets
+        self.bucket_width = span / buckets
+        self._sums = [0.0] * buckets
+        self._total = 0.0
+        self._head = None  # Absolute index of the newest bucket
+
+    def _advance(self, now: float):
+        """Expire buckets that have fallen out of the window"""
+        index = int(now // self.bucket_width)
+        if self._head is None:
+            self._head = index
+            return
+        if index <= self._head:
+            # Same bucket, or the clock went backwards
+            return
+
+        if index - self._head >= self.buckets:
+            self._sums = [0.0] * self.buckets
+            self._total = 0.0
+        else:
+            for i in range(self._head + 1, index + 1):
+                slot = i % self.buckets
+                self._total -= self._sums[slot]
+                self._sums[slot] = 0.0
+        self._head = index
+
+    def add(self, amount: float, now: float):
+        """Record ``amount`` at time ``now``"""
+        self._advance(now)
+        index = int(now // self.bucket_width)
+        if index > self._head - self.buckets:
+            # Ignore amounts already older than the window
+            self._sums[index % self.buckets] += amount
+            self._total += amount
+
+    def total(self, now: float) -> float:
+        """Sum of amounts recorded within the window ending at ``now``"""
+        self._advance(now)
+        return max(self._total, 0.0)
+
+    def seconds_until_below(self, limit: float, now: float) -> Optional[float]:
+        """
+        Time until enough spend expires for the total to be <= ``limit``.
+
+        Returns:
+            Seconds to wait (0 if already below), or None if expiring the
+            whole window would still not be enough
+        """
+        total = self.total(now)
+        if total <= limit:
+            return 0.0
+        if limit < 0:
+            return None
+
+        # Walk buckets from oldest to newest, expiring them one by one
+        for age in range(self.buckets - 1, -1, -1):
+            index = self._head - age
+            total -= self._sums[index % self.buckets]
+            if total <= limit:
+                expires_at = (index + self.buckets) * self.bucket_width
+                return max(expires_at - now, 0.0)
+        return None
+
+
+class BudgetGuard:
+    """Check spending against rolling-window limits before each API call"""
+
+    def __init__(
+        self,
+        limits: Optional[dict] = None,
+        project_limits: Optional[dict] = None,
+        action: str = "warn",
+        max_throttle: float = 60.0,
+        buckets: int = 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize budget guard.
+
+        Args:
+            limits: Global limits in dollars per window, e.g.
+                ``{"hour": 1.0, "day": 10.0}`` (defaults to a daily limit of
+                Config.COST_ALERT_THRESHOLD)
+            project_limits: Per-project limits, e.g.
+                ``{"project-4": {"minute": 0.10}}``
+            action: What to do when over budget: "warn", "throttle"
+                (wait for spend to roll out of the window) or "reject"
+                (raise BudgetExceededError)
+            max_throttle: Longest a throttled call will wait before it is
+                rejected instead
+            buckets: Buckets per window (resolution is window / buckets)
+            clock: Time source in seconds, used to test window rollover
+        """
+        if limits is None:
+            from .config import Config
+
+            limits = {"day": Config.COST_ALERT_THRESHOLD}
+        if action not in ACTIONS:
+            raise ValueError(f"action must be one of {ACTIONS}")
+
+        for scope_limits in [limits, *(project_limits or {}).values()]:
+            unknown = set(scope_limits) - set(WINDOWS)
+            if unknown:
+                raise ValueError(f"Unknown budget windows: {sorted(unknown)}")
+
+        self.limits = limits
+        self.project_limits = project_limits or {}
+        self.action = action
+        self.max_throttle = max_throttle
+        self.buckets = buckets
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._windows = {None: self._new_windows()}
+
+    def _new_windows(self) -> dict:
+        return {name: RollingWindow(span, self.buckets) for name, span in WINDOWS.items()}
+
+    def _scope_windows(self, project: Optional[str]) -> dict:
+        windows = self._windows.get(project)
+        if windows is None:
+            windows = self._windows[project] = self._new_windows()
+        return windows
+
+    def record(self, cost: float, project: Optional[str] = None, now: Optional[float] = None):
+        """
+        Record spending from a completed request.
+
+        Args:
+            cost: Cost in dollars
+            project: Project name (optional)
+            now: Time of the request (defaults to the guard's clock)
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            for window in self._windows[None].values():
+                window.add(cost, now)
+            if project is not None:
+                for window in self._scope_windows(project).values():
+                    window.add(cost, now)
+
+    def seed(self, entries: Iterable[dict]):
+        """
+        Load recent spending from cost log entries.
+
+        Args:
+            entries: Log entries with ISO "timestamp", "cost" and "project"
+        """
+        for entry in entries:
+            now = datetime.fromisoformat(entry["timestamp"]).timestamp()
+            self.record(entry["cost"], entry.get("project"), now=now)
+
+    def spend(self, window: str, project: Optional[str] = None) -> float:
+        """
+        Get spending within a rolling window.
+
+        Args:
+            window: "minute", "hour" or "day"
+            project: Project name (optional, global spend if omitted)
+
+        Returns:
+            Spend in dollars
+        """
+        with self._lock:
+            return self._scope_windows(project)[window].total(self.clock())
+
+    def _violations(self, estimated_cost: float, project: Optional[str], now: float):
+        """List (scope, window, spent, limit) for every limit that would be exceeded"""
+        scopes = [(None, self.limits)]
+        if project is not None and project in self.project_limits:
+            scopes.append((project, self.project_limits[project]))
+
+        violations = []
+        for scope, scope_limits in scopes:
+            windows = self._scope_windows(scope)
+            for name, limit in scope_limits.items():
+                spent = windows[name].total(now)
+                if spent + estimated_cost > limit:
+                    violations.append((scope, name, spent, limit))
+        return violations
+
+    def _wait_time(self, violations, estimated_cost: float, now: float) -> Optional[float]:
+        """Seconds until every violated window has room, or None if never"""
+        wait = 0.0
+        for scope, name, _, limit in violations:
+            window = self._windows[scope][name]
+            seconds = window.seconds_until_below(limit - estimated_cost, now)
+            if seconds is None:
+                return None
+            wait = max(wait, seconds)
+        return wait
+
+    def check(self, estimated_cost: float = 0.0, project: Optional[str] = None) -> bool:
+        """
+        Check a request against the budget before making it.
+
+        Args:
+            estimated_cost: Expected cost of the request in dollars
+            project: Project name (optional)
+
+        Returns:
+            True if within budget. With action "warn", False after printing
+            a warning; with "throttle", True once the call has waited
+
+        Raises:
+            BudgetExceededError: With action "reject", or when "throttle"
+                would have to wait longer than max_throttle
+        """
+        with self._lock:
+            now = self.clock()
+            violations = self._violations(estimated_cost, project, now)
+            if not violations:
+                return True
+
+            scope, name, spent, limit = violations[0]
+            label = f"project '{scope}'" if scope is not None else "global"
+            message = (
+                f"Budget exceeded: {label} spend over the last {name} is "
+                f"${spent:.4f} (limit ${limit:.2f})"
+            )
+
+            if self.action == "warn":
+                print(f"Warning: {message}")
+                return False
+
+            wait = None
+            if self.action == "throttle":
+                wait = self._wait_time(violations, estimated_cost, now)
+
+        if wait is None or wait > self.max_throttle:
+            raise BudgetExceededError(message)
+
+        time.sleep(wait)
+        return True
+
+
+# Example usage
+if __name__ == "__main__":
+    # Simulated clock so window rollover can be shown without waiting
+    fake_now = [0.0]
+    guard = BudgetGuard(
+        limits={"minute": 0.05, "day": 1.00},
+        project_limits={"project-2": {"hour": 0.08}},
+        action="reject",
+        clock=lambda: fake_now[0],
+    )
+
+    print("Recording $0.04 for project-2...")
+    guard.record(0.04, project="project-2")
+    print(f"Minute spend: ${guard.spend('minute'):.2f}")
+    print(f"Within budget for another $0.02? {guard.check(0.0)}")
+
+    try:
+        guard.check(0.02, project="project-2")
+    except BudgetExceededError as e:
+        print(f"Rejected: {e}")
+
+    fake_now[0] += 61
+    print(f"\nAfter 61 seconds, minute spend: ${guard.spend('minute'):.2f}")
+    print(f"Hour spend (project-2): ${guard.spend('hour', 'project-2'):.2f}")
+    print(f"$0.02 allowed now? {guard.check(0.02)}")
+
+    guard.record(0.04, project="project-2")
+    try:
+        guard.check(0.01, project="project-2")
+    except BudgetExceededError as e:
+        print(f"Rejected by project hour limit: {e}")
+
+    fake_now[0] += 3600
+    print(f"\nAfter an hour, project-2 hour spend: ${guard.spend('hour', 'project-2'):.2f}")
+    print(f"Day spend (global): ${guard.spend('day'):.2f}")
@@ -0,0 +1,223 @@
+"""
+Compact message storage for holding many conversations in memory.
+Slotted messages, interned roles, one shared copy of each system prompt and
+optional zlib compression of cold turns.
+"""
+
+import sys
+import zlib
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+from .conversation import Conversation, _as_dict
+from .helpers import _LRUCache
+
+# Distinct system prompts shared at most. Bounded so per-user prompts on a
+# long-running server don't accumulate; a prompt dropped here stays alive
+# in the sessions using it, later sessions just get their own copy.
+SHARED_PROMPTS_SIZE = 256
+
+# System prompt text -> the one copy every session shares
+_shared_prompts = _LRUCache(SHARED_PROMPTS_SIZE)
+
+
+def share_prompt(text: str) -> str:
+    """
+    Return the shared copy of a system prompt.
+
+    Sessions that start with the same prompt then hold one string between
+    them instead of one each.
+    """
+    return _shared_prompts.setdefault(text, text)
+
+
+class Message(Mapping):
+    """
+    A chat message in about a third of the memory of the equivalent dict.
+
+    Behaves as a read-only mapping ({"role": ..., "content": ..., ...}), so
+    a list of Messages can be passed to the OpenAI client as ``messages``
+    directly. Rare fields (tool_calls, tool_call_id, name) live in ``extra``.
+    """
+
+    __slots__ = ("role", "_content", "extra")
+
+    def __init__(self, role: str, content: Optional[str] = None, extra: Optional[dict] = None):
+        """
+        Initialize message.
+
+        Args:
+            role: Message role (interned, so every message shares one string)
+            content: Message text
+            extra: Other fields, e.g. tool_calls (optional)
+        """
+        self.role = sys.intern(role)
+        self._content = content
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, message, share: bool = False) -> "Message":
+        """
+        Convert a message dict (or SDK message object).
+
+        Args:
+            message: Message to convert
+            share: Store the content as a shared system prompt
+
+        Returns:
+            Message (the same object if it already is one)
+        """
+        if isinstance(message, Message):
+            return message
+        message = _as_dict(message)
+        content = message.get("content")
+        if share and isinstance(content, str):
+            content = share_prompt(content)
+        extra = {k: v for k, v in message.items() if k not in ("role", "content")}
+        return cls(message["role"], content, extra)
+
+    @property
+    def content(self) -> Optional[str]:
+        """Message text (decompressed if the message is cold)"""
+        content = self._content
+        if isinstance(content, bytes):
+            return zlib.decompress(content).decode("utf-8")
+        return content
+
+    @property
+    def compressed(self) -> bool:
+        return isinstance(self._content, bytes)
+
+    def compress(self, min_size: int = 256, level: int = 6) -> int:
+        """
+        zlib-compress the content if it is long enough to be worth it.
+
+        Args:
+            min_size: Shortest content (in characters) to compress
+            level: zlib compression level
+
+        Returns:
+            Bytes saved (0 if left as is)
+        """
+        content = self._content
+        if not isinstance(content, str) or len(content) < min_size:
+            return 0
+        if _shared_prompts.get(content) is content:
+            return 0  # Shared with other sessions; compressing would add a copy
+        data = zlib.compress(content.encode("utf-8"), level)
+        saved = sys.getsizeof(content) - sys.getsizeof(data)
+        if saved <= 0:
+            return 0
+        self._content = data
+        return saved
+
+    def decompress(self):
+        """Store the content uncompressed again (e.g. when a session becomes active)"""
+        if isinstance(self._content, bytes):
+            self._content = self.content
+
+    def nbytes(self) -> int:
+        """Memory held by this message (shared prompts not counted)"""
+        size = sys.getsizeof(self)
+        content = self._content
+        if content is not None and _shared_prompts.get(content) is not content:
+            size += sys.getsizeof(content)
+        if self.extra:
+            size += sys.getsizeof(self.extra)
+        return size
+
+    def __getitem__(self, key: str):
+        if key == "role":
+            return self.role
+        if key == "content" and self._content is not None:
+            return self.content
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "role"
+        if self._content is not None:
+            yield "content"
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return 1 + (self._content is not None) + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self) -> str:
+        return f"Message({dict(self)!r})"
+
+
+class History(Conversation):
+    """
+    Conversation that stores its messages as compact Message objects.
+
+    Leading system prompts are shared between every History that uses the
+    same text. ``compress_cold()`` zlib-compresses all but the most recent
+    turns while a session is idle; compressed turns are decompressed
+    when a request is serialized, so call ``decompress()`` once a session
+    is in use again. ``messages`` is still the list the
+    OpenAI client takes, with no per-request copy.
+    """
+
+    def append(self, message, tokens: Optional[int] = None) -> int:
+        # Only the prompt at the top is shared; later system messages
+        # (e.g. conversation summaries) are unique to the session
+        leading = len(self._system_indices) == len(self.messages)
+        return super().append(Message.from_dict(message, share=leading), tokens)
+
+    def replace(self, start: int, end: int, message, tokens: Optional[int] = None) -> int:
+        return super().replace(start, end, Message.from_dict(message), tokens)
+
+    def compress_cold(self, keep_recent: int = 10, min_size: int = 256) -> int:
+        """
+        Compress the content of all but the ``keep_recent`` newest messages.
+
+        Args:
+            keep_recent: Most recent messages left uncompressed
+            min_size: Shortest content (in characters) to compress
+
+        Returns:
+            Bytes saved
+        """
+        saved = 0
+        for message in self.messages[: max(len(self.messages) - keep_recent, 0)]:
+            if not message.compressed:
+                saved += message.compress(min_size)
+        return saved
+
+    def decompress(self):
+        """Undo ``compress_cold()`` so requests don't decompress on every turn"""
+        for message in self.messages:
+            message.decompress()
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the messages and the token ledger"""
+        return (
+            sum(message.nbytes() for message in self.messages)
+            + sys.getsizeof(self.messages)
+            + sys.getsizeof(self.token_counts)
+            + sys.getsizeof(self._prefix)
+        )
+
+
+# Example usage
+if __name__ == "__main__":
+    import json
+
+    prompt = "You are a helpful and knowledgeable assistant. " * 10
+    turns = [
+        {"role": "user", "content": f"Question {i}: explain topic {i} in detail. " * 8}
+        for i in range(20)
+    ]
+
+    history = History([{"role": "system", "content": prompt}])
+    for turn in turns:
+        history.append(json.loads(json.dumps(turn)), tokens=100)
+
+    print(f"Messages: {len(history)}, memory: {history.nbytes():,} bytes")
+    saved = history.compress_cold(keep_recent=4)
+    print(f"After compressing cold turns: {history.nbytes():,} bytes ({saved:,} saved)")
+    print(f"Still readable: {history[3]['content'][:40]}...")
+    print(f"Serializes like dicts: {json.dumps(dict(history[1]))[:60]}...")
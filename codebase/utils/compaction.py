@@ -0,0 +1,245 @@
+"""
+Background memory compaction for long conversations.
+Rolls older turns into a running summary message so the prompt stops
+growing with every turn.
+"""
+
+import threading
+from collections.abc import Mapping
+from typing import Optional
+
+from .conversation import Conversation
+
+SUMMARY_PREFIX = "Summary of the conversation so far:\n"
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain the memory of a chat assistant. Summarize the conversation "
+    "below in a few short paragraphs or bullet points. Keep facts about the "
+    "user, names, numbers, decisions and open questions; drop small talk. "
+    "If an earlier summary is included, merge it into the new one."
+)
+
+
+def is_summary(message) -> bool:
+    """True for a summary message written by ConversationCompactor"""
+    return (
+        isinstance(message, Mapping)
+        and message.get("role") == "system"
+        and str(message.get("content", "")).startswith(SUMMARY_PREFIX)
+    )
+
+
+def format_transcript(messages) -> str:
+    """Render messages as plain text for the summarizer"""
+    lines = []
+    for message in messages:
+        if not isinstance(message, Mapping):
+            message = message.model_dump(exclude_none=True)
+        content = message.get("content") or ""
+        if is_summary(message):
+            lines.append(f"Earlier summary:\n{content[len(SUMMARY_PREFIX):]}")
+        elif message["role"] == "tool":
+            lines.append(f"Tool result: {content}")
+        elif message.get("tool_calls"):
+            calls = ", ".join(
+                f"{c['function']['name']}({c['function']['arguments']})"
+                for c in message["tool_calls"]
+            )
+            lines.append(f"Assistant called: {calls}")
+        else:
+            lines.append(f"{message['role'].capitalize()}: {content}")
+    return "\n\n".join(lines)
+
+
+class ConversationCompactor:
+    """
+    Summarizes old turns on a background thread.
+
+    Call ``maybe_start()`` after each turn: once the conversation passes
+    ``threshold`` tokens it snapshots everything but the last
+    ``keep_recent`` messages and summarizes them (together with the
+    previous summary) off the main thread. Call ``apply()`` before the next
+    request: if the summary is ready, the summarized messages are swapped
+    for it in one step, so a request never sees a half-compacted history.
+    """
+
+    def __init__(
+        self,
+        client,
+        conversation: Conversation,
+        threshold: int = 3000,
+        keep_recent: int = 6,
+        model: str = "gpt-3.5-turbo",
+        summary_tokens: int = 400,
+    ):
+        """
+        Initialize compactor.
+
+        Args:
+            client: OpenAI client used for summaries
+            conversation: Conversation to compact
+            threshold: Conversation tokens that trigger a compaction
+            keep_recent: Most recent messages kept verbatim
+            model: Model for summaries
+            summary_tokens: max_tokens for each summary
+        """
+        self.client = client
+        self.conversation = conversation
+        self.threshold = threshold
+        self.keep_recent = keep_recent
+        self.model = model
+        self.summary_tokens = summary_tokens
+
+        self._thread = None
+        self._snapshot = None  # (start, end, first message, last message)
+        self._result = None
+        self._error = None
+
+    @property
+    def running(self) -> bool:
+        """A summary is being generated"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _range(self):
+        """Messages to summarize: previous summary and older turns"""
+        messages = self.conversation.messages
+        start = 0
+        while (
+            start < len(messages)
+            and isinstance(messages[start], Mapping)
+            and messages[start]["role"] == "system"
+            and not is_summary(messages[start])
+        ):
+            start += 1
+        end = self.conversation._safe_start(len(messages) - self.keep_recent)
+        return start, end
+
+    def maybe_start(self) -> bool:
+        """
+        Start a background summary if the conversation is over the threshold.
+
+        Returns:
+            True if a summary was started
+        """
+        if self.running or self._result is not None:
+            return False
+        if self.conversation.total_tokens <= self.threshold:
+            return False
+
+        start, end = self._range()
+        # Nothing worth summarizing beyond an existing summary
+        if end - start < 2:
+            return False
+
+        messages = self.conversation.messages[start:end]
+        self._snapshot = (start, end, messages[0], messages[-1])
+        self._error = None
+        self._thread = threading.Thread(target=self._summarize, args=(messages,), daemon=True)
+        self._thread.start()
+        return True
+
+    def _summarize(self, messages):
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                temperature=0,
+                max_tokens=self.summary_tokens,
+                messages=[
+                    {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                    {"role": "user", "content": format_transcript(messages)},
+                ],
+            )
+        except Exception as e:
+            self._error = e
+            return
+        self._result = response
+
+    def apply(self) -> Optional[dict]:
+        """
+        Swap in a finished summary.
+
+        Returns:
+            None if no summary was ready, otherwise a dict with "applied"
+            (False if the history changed underneath the summary and it was
+            dropped), "input_tokens", "output_tokens" and "model" (the
+            summary call is paid for either way), plus, when applied,
+            "start", "end" (the replaced range), "message" and "tokens"
+            (the summary message and its size)
+
+        Raises:
+            Exception: The error from a failed background summary, once.
+                The next ``maybe_start()`` tries again.
+        """
+        if self.running:
+            return None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        if self._result is None:
+            return None
+
+        response, self._result = self._result, None
+        usage = response.usage
+        compacted = {
+            "applied": False,
+            "model": self.model,
+            "input_tokens": usage.prompt_tokens if usage else 0,
+            "output_tokens": usage.completion_tokens if usage else 0,
+        }
+
+        start, end, first, last = self._snapshot
+        messages = self.conversation.messages
+
+        # Drop the summary if the history changed underneath it (e.g. truncation)
+        if len(messages) < end or messages[start] is not first or messages[end - 1] is not last:
+            return compacted
+
+        message = {
+            "role": "system",
+            "content": SUMMARY_PREFIX + (response.choices[0].message.content or "").strip(),
+        }
+        compacted.update(
+            applied=True,
+            start=start,
+            end=end,
+            message=message,
+            tokens=self.conversation.replace(start, end, message),
+        )
+        return compacted
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """Exception from the last failed summary, until ``apply()`` raises it"""
+        return self._error
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until a running summary finishes (mainly for tests and demos)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# Example usage
+if __name__ == "__main__":
+    from .config import Config
+    from .mock_server import MockServer
+
+    with MockServer(latency="fixed:0.2") as server:
+        client = Config.get_openai_client(api_key="mock", base_url=server.base_url)
+        conversation = Conversation([{"role": "system", "content": "You are helpful."}])
+        compactor = ConversationCompactor(client, conversation, threshold=600, keep_recent=4)
+
+        for turn in range(30):
+            compacted = compactor.apply()
+            if compacted and compacted["applied"]:
+                print(f"  [compacted messages {compacted['start']}-{compacted['end']} "
+                      f"into {compacted['tokens']} tokens]")
+
+            conversation.add("user", f"Turn {turn}: tell me more about topic {turn}")
+            response = client.chat.completions.create(
+                model="gpt-3.5-turbo", messages=conversation.messages
+            )
+            conversation.add("assistant", response.choices[0].message.content)
+            print(f"Turn {turn:2}: {conversation.prompt_tokens:5} prompt tokens, "
+                  f"{len(conversation):2} messages")
+
+            compactor.maybe_start()
@@ -4,12 +4,19 @@ Loads environment variables and provides default settings.
 """
 
 import os
+import threading
+import weakref
 from dotenv import load_dotenv
-from pathlib import Path
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Shared API clients, keyed by (provider, api_key, base_url)
+_clients = {}
+# Async clients per event loop (their connection pools belong to one loop)
+_async_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
 
 class Config:
     """Configuration class for API keys and settings"""
@@ -21,20 +28,68 @@ class Config:
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     PINECONE_ENVIRONMENT = os.getenv("PINECONE_ENVIRONMENT")
 
+    # API endpoints (point at a local stand-in server for testing)
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+    ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL") or None
+
+    # HTTP connection pool shared by every request through a client
+    API_TIMEOUT = float(os.getenv("API_TIMEOUT", "60"))
+    API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+    API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+    API_MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "100"))
+    API_MAX_KEEPALIVE = int(os.getenv("API_MAX_KEEPALIVE", "20"))
+    API_KEEPALIVE_EXPIRY = float(os.getenv("API_KEEPALIVE_EXPIRY", "30"))
+
     # Model Settings
     MODEL_NAME = os.getenv("MODEL_NAME", "gpt-3.5-turbo")
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1000"))
+    CONTEXT_WINDOW = int(os.getenv("CONTEXT_WINDOW", "16385"))  # gpt-3.5-turbo
+    STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
 
     # Cost Tracking
     TRACK_COSTS = os.getenv("TRACK_COSTS", "true").lower() == "true"
     COST_ALERT_THRESHOLD = float(os.getenv("COST_ALERT_THRESHOLD", "10.00"))
+    COST_ALERT_ACTION = os.getenv("COST_ALERT_ACTION", "warn")  # warn, throttle, reject
+
+    # Client-side rate limits (0 = unlimited)
+    REQUESTS_PER_MINUTE = int(os.getenv("REQUESTS_PER_MINUTE", "0"))
+    TOKENS_PER_MINUTE = int(os.getenv("TOKENS_PER_MINUTE", "0"))
+
+    # Response cache (opt-in; only temperature-0 requests are cached)
+    RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "false").lower() == "true"
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.db")
+    RESPONSE_CACHE_MAX_MB = float(os.getenv("RESPONSE_CACHE_MAX_MB", "100"))
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "604800"))  # 0 = never expire
+
+    # Semantic cache (opt-in; answers paraphrased questions in the RAG project)
+    SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+
+    # Conversation session logs (project 2)
+    SESSION_DIR = os.getenv("SESSION_DIR", "sessions")
+    SESSION_COMPRESS = os.getenv("SESSION_COMPRESS", "false").lower() == "true"
+
+    # Memory compaction: summarize older turns past this many tokens (0 = off)
+    MEMORY_COMPACT_TOKENS = int(os.getenv("MEMORY_COMPACT_TOKENS", "3000"))
+    MEMORY_KEEP_RECENT = int(os.getenv("MEMORY_KEEP_RECENT", "6"))
+
+    # Tool calls (project 3): run in parallel, each with a time limit
+    TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "10"))
+    TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "8"))
+    TOOL_LIMIT = int(os.getenv("TOOL_LIMIT", "8"))  # Most tool schemas sent per request
 
     # LangSmith (Optional)
     LANGCHAIN_TRACING_V2 = os.getenv("LANGCHAIN_TRACING_V2", "false").lower() == "true"
     LANGCHAIN_API_KEY = os.getenv("LANGCHAIN_API_KEY")
     LANGCHAIN_PROJECT = os.getenv("LANGCHAIN_PROJECT", "ai-workshop")
 
+    @classmethod
+    def prompt_token_budget(cls) -> int:
+        """Tokens available for the prompt after reserving MAX_TOKENS for the reply"""
+        return cls.CONTEXT_WINDOW - cls.MAX_TOKENS
+
     @classmethod
     def validate(cls):
         """Validate that required API keys are present"""
@@ -46,19 +101,183 @@ class Config:
         return True
 
     @classmethod
-    def get_openai_client(cls):
-        """Get configured OpenAI client"""
-        from openai import OpenAI
-        cls.validate()
-        return OpenAI(api_key=cls.OPENAI_API_KEY)
+    def _http_client(cls, client_class):
+        """
+        Build an SDK's default HTTP client with the shared pool and timeout settings.
+
+        Args:
+            client_class: e.g. ``openai.DefaultHttpxClient``. Limits and
+                Timeout come from the httpx package that class is built on,
+                so this works with whatever httpx the SDK was installed with.
+        """
+        import importlib
+
+        httpx = importlib.import_module(client_class.__mro__[1].__module__.split(".")[0])
+        return client_class(
+            limits=httpx.Limits(
+                max_connections=cls.API_MAX_CONNECTIONS,
+                max_keepalive_connections=cls.API_MAX_KEEPALIVE,
+                keepalive_expiry=cls.API_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(cls.API_TIMEOUT, connect=cls.API_CONNECT_TIMEOUT),
+            follow_redirects=True,
+        )
 
     @classmethod
-    def get_anthropic_client(cls):
-        """Get configured Anthropic client"""
-        from anthropic import Anthropic
-        if not cls.ANTHROPIC_API_KEY:
+    def _cached_client(cls, cache: dict, key: tuple, build):
+        """Return the client for ``key``, building it once"""
+        client = cache.get(key)
+        if client is None:
+            with _clients_lock:
+                client = cache.get(key)
+                if client is None:
+                    client = cache[key] = build()
+        return client
+
+    @classmethod
+    def _async_cache(cls) -> dict:
+        """Client cache for the running event loop"""
+        import asyncio
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            raise RuntimeError("Async clients must be requested inside a running event loop")
+        with _clients_lock:
+            return _async_clients.setdefault(loop, {})
+
+    @classmethod
+    def _openai_args(cls, api_key, base_url) -> tuple:
+        api_key = api_key or cls.OPENAI_API_KEY
+        base_url = base_url or cls.OPENAI_BASE_URL
+        if api_key is None:
+            cls.validate()
+        return api_key, base_url
+
+    @classmethod
+    def _anthropic_args(cls, api_key, base_url) -> tuple:
+        api_key = api_key or cls.ANTHROPIC_API_KEY
+        base_url = base_url or cls.ANTHROPIC_BASE_URL
+        if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found")
-        return Anthropic(api_key=cls.ANTHROPIC_API_KEY)
+        return api_key, base_url
+
+    @classmethod
+    def get_openai_client(cls, api_key: str = None, base_url: str = None):
+        """
+        Get configured OpenAI client.
+
+        Clients are shared: every call with the same key and base URL
+        returns the same thread-safe instance, so requests reuse its
+        connection pool instead of opening new connections.
+
+        Args:
+            api_key: API key (defaults to OPENAI_API_KEY)
+            base_url: API base URL (defaults to OPENAI_BASE_URL, or the
+                official endpoint if unset)
+        """
+        api_key, base_url = cls._openai_args(api_key, base_url)
+
+        def build():
+            from openai import OpenAI, DefaultHttpxClient
+
+            return OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=cls.API_MAX_RETRIES,
+                http_client=cls._http_client(DefaultHttpxClient),
+            )
+
+        return cls._cached_client(_clients, ("openai", api_key, base_url), build)
+
+    @classmethod
+    def get_async_openai_client(cls, api_key: str = None, base_url: str = None):
+        """
+        Get configured AsyncOpenAI client (call from inside a coroutine).
+
+        Shared per event loop, key and base URL.
+        """
+        api_key, base_url = cls._openai_args(api_key, base_url)
+
+        def build():
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            return AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=cls.API_MAX_RETRIES,
+                http_client=cls._http_client(DefaultAsyncHttpxClient),
+            )
+
+        return cls._cached_client(cls._async_cache(), ("openai", api_key, base_url), build)
+
+    @classmethod
+    def get_anthropic_client(cls, api_key: str = None, base_url: str = None):
+        """
+        Get configured Anthropic client (shared per key and base URL).
+
+        Args:
+            api_key: API key (defaults to ANTHROPIC_API_KEY)
+            base_url: API base URL (defaults to ANTHROPIC_BASE_URL)
+        """
+        api_key, base_url = cls._anthropic_args(api_key, base_url)
+
+        def build():
+            from anthropic import Anthropic, DefaultHttpxClient
+
+            return Anthropic(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=cls.API_MAX_RETRIES,
+                http_client=cls._http_client(DefaultHttpxClient),
+            )
+
+        return cls._cached_client(_clients, ("anthropic", api_key, base_url), build)
+
+    @classmethod
+    def get_async_anthropic_client(cls, api_key: str = None, base_url: str = None):
+        """
+        Get configured AsyncAnthropic client (call from inside a coroutine).
+
+        Shared per event loop, key and base URL.
+        """
+        api_key, base_url = cls._anthropic_args(api_key, base_url)
+
+        def build():
+            from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+            return AsyncAnthropic(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=cls.API_MAX_RETRIES,
+                http_client=cls._http_client(DefaultAsyncHttpxClient),
+            )
+
+        return cls._cached_client(cls._async_cache(), ("anthropic", api_key, base_url), build)
+
+    @classmethod
+    def close_clients(cls):
+        """
+        Close the shared sync clients (e.g. before a worker exits).
+
+        Async clients belong to their event loop and are not touched; await
+        ``aclose_clients()`` from inside that loop instead.
+        """
+        with _clients_lock:
+            clients = list(_clients.values())
+            _clients.clear()
+        for client in clients:
+            client.close()
+
+    @classmethod
+    async def aclose_clients(cls):
+        """Close the shared async clients of the running event loop"""
+        cache = cls._async_cache()
+        with _clients_lock:
+            clients = list(cache.values())
+            cache.clear()
+        for client in clients:
+            await client.close()
 
     @classmethod
     def print_config(cls):
@@ -69,9 +288,15 @@ class Config:
         print(f"Model: {cls.MODEL_NAME}")
         print(f"Temperature: {cls.TEMPERATURE}")
         print(f"Max Tokens: {cls.MAX_TOKENS}")
+        print(f"Context Window: {cls.CONTEXT_WINDOW}")
+        print(f"Stream Responses: {cls.STREAM_RESPONSES}")
         print(f"Cost Tracking: {cls.TRACK_COSTS}")
+        print(f"Response Cache: {cls.RESPONSE_CACHE}")
+        print(f"Semantic Cache: {cls.SEMANTIC_CACHE}")
         print(f"OpenAI Key: {'✓ Set' if cls.OPENAI_API_KEY else '✗ Not Set'}")
         print(f"Anthropic Key: {'✓ Set' if cls.ANTHROPIC_API_KEY else '✗ Not Set'}")
+        if cls.OPENAI_BASE_URL:
+            print(f"OpenAI Base URL: {cls.OPENAI_BASE_URL}")
         print("=" * 50)
 
 
@@ -0,0 +1,286 @@
+"""
+Conversation history with a running token ledger.
+Counts each message once, when it is added, instead of on every turn.
+"""
+
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Iterator, List, Optional
+
+from .helpers import count_tokens
+
+# Chat format overhead for OpenAI chat models: every message is wrapped in
+# a few framing tokens, a "name" field costs one more, and every reply is
+# primed with a few tokens of its own
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+REPLY_PRIMING_TOKENS = 3
+
+
+def _as_dict(message) -> dict:
+    """Accept SDK message objects (e.g. an assistant reply with tool calls)"""
+    if isinstance(message, Mapping):
+        return message
+    return message.model_dump(exclude_none=True)
+
+
+def message_tokens(message: dict, model: str = "gpt-3.5-turbo") -> int:
+    """
+    Count the tokens a single chat message uses, including framing.
+
+    Args:
+        message: Message dictionary
+        model: Model name for tokenizer
+
+    Returns:
+        Token count
+    """
+    message = _as_dict(message)
+    tokens = TOKENS_PER_MESSAGE
+    if message.get("content"):
+        tokens += count_tokens(message["content"], model)
+    if message.get("name"):
+        tokens += TOKENS_PER_NAME + count_tokens(message["name"], model)
+    for tool_call in message.get("tool_calls") or ():
+        function = tool_call["function"]
+        tokens += count_tokens(function["name"], model)
+        tokens += count_tokens(function["arguments"], model)
+    return tokens
+
+
+class Conversation:
+    """
+    Message history that remembers each message's token count.
+
+    ``messages`` is the plain list the OpenAI client expects. Token totals
+    are kept up to date as messages are added, popped or truncated, so
+    reading them never re-tokenizes the history. A prefix sum of
+    non-system tokens lets ``truncate_to_tokens`` find the longest recent
+    suffix that fits a budget with a binary search. The sums are never
+    rebased: dropping old messages just cuts the front off the list, so
+    ``_prefix[0]`` is the running offset.
+    """
+
+    def __init__(self, messages: Optional[List[dict]] = None, model: str = "gpt-3.5-turbo"):
+        """
+        Initialize conversation.
+
+        Args:
+            messages: Initial messages, e.g. the system prompt (optional)
+            model: Model name for tokenizer
+        """
+        self.model = model
+        self.messages = []
+        self.token_counts = []
+        self.total_tokens = 0
+        self.system_tokens = 0
+        self._system_indices = []
+        # _prefix[i] - _prefix[0] = tokens of non-system messages before index i
+        self._prefix = [0]
+
+        for message in messages or []:
+            self.append(message)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.messages)
+
+    def __getitem__(self, index):
+        return self.messages[index]
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Tokens the full history costs as input, including reply priming"""
+        return self.total_tokens + REPLY_PRIMING_TOKENS
+
+    def append(self, message: dict, tokens: Optional[int] = None) -> int:
+        """
+        Add a message and count its tokens once.
+
+        Args:
+            message: Message dictionary
+            tokens: Known token count (e.g. from a saved session), skips counting
+
+        Returns:
+            Tokens used by the message
+        """
+        if tokens is None:
+            tokens = message_tokens(message, self.model)
+
+        if _as_dict(message)["role"] == "system":
+            self._system_indices.append(len(self.messages))
+            self.system_tokens += tokens
+            self._prefix.append(self._prefix[-1])
+        else:
+            self._prefix.append(self._prefix[-1] + tokens)
+
+        self.messages.append(message)
+        self.token_counts.append(tokens)
+        self.total_tokens += tokens
+        return tokens
+
+    def add(self, role: str, content: str) -> int:
+        """Add a message from a role and content; returns its token count"""
+        return self.append({"role": role, "content": content})
+
+    def pop(self) -> dict:
+        """Remove and return the last message (e.g. after a failed request)"""
+        tokens = self.token_counts.pop()
+        self.total_tokens -= tokens
+        self._prefix.pop()
+
+        if self._system_indices and self._system_indices[-1] == len(self.messages) - 1:
+            self._system_indices.pop()
+            self.system_tokens -= tokens
+
+        return self.messages.pop()
+
+    def _rebuild(self, messages: List[dict], token_counts: List[int]):
+        """Rebuild the ledger from cached counts (no re-tokenizing)"""
+        self.messages, self.token_counts = [], []
+        self.total_tokens = self.system_tokens = 0
+        self._system_indices, self._prefix = [], [0]
+
+        for message, tokens in zip(messages, token_counts):
+            if _as_dict(message)["role"] == "system":
+                self._system_indices.append(len(self.messages))
+                self.system_tokens += tokens
+                self._prefix.append(self._prefix[-1])
+            else:
+                self._prefix.append(self._prefix[-1] + tokens)
+            self.messages.append(message)
+            self.token_counts.append(tokens)
+            self.total_tokens += tokens
+
+    def replace(self, start: int, end: int, message: dict, tokens: Optional[int] = None) -> int:
+        """
+        Replace ``messages[start:end]`` with a single message (e.g. a summary).
+
+        Only the new message is tokenized; the rest of the ledger is rebuilt
+        from cached counts.
+
+        Args:
+            start: First index to replace
+            end: Index after the last one to replace
+            message: Replacement message
+            tokens: Known token count for the message, skips counting
+
+        Returns:
+            Tokens used by the new message
+        """
+        if tokens is None:
+            tokens = message_tokens(message, self.model)
+        self._rebuild(
+            self.messages[:start] + [message] + self.messages[end:],
+            self.token_counts[:start] + [tokens] + self.token_counts[end:],
+        )
+        return tokens
+
+    def _safe_start(self, start: int) -> int:
+        """Move a cut point forward so it never orphans tool results"""
+        while start < len(self.messages) and _as_dict(self.messages[start])["role"] in (
+            "tool",
+            "system",
+        ):
+            start += 1
+        return start
+
+    def _keep_from(self, start: int):
+        """
+        Keep system messages plus every message from ``start`` on.
+
+        Cuts the dropped range out of each list in place; kept entries
+        (including their prefix sums) are not recomputed.
+        """
+        start = self._safe_start(start)
+        # System messages before the cut are kept and move to the front
+        kept = bisect_left(self._system_indices, start)
+        system = self._system_indices[:kept]
+        if start == kept:
+            return  # Nothing but system messages before the cut
+
+        self.total_tokens -= self._prefix[start] - self._prefix[0]
+        self.messages[:start] = [self.messages[i] for i in system]
+        self.token_counts[:start] = [self.token_counts[i] for i in system]
+        self._prefix[:start + 1] = [self._prefix[start]] * (kept + 1)
+        self._system_indices = list(range(kept)) + [
+            i - start + kept for i in self._system_indices[kept:]
+        ]
+
+    def _last_turn(self) -> int:
+        """Index of the newest message that can start a history on its own"""
+        index = len(self.messages) - 1
+        # Tool results need the assistant message that called the tools
+        while index > 0 and _as_dict(self.messages[index])["role"] == "tool":
+            index -= 1
+        return max(index, 0)
+
+    def truncate(self, max_messages: int = 20):
+        """
+        Drop old messages, keeping system messages and the most recent ones.
+        Same policy as helpers.truncate_messages, without recounting tokens.
+
+        Args:
+            max_messages: Maximum number of messages to keep
+        """
+        if len(self.messages) <= max_messages:
+            return
+
+        system = set(self._system_indices)
+        other = [i for i in range(len(self.messages)) if i not in system]
+        keep_recent = max(max_messages - len(system), 0)
+
+        self._keep_from(other[-keep_recent] if keep_recent else len(self.messages))
+
+    def truncate_to_tokens(self, max_tokens: int) -> int:
+        """
+        Drop old messages until the prompt fits in ``max_tokens``.
+
+        Keeps every system message and the longest recent suffix of the
+        conversation that fits, found by binary search over the prefix sums.
+        Never starts the suffix on a tool result whose tool call was dropped.
+        The newest message (with the tool call its results belong to) is
+        always kept, even if it alone is over the budget, so a request is
+        never sent without the user's latest turn.
+
+        Args:
+            max_tokens: Token budget for the whole prompt
+
+        Returns:
+            Number of messages dropped
+        """
+        if self.prompt_tokens <= max_tokens:
+            return 0
+
+        available = max_tokens - REPLY_PRIMING_TOKENS - self.system_tokens
+        total = self._prefix[-1]
+        # First index whose suffix of non-system tokens fits in ``available``
+        start = bisect_left(self._prefix, total - max(available, 0))
+        start = min(start, self._last_turn())
+
+        before = len(self.messages)
+        self._keep_from(start)
+        return before - len(self.messages)
+
+
+# Example usage
+if __name__ == "__main__":
+    conversation = Conversation([{"role": "system", "content": "You are helpful"}])
+
+    for i in range(25):
+        conversation.add("user", f"Message {i}")
+        conversation.add("assistant", f"Reply {i}")
+
+    print(f"Messages: {len(conversation)}")
+    print(f"Prompt tokens: {conversation.prompt_tokens}")
+
+    conversation.truncate(max_messages=10)
+    print(f"\nAfter truncation: {len(conversation)} messages")
+    print(f"Prompt tokens: {conversation.prompt_tokens}")
+
+    conversation.add("user", "A long pasted document... " * 10)
+    dropped = conversation.truncate_to_tokens(150)
+    print(f"\nAfter fitting 150 tokens: dropped {dropped}, kept {len(conversation)}")
+    print(f"Prompt tokens: {conversation.prompt_tokens}")
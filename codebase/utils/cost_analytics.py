@@ -0,0 +1,328 @@
+"""
+Cost analytics for AI API usage.
+Columnar NumPy view of the cost log for percentiles and what-if repricing.
+"""
+
+from array import array
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+from .cost_tracker import PRICING
+
+# Fields that percentiles can be computed over
+FIELDS = ("input_tokens", "output_tokens", "total_tokens", "cost")
+
+# Rows converted per chunk while loading (bounds temporary Python objects)
+CHUNK_SIZE = 100_000
+
+GroupBy = Union[None, str, Sequence[str]]
+
+
+class _Categories:
+    """Encode repeated strings as small integer codes"""
+
+    def __init__(self):
+        self.codes = {}
+        self.labels = []
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+
+
+class CostFrame:
+    """
+    Cost log held as NumPy columns.
+
+    Models and projects are categorical-encoded: each row stores an int32
+    code, and ``models`` / ``projects`` hold the labels. All aggregates
+    run as vectorized operations over the columns.
+    """
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        model_codes: np.ndarray,
+        models: list,
+        project_codes: np.ndarray,
+        projects: list,
+        input_tokens: np.ndarray,
+        output_tokens: np.ndarray,
+        cost: np.ndarray,
+    ):
+        self.timestamps = timestamps
+        self.model_codes = model_codes
+        self.models = models
+        self.project_codes = project_codes
+        self.projects = projects
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cost = cost
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> "CostFrame":
+        """
+        Build a frame from log entries in a single streaming pass.
+
+        Args:
+            entries: Cost log entries (any iterable, e.g. tracker.iter_costs())
+
+        Returns:
+            CostFrame
+        """
+        models, projects = _Categories(), _Categories()
+        model_codes, project_codes = array("i"), array("i")
+        input_tokens, output_tokens = array("q"), array("q")
+        cost = array("d")
+        timestamp_chunks, pending = [], []
+
+        for entry in entries:
+            model_codes.append(models.encode(entry["model"]))
+            project_codes.append(projects.encode(entry.get("project")))
+            input_tokens.append(entry["input_tokens"])
+            output_tokens.append(entry["output_tokens"])
+            cost.append(entry["cost"])
+            pending.append(entry["timestamp"])
+
+            if len(pending) >= CHUNK_SIZE:
+                timestamp_chunks.append(np.array(pending, dtype="datetime64[us]"))
+                pending = []
+
+        timestamp_chunks.append(np.array(pending, dtype="datetime64[us]"))
+
+        return cls(
+            timestamps=np.concatenate(timestamp_chunks),
+            model_codes=np.frombuffer(model_codes, dtype=np.int32),
+            models=models.labels,
+            project_codes=np.frombuffer(project_codes, dtype=np.int32),
+            projects=projects.labels,
+            input_tokens=np.frombuffer(input_tokens, dtype=np.int64),
+            output_tokens=np.frombuffer(output_tokens, dtype=np.int64),
+            cost=np.frombuffer(cost, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_tracker(cls, tracker, **filters) -> "CostFrame":
+        """
+        Build a frame from a CostTracker's log.
+
+        Args:
+            tracker: CostTracker instance
+            **filters: start, end, project, model (see CostTracker.iter_costs)
+        """
+        return cls.from_entries(tracker.iter_costs(**filters))
+
+    def _column(self, field: str) -> np.ndarray:
+        if field not in FIELDS:
+            raise ValueError(f"field must be one of {FIELDS}")
+        if field == "total_tokens":
+            return self.input_tokens + self.output_tokens
+        return getattr(self, field)
+
+    def _groups(self, by: GroupBy):
+        """Return (codes, labels) for a grouping; codes index into labels"""
+        if by is None:
+            return np.zeros(len(self), dtype=np.int64), [None]
+        if isinstance(by, str):
+            by = (by,)
+
+        codes = np.zeros(len(self), dtype=np.int64)
+        labels = [()]
+        for field in by:
+            if field == "model":
+                field_codes, field_labels = self.model_codes, self.models
+            elif field == "project":
+                field_codes, field_labels = self.project_codes, self.projects
+            else:
+                raise ValueError("Group by 'model' and/or 'project'")
+            codes = codes * len(field_labels) + field_codes
+            labels = [label + (value,) for label in labels for value in field_labels]
+
+        if len(by) == 1:
+            labels = [label[0] for label in labels]
+        return codes, labels
+
+    def totals(self, by: GroupBy = "model", cost: Optional[np.ndarray] = None) -> dict:
+        """
+        Request count, tokens and cost per group.
+
+        Args:
+            by: "model", "project", ("model", "project") or None for overall
+            cost: Alternative cost column, e.g. from reprice() (optional)
+
+        Returns:
+            Dictionary mapping group label to totals
+        """
+        cost = self.cost if cost is None else cost
+        codes, labels = self._groups(by)
+        n = len(labels)
+
+        requests = np.bincount(codes, minlength=n)
+        costs = np.bincount(codes, weights=cost, minlength=n)
+        inputs = np.bincount(codes, weights=self.input_tokens, minlength=n)
+        outputs = np.bincount(codes, weights=self.output_tokens, minlength=n)
+
+        return {
+            labels[i]: {
+                "requests": int(requests[i]),
+                "input_tokens": int(inputs[i]),
+                "output_tokens": int(outputs[i]),
+                "cost": float(costs[i]),
+            }
+            for i in np.flatnonzero(requests)
+        }
+
+    def percentiles(
+        self,
+        field: str = "cost",
+        by: GroupBy = "model",
+        q: Sequence[float] = (50, 95, 99),
+    ) -> dict:
+        """
+        Per-request percentiles of a field per group.
+
+        Args:
+            field: One of FIELDS
+            by: "model", "project", ("model", "project") or None for overall
+            q: Percentiles to compute
+
+        Returns:
+            Dictionary mapping group label to {"p50": ..., "p95": ..., ...}
+        """
+        values = self._column(field)
+        codes, labels = self._groups(by)
+
+        # Sort once by (group, value); each group is then a contiguous run
+        order = np.lexsort((values, codes))
+        sorted_codes = codes[order]
+        sorted_values = values[order]
+        bounds = np.searchsorted(sorted_codes, np.arange(len(labels) + 1))
+
+        result = {}
+        for i, label in enumerate(labels):
+            lo, hi = bounds[i], bounds[i + 1]
+            if lo == hi:
+                continue
+            points = np.percentile(sorted_values[lo:hi], q)
+            result[label] = {f"p{p:g}": float(v) for p, v in zip(q, points)}
+        return result
+
+    def reprice(
+        self, pricing: Optional[dict] = None, model_map: Optional[dict] = None
+    ) -> np.ndarray:
+        """
+        Recompute every request's cost under different prices or models.
+
+        Args:
+            pricing: Pricing table like PRICING (defaults to current PRICING)
+            model_map: Replace models, e.g. {"gpt-4": "gpt-3.5-turbo"}
+
+        Returns:
+            Cost column under the scenario
+        """
+        pricing = PRICING if pricing is None else pricing
+        model_map = model_map or {}
+        fallback = pricing.get("gpt-3.5-turbo", PRICING["gpt-3.5-turbo"])
+
+        input_prices = np.empty(len(self.models))
+        output_prices = np.empty(len(self.models))
+        for code, model in enumerate(self.models):
+            prices = pricing.get(model_map.get(model, model), fallback)
+            input_prices[code] = prices["input"]
+            output_prices[code] = prices["output"]
+
+        return (
+            self.input_tokens / 1000 * input_prices[self.model_codes]
+            + self.output_tokens / 1000 * output_prices[self.model_codes]
+        )
+
+    def what_if(
+        self,
+        pricing: Optional[dict] = None,
+        model_map: Optional[dict] = None,
+        by: GroupBy = "model",
+    ) -> dict:
+        """
+        Compare logged cost with a repricing scenario.
+
+        Args:
+            pricing: Pricing table for the scenario (optional)
+            model_map: Model substitutions for the scenario (optional)
+            by: Grouping for the comparison
+
+        Returns:
+            Dictionary mapping group label to actual cost, scenario cost
+            and the difference
+        """
+        scenario = self.reprice(pricing, model_map)
+        actual = self.totals(by)
+        projected = self.totals(by, cost=scenario)
+
+        return {
+            label: {
+                "actual_cost": actual[label]["cost"],
+                "scenario_cost": projected[label]["cost"],
+                "difference": projected[label]["cost"] - actual[label]["cost"],
+            }
+            for label in actual
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    # Synthetic log: one million requests
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    model_names = ["gpt-3.5-turbo", "gpt-4", "claude-3-sonnet"]
+    project_names = ["project-1", "project-2", "project-4"]
+
+    model_codes = rng.integers(0, len(model_names), n).astype(np.int32)
+    input_tokens = rng.lognormal(6, 1, n).astype(np.int64)
+    output_tokens = rng.lognormal(5, 1, n).astype(np.int64)
+    frame = CostFrame(
+        timestamps=np.datetime64("2025-11-01") + np.arange(n).astype("timedelta64[s]"),
+        model_codes=model_codes,
+        models=model_names,
+        project_codes=rng.integers(0, len(project_names), n).astype(np.int32),
+        projects=project_names,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost=np.zeros(n),
+    )
+    frame.cost = frame.reprice()
+
+    start = time.perf_counter()
+    cost_percentiles = frame.percentiles("cost", by="model")
+    token_percentiles = frame.percentiles("total_tokens", by=("model", "project"))
+    scenario = frame.what_if(model_map={"gpt-4": "gpt-3.5-turbo"})
+    elapsed = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"COST ANALYTICS ({n:,} requests, {elapsed:.2f}s)")
+    print("=" * 60)
+
+    print("\nCost per request by model:")
+    for model, points in cost_percentiles.items():
+        print(f"  {model}: " + ", ".join(f"{k}=${v:.4f}" for k, v in points.items()))
+
+    print("\nTotal tokens per request (gpt-4 by project):")
+    for (model, project), points in token_percentiles.items():
+        if model == "gpt-4":
+            print(f"  {project}: " + ", ".join(f"{k}={v:,.0f}" for k, v in points.items()))
+
+    print("\nWhat if gpt-4 traffic moved to gpt-3.5-turbo:")
+    for model, result in scenario.items():
+        print(
+            f"  {model}: ${result['actual_cost']:,.2f} -> "
+            f"${result['scenario_cost']:,.2f} ({result['difference']:+,.2f})"
+        )
+    print("=" * 60)
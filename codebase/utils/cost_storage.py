@@ -0,0 +1,953 @@
+"""
+Storage backends for the cost tracker.
+Keeps file I/O out of CostTracker so the log format can be swapped.
+"""
+
+import atexit
+import heapq
+import json
+import mmap
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:
+    # Advisory locks are POSIX-only; on Windows locking is a no-op
+    fcntl = None
+
+Timestamp = Union[str, datetime, None]
+
+# Columns that query results can be grouped by
+GROUP_BY_FIELDS = ("model", "project", "day")
+
+
+def _as_iso(value: Timestamp) -> Optional[str]:
+    """Normalize a datetime or ISO string to the format stored in the log"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _empty_totals() -> dict:
+    return {"cost": 0.0, "requests": 0, "input_tokens": 0, "output_tokens": 0}
+
+
+@contextmanager
+def _file_lock(lock_file: Path):
+    """Hold an exclusive advisory lock on ``lock_file`` for the block"""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_file, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _serialize(entries: Iterable[dict]) -> str:
+    return "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries)
+
+
+def _append_lines(f, data: str):
+    """Append to a file opened in ``ab+`` mode, closing off any torn last line"""
+    f.seek(0, os.SEEK_END)
+    if f.tell():
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            data = "\n" + data
+    f.write(data.encode())
+
+
+class _FileStorage:
+    """Shared query logic for storages that scan entries in Python"""
+
+    def __init__(self, log_file: str):
+        self.log_file = Path(log_file)
+
+    def iter_entries(self) -> Iterator[dict]:
+        raise NotImplementedError
+
+    def load(self) -> list:
+        """Load all entries into a list"""
+        return list(self.iter_entries())
+
+    def iter_range(self, start: Optional[str] = None, end: Optional[str] = None):
+        """Yield entries in ``[start, end)``; subclasses may stop early"""
+        for entry in self.iter_entries():
+            timestamp = entry["timestamp"]
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp >= end:
+                continue
+            yield entry
+
+    def iter_matching(
+        self,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        project: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream entries matching the filters without loading the log.
+
+        Args:
+            start: Include entries at or after this time (optional)
+            end: Include entries before this time (optional)
+            project: Only this project (optional)
+            model: Only this model (optional)
+        """
+        for entry in self.iter_range(_as_iso(start), _as_iso(end)):
+            if project is not None and entry.get("project") != project:
+                continue
+            if model is not None and entry["model"] != model:
+                continue
+            yield entry
+
+    def query(
+        self,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        project: Optional[str] = None,
+        model: Optional[str] = None,
+        group_by: Optional[str] = None,
+    ) -> dict:
+        """
+        Aggregate cost over entries matching the filters.
+
+        Args:
+            start: Include entries at or after this time (optional)
+            end: Include entries before this time (optional)
+            project: Only this project (optional)
+            model: Only this model (optional)
+            group_by: One of GROUP_BY_FIELDS (optional)
+
+        Returns:
+            Totals dict, or a dict of totals keyed by group when grouping
+        """
+        if group_by is not None and group_by not in GROUP_BY_FIELDS:
+            raise ValueError(f"group_by must be one of {GROUP_BY_FIELDS}")
+
+        groups = {}
+
+        for entry in self.iter_matching(start, end, project, model):
+            if group_by == "day":
+                key = entry["timestamp"][:10]
+            elif group_by is not None:
+                key = entry.get(group_by)
+            else:
+                key = None
+
+            totals = groups.get(key)
+            if totals is None:
+                totals = groups[key] = _empty_totals()
+            totals["cost"] += entry["cost"]
+            totals["requests"] += 1
+            totals["input_tokens"] += entry["input_tokens"]
+            totals["output_tokens"] += entry["output_tokens"]
+
+        if group_by is None:
+            return groups.get(None, _empty_totals())
+        return groups
+
+
+class JSONStorage(_FileStorage):
+    """Legacy storage: the whole log is one JSON array, rewritten on save"""
+
+    def iter_entries(self) -> Iterator[dict]:
+        """Yield every logged entry"""
+        if self.log_file.exists():
+            with open(self.log_file, "r") as f:
+                yield from json.load(f)
+
+    def append(self, entry: dict, costs: Optional[list] = None):
+        """
+        Persist a new entry.
+
+        A JSON array cannot be appended to in place, so the full history
+        (``costs``, which already includes ``entry``) is rewritten.
+        """
+        self.rewrite(costs if costs is not None else self.load() + [entry])
+
+    def append_many(self, entries: Iterable[dict]):
+        """Persist several new entries (rewrites the full history)"""
+        self.rewrite(self.load() + list(entries))
+
+    def rewrite(self, entries: Iterable[dict]):
+        """Replace the log with the given entries"""
+        with open(self.log_file, "w") as f:
+            json.dump(list(entries), f, indent=2)
+
+    def clear(self):
+        """Remove all entries"""
+        self.rewrite([])
+
+
+class JSONLStorage(_FileStorage):
+    """Append-only storage: one JSON object per line"""
+
+    def __init__(self, log_file: str, lock: bool = False, use_mmap: bool = True):
+        """
+        Initialize JSON Lines storage.
+
+        Args:
+            log_file: Path to the ``.jsonl`` log
+            lock: Take an advisory lock (``<log_file>.lock``) around every
+                write, so several processes can share one log file
+            use_mmap: Scan time ranges through mmap, binary-searching for the
+                start of the window
+        """
+        super().__init__(log_file)
+        self.lock = lock
+        self.lock_file = self.log_file.with_name(self.log_file.name + ".lock")
+        self.use_mmap = use_mmap
+        # A single writer appends in time order; interleaved processes may not
+        self.time_ordered = not lock
+
+    @contextmanager
+    def _locked(self):
+        if self.lock:
+            with _file_lock(self.lock_file):
+                yield
+        else:
+            yield
+
+    def iter_entries(self) -> Iterator[dict]:
+        """Yield every logged entry, skipping a torn trailing line"""
+        if not self.log_file.exists():
+            return
+        with open(self.log_file, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a partial last line
+                    continue
+
+    def iter_range(self, start: Optional[str] = None, end: Optional[str] = None):
+        """
+        Yield entries in ``[start, end)``, relying on append (time) order.
+
+        Seeks straight to ``start`` with a binary search over the mmapped
+        file and stops reading at the first entry at or after ``end``, so
+        only the requested window is parsed.
+        """
+        if not self.time_ordered:
+            yield from super().iter_range(start, end)
+            return
+        if not self.log_file.exists() or self.log_file.stat().st_size == 0:
+            return
+
+        if not self.use_mmap:
+            for entry in self.iter_entries():
+                timestamp = entry["timestamp"]
+                if end is not None and timestamp >= end:
+                    return
+                if start is None or timestamp >= start:
+                    yield entry
+            return
+
+        with open(self.log_file, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            offset = self._find_start(mm, start) if start is not None else 0
+            size = len(mm)
+
+            while offset < size:
+                newline = mm.find(b"\n", offset)
+                if newline == -1:
+                    newline = size
+                line = mm[offset:newline]
+                offset = newline + 1
+
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                timestamp = entry["timestamp"]
+                if end is not None and timestamp >= end:
+                    return
+                if start is None or timestamp >= start:
+                    yield entry
+
+    @staticmethod
+    def _find_start(mm: mmap.mmap, start: str) -> int:
+        """Byte offset of the first line whose timestamp is >= ``start``"""
+        lo, hi = 0, len(mm)
+
+        # Invariant: lo is a line start and every line before it is < start
+        while lo < hi:
+            mid = (lo + hi) // 2
+            newline = mm.rfind(b"\n", lo, mid)
+            line_start = newline + 1 if newline != -1 else lo
+            line_end = mm.find(b"\n", line_start)
+            if line_end == -1:
+                line_end = len(mm)
+
+            try:
+                before = json.loads(mm[line_start:line_end])["timestamp"] < start
+            except (json.JSONDecodeError, KeyError):
+                before = False
+
+            if before:
+                lo = line_end + 1
+            else:
+                hi = line_start
+
+        return lo
+
+    def append(self, entry: dict, costs: Optional[list] = None):
+        """Append a single entry; cost is independent of log size"""
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[dict]):
+        """Append several entries with a single write"""
+        data = _serialize(entries)
+        if not data:
+            return
+        with self._locked(), open(self.log_file, "ab+") as f:
+            _append_lines(f, data)
+
+    def rewrite(self, entries: Iterable[dict]):
+        """Atomically replace the log with the given entries"""
+        with self._locked():
+            self._write_atomic(entries)
+
+    def _write_atomic(self, entries: Iterable[dict]):
+        tmp_file = self.log_file.with_name(f"{self.log_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(tmp_file, self.log_file)
+
+    def clear(self):
+        """Remove all entries"""
+        self.rewrite([])
+
+
+class ShardedJSONLStorage(_FileStorage):
+    """
+    Multi-process storage: every process appends to its own shard file.
+
+    For ``cost_log.jsonl`` each process writes
+    ``cost_log.shard-<host>-<pid>.jsonl`` next to it, so writers never
+    contend. Reads see the consolidated log plus all shards, and
+    ``merge_shards`` folds the shards back into the consolidated log.
+    """
+
+    def _shard_glob(self) -> str:
+        return f"{self.log_file.stem}.shard-*{self.log_file.suffix}"
+
+    def shard_path(self) -> Path:
+        """Shard file for the current process (re-evaluated after fork)"""
+        name = f"{self.log_file.stem}.shard-{socket.gethostname()}-{os.getpid()}"
+        return self.log_file.with_name(name + self.log_file.suffix)
+
+    def shard_files(self) -> list:
+        """All shard files currently waiting to be merged"""
+        return sorted(self.log_file.parent.glob(self._shard_glob()))
+
+    def iter_entries(self) -> Iterator[dict]:
+        """Yield entries from the consolidated log and all shards, by time"""
+        streams = [JSONLStorage(self.log_file).iter_entries()]
+        streams += [JSONLStorage(p).iter_entries() for p in self.shard_files()]
+        return heapq.merge(*streams, key=lambda e: e["timestamp"])
+
+    def iter_range(self, start: Optional[str] = None, end: Optional[str] = None):
+        """Yield entries in ``[start, end)``, scanning each file's window only"""
+        streams = [JSONLStorage(self.log_file).iter_range(start, end)]
+        streams += [JSONLStorage(p).iter_range(start, end) for p in self.shard_files()]
+        return heapq.merge(*streams, key=lambda e: e["timestamp"])
+
+    def append(self, entry: dict, costs: Optional[list] = None):
+        """Append a single entry to this process's shard"""
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[dict]):
+        """Append several entries to this process's shard"""
+        data = _serialize(entries)
+        if not data:
+            return
+
+        path = self.shard_path()
+        while True:
+            with open(path, "ab+") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    # A merge may have renamed the shard since we opened it
+                    try:
+                        current = os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+                    except FileNotFoundError:
+                        current = False
+                    if not current:
+                        continue
+                _append_lines(f, data)
+                return
+
+    def rewrite(self, entries: Iterable[dict]):
+        """Replace the consolidated log and drop all shards"""
+        with _file_lock(self.log_file.with_name(self.log_file.name + ".lock")):
+            for shard in self.shard_files():
+                shard.unlink()
+            JSONLStorage(self.log_file)._write_atomic(entries)
+
+    def clear(self):
+        """Remove all entries"""
+        self.rewrite([])
+
+
+def merge_shards(log_file: str) -> int:
+    """
+    Merge per-process shards into the consolidated log.
+
+    Safe to run while workers are still logging: each shard is renamed
+    before it is read, so new entries go to a fresh shard, and the merge
+    waits for any in-flight write to the renamed file. Entries are merged
+    in timestamp order without loading the whole log into memory.
+
+    Args:
+        log_file: Path to the consolidated ``.jsonl`` log
+
+    Returns:
+        Number of shard entries merged
+    """
+    storage = ShardedJSONLStorage(log_file)
+    base = JSONLStorage(log_file, lock=True)
+    merging_glob = storage._shard_glob() + ".merging"
+
+    with _file_lock(base.lock_file):
+        for shard in storage.shard_files():
+            os.replace(shard, shard.with_name(shard.name + ".merging"))
+
+        # Includes leftovers from an interrupted merge
+        merging = sorted(storage.log_file.parent.glob(merging_glob))
+
+        # Wait for writers that opened a shard before it was renamed
+        if fcntl is not None:
+            for path in merging:
+                with open(path, "a") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+
+        merged = 0
+
+        def counted(entries):
+            nonlocal merged
+            for entry in entries:
+                merged += 1
+                yield entry
+
+        streams = [base.iter_entries()]
+        streams += [counted(JSONLStorage(p).iter_entries()) for p in merging]
+        base._write_atomic(heapq.merge(*streams, key=lambda e: e["timestamp"]))
+
+        for path in merging:
+            path.unlink()
+
+    return merged
+
+
+class SQLiteStorage:
+    """
+    SQLite storage with indexed timestamp, model and project columns.
+
+    Aggregates and range queries run in SQL, so nothing has to be loaded
+    into memory to answer them.
+    """
+
+    COLUMNS = (
+        "timestamp",
+        "model",
+        "input_tokens",
+        "output_tokens",
+        "cost",
+        "project",
+        "notes",
+    )
+
+    def __init__(self, log_file: str, batch_size: int = 1):
+        """
+        Initialize SQLite storage.
+
+        Args:
+            log_file: Path to the SQLite database
+            batch_size: Buffer this many appends before inserting them in one
+                transaction (1 commits every append immediately)
+        """
+        self.log_file = Path(log_file)
+        self.batch_size = batch_size
+        self._pending = []
+        # The connection is shared with background writers, so serialize use
+        self._lock = threading.RLock()
+
+        # The timeout lets concurrent writer processes wait for each other
+        self.conn = sqlite3.connect(
+            str(self.log_file), timeout=30, check_same_thread=False
+        )
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS costs (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                model TEXT NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost REAL NOT NULL,
+                project TEXT,
+                notes TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_costs_timestamp ON costs (timestamp);
+            CREATE INDEX IF NOT EXISTS idx_costs_model ON costs (model, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_costs_project ON costs (project, timestamp);
+            """
+        )
+
+    def iter_entries(self) -> Iterator[dict]:
+        """Yield every logged entry in insertion order"""
+        columns = ", ".join(self.COLUMNS)
+        with self._lock:
+            self.flush()
+            cursor = self.conn.execute(f"SELECT {columns} FROM costs ORDER BY id")
+            rows = cursor.fetchmany(1000)
+        while rows:
+            yield from (dict(row) for row in rows)
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+
+    def load(self) -> list:
+        """Load all entries into a list"""
+        return list(self.iter_entries())
+
+    def append(self, entry: dict, costs: Optional[list] = None):
+        """Queue an entry, inserting once ``batch_size`` entries are pending"""
+        with self._lock:
+            self._pending.append(entry)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def append_many(self, entries: Iterable[dict]):
+        """Insert several entries in a single transaction"""
+        rows = [tuple(e.get(c) for c in self.COLUMNS) for e in entries]
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO costs ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+
+    def flush(self):
+        """Insert any pending entries"""
+        with self._lock:
+            if self._pending:
+                pending, self._pending = self._pending, []
+                self.append_many(pending)
+
+    def rewrite(self, entries: Iterable[dict]):
+        """Replace the log with the given entries"""
+        with self._lock:
+            self._pending = []
+            with self.conn:
+                self.conn.execute("DELETE FROM costs")
+            self.append_many(entries)
+
+    def clear(self):
+        """Remove all entries"""
+        self.rewrite([])
+
+    def close(self):
+        """Flush pending entries and close the connection"""
+        with self._lock:
+            self.flush()
+            self.conn.close()
+
+    @staticmethod
+    def _where(start, end, project, model):
+        """Build a WHERE clause and parameters for the query filters"""
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(_as_iso(start))
+        if end is not None:
+            conditions.append("timestamp < ?")
+            params.append(_as_iso(end))
+        if project is not None:
+            conditions.append("project = ?")
+            params.append(project)
+        if model is not None:
+            conditions.append("model = ?")
+            params.append(model)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def iter_matching(
+        self,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        project: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """Stream entries matching the filters using the indexes"""
+        where, params = self._where(start, end, project, model)
+        columns = ", ".join(self.COLUMNS)
+
+        with self._lock:
+            self.flush()
+            cursor = self.conn.execute(
+                f"SELECT {columns} FROM costs {where} ORDER BY timestamp", params
+            )
+            rows = cursor.fetchmany(1000)
+        while rows:
+            yield from (dict(row) for row in rows)
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+
+    def summarize(self) -> dict:
+        """
+        Compute running-total rollups with SQL aggregates.
+
+        Returns:
+            Dictionary with total_cost, total_requests, total_tokens and
+            cost_by_model / cost_by_project / cost_by_day mappings
+        """
+        def grouped(expression):
+            return dict(
+                self.conn.execute(
+                    f"SELECT {expression}, SUM(cost) FROM costs GROUP BY 1"
+                ).fetchall()
+            )
+
+        with self._lock:
+            self.flush()
+            totals = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(cost), 0), "
+                "COALESCE(SUM(input_tokens + output_tokens), 0) FROM costs"
+            ).fetchone()
+
+            return {
+                "total_requests": totals[0],
+                "total_cost": totals[1],
+                "total_tokens": totals[2],
+                "cost_by_model": grouped("model"),
+                "cost_by_project": grouped("project"),
+                "cost_by_day": grouped("substr(timestamp, 1, 10)"),
+            }
+
+    def query(
+        self,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        project: Optional[str] = None,
+        model: Optional[str] = None,
+        group_by: Optional[str] = None,
+    ) -> dict:
+        """
+        Aggregate cost over entries matching the filters, in SQL.
+
+        Args:
+            start: Include entries at or after this time (optional)
+            end: Include entries before this time (optional)
+            project: Only this project (optional)
+            model: Only this model (optional)
+            group_by: One of GROUP_BY_FIELDS (optional)
+
+        Returns:
+            Totals dict, or a dict of totals keyed by group when grouping
+        """
+        if group_by is not None and group_by not in GROUP_BY_FIELDS:
+            raise ValueError(f"group_by must be one of {GROUP_BY_FIELDS}")
+
+        where, params = self._where(start, end, project, model)
+        key = {
+            None: "NULL",
+            "model": "model",
+            "project": "project",
+            "day": "substr(timestamp, 1, 10)",
+        }[group_by]
+
+        with self._lock:
+            self.flush()
+            rows = self.conn.execute(
+                f"SELECT {key} AS grp, COALESCE(SUM(cost), 0), COUNT(*), "
+                f"COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0) "
+                f"FROM costs {where} GROUP BY grp",
+                params,
+            ).fetchall()
+
+        groups = {
+            row[0]: {
+                "cost": row[1],
+                "requests": row[2],
+                "input_tokens": row[3],
+                "output_tokens": row[4],
+            }
+            for row in rows
+            if row[2]
+        }
+
+        if group_by is None:
+            return groups.get(None, _empty_totals())
+        return groups
+
+
+# Queue markers for BufferedStorage's writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+class BufferedStorage:
+    """
+    Wrap a storage backend so appends are written by a background thread.
+
+    ``append`` only puts the entry on a thread-safe queue. A writer thread
+    drains the queue in batches of up to ``batch_size`` entries, or whatever
+    has arrived after ``flush_interval`` seconds, and hands each batch to
+    the wrapped backend's ``append_many``. Pending entries are flushed at
+    interpreter exit.
+    """
+
+    def __init__(self, backend, batch_size: int = 100, flush_interval: float = 1.0):
+        """
+        Initialize buffered storage.
+
+        Args:
+            backend: Storage backend to write batches to
+            batch_size: Maximum entries per write
+            flush_interval: Maximum seconds an entry waits before being written
+        """
+        self.backend = backend
+        self.log_file = backend.log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="cost-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        # Expose optional backend capabilities such as summarize()
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def _run(self):
+        """Writer thread: collect batches from the queue and write them"""
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            while (
+                len(items) < self.batch_size
+                and items[-1] is not _FLUSH
+                and items[-1] is not _STOP
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            entries = [item for item in items if item is not _FLUSH and item is not _STOP]
+            if entries:
+                try:
+                    self.backend.append_many(entries)
+                except Exception as e:
+                    print(f"Warning: failed to write {len(entries)} cost entries: {e}")
+
+            for _ in items:
+                self._queue.task_done()
+
+            if items[-1] is _STOP:
+                return
+
+    def append(self, entry: dict, costs: Optional[list] = None):
+        """Queue an entry for the writer thread"""
+        if self._closed:
+            self.backend.append_many([entry])
+        else:
+            self._queue.put(entry)
+
+    def append_many(self, entries: Iterable[dict]):
+        """Queue several entries for the writer thread"""
+        for entry in entries:
+            self.append(entry)
+
+    def flush(self):
+        """Block until every queued entry has been written"""
+        if not self._closed:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        if hasattr(self.backend, "flush"):
+            self.backend.flush()
+
+    def iter_entries(self) -> Iterator[dict]:
+        """Yield every logged entry, including ones still queued"""
+        self.flush()
+        return self.backend.iter_entries()
+
+    @property
+    def summarize(self):
+        """
+        The backend's ``summarize``, writing queued entries first.
+
+        A property rather than a method so ``hasattr(storage, "summarize")``
+        stays False for backends that can't aggregate.
+        """
+        summarize = self.backend.summarize
+
+        def flushed_summarize() -> dict:
+            self.flush()
+            return summarize()
+
+        return flushed_summarize
+
+    def load(self) -> list:
+        """Load all entries into a list"""
+        self.flush()
+        return self.backend.load()
+
+    def iter_matching(self, **filters) -> Iterator[dict]:
+        """Stream matching entries after writing queued entries"""
+        self.flush()
+        return self.backend.iter_matching(**filters)
+
+    def query(self, **filters) -> dict:
+        """Run a backend query after writing queued entries"""
+        self.flush()
+        return self.backend.query(**filters)
+
+    def rewrite(self, entries: Iterable[dict]):
+        """Replace the log with the given entries"""
+        self.flush()
+        self.backend.rewrite(entries)
+
+    def clear(self):
+        """Remove all entries"""
+        self.flush()
+        self.backend.clear()
+
+    def close(self):
+        """Write queued entries and stop the writer thread"""
+        if self._closed:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._closed = True
+        atexit.unregister(self.close)
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+
+def get_storage(log_file: str, multiprocess: Optional[str] = None):
+    """
+    Pick a storage backend from the log file extension.
+
+    Args:
+        log_file: Path to the cost log (``.json`` uses the legacy format,
+            ``.db``/``.sqlite``/``.sqlite3`` use SQLite, anything else JSONL)
+        multiprocess: How several processes share a JSONL log: "shard"
+            (one file per process, merged later) or "lock" (advisory file
+            lock around appends). SQLite handles this natively.
+
+    Returns:
+        Storage backend instance
+    """
+    if multiprocess not in (None, "shard", "lock"):
+        raise ValueError("multiprocess must be None, 'shard' or 'lock'")
+
+    suffix = Path(log_file).suffix
+    if suffix in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteStorage(log_file)
+    if suffix == ".json":
+        if multiprocess:
+            raise ValueError("Multi-process logging needs a .jsonl or .db log file")
+        return JSONStorage(log_file)
+    if multiprocess == "shard":
+        return ShardedJSONLStorage(log_file)
+    return JSONLStorage(log_file, lock=multiprocess == "lock")
+
+
+def migrate_json_log(json_file: str, jsonl_file: Optional[str] = None) -> int:
+    """
+    Convert a legacy ``cost_log.json`` array into another log format.
+
+    Args:
+        json_file: Path to the existing JSON array log
+        jsonl_file: Destination path (defaults to the same name with
+            ``.jsonl``; a ``.db`` path migrates into SQLite)
+
+    Returns:
+        Number of entries migrated
+    """
+    source = JSONStorage(json_file)
+    dest_file = Path(jsonl_file or Path(json_file).with_suffix(".jsonl"))
+
+    if dest_file.exists():
+        raise FileExistsError(f"{dest_file} already exists, not overwriting")
+
+    dest = get_storage(dest_file)
+    entries = source.load()
+    dest.rewrite(entries)
+    return len(entries)
+
+
+# Command-line entry point
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cost log maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="Convert a cost_log.json array into JSON Lines or SQLite"
+    )
+    migrate_parser.add_argument("json_file")
+    migrate_parser.add_argument("jsonl_file", nargs="?")
+
+    merge_parser = subparsers.add_parser(
+        "merge", help="Merge per-process shards into the consolidated log"
+    )
+    merge_parser.add_argument("log_file", nargs="?", default="cost_log.jsonl")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        count = migrate_json_log(args.json_file, args.jsonl_file)
+        print(f"Migrated {count} entries")
+
+    elif args.command == "merge":
+        count = merge_shards(args.log_file)
+        print(f"Merged {count} shard entries into {args.log_file}")
+
+        storage = JSONLStorage(args.log_file)
+        totals = storage.query()
+        print(f"Total: {totals['requests']} requests, ${totals['cost']:.4f}")
+        for group_by in ("model", "project"):
+            print(f"\nCost by {group_by.title()}:")
+            for key, group in storage.query(group_by=group_by).items():
+                print(f"  {key}: ${group['cost']:.4f} ({group['requests']} requests)")
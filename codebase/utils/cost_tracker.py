@@ -3,11 +3,13 @@ Cost tracking utility for AI API usage.
 Helps monitor and control spending on LLM APIs.
 """
 
-import json
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
+from .cost_storage import BufferedStorage, Timestamp, get_storage, migrate_json_log
+
 
 # Pricing per 1000 tokens (as of November 2025)
 PRICING = {
@@ -21,30 +23,171 @@ PRICING = {
 }
 
 
+class CostRollup:
+    """Running totals of logged costs, updated one entry at a time"""
+
+    def __init__(self, entries=()):
+        """
+        Initialize rollup.
+
+        Args:
+            entries: Existing log entries to fold in (single pass)
+        """
+        self.total_cost = 0.0
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.cost_by_model = {}
+        self.cost_by_project = {}
+        self.cost_by_day = {}
+
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> "CostRollup":
+        """
+        Build a rollup from totals a storage backend already aggregated.
+
+        Args:
+            summary: Output of a storage backend's ``summarize()``
+        """
+        rollup = cls()
+        rollup.total_cost = summary["total_cost"]
+        rollup.total_requests = summary["total_requests"]
+        rollup.total_tokens = summary["total_tokens"]
+        rollup.cost_by_model = dict(summary["cost_by_model"])
+        rollup.cost_by_project = dict(summary["cost_by_project"])
+        rollup.cost_by_day = dict(summary["cost_by_day"])
+        return rollup
+
+    def add(self, entry: dict):
+        """Fold a single log entry into the totals"""
+        cost = entry["cost"]
+        model = entry["model"]
+        project = entry.get("project", "Unknown")
+        day = entry["timestamp"][:10]
+
+        self.total_cost += cost
+        self.total_requests += 1
+        self.total_tokens += entry["input_tokens"] + entry["output_tokens"]
+        self.cost_by_model[model] = self.cost_by_model.get(model, 0) + cost
+        self.cost_by_project[project] = self.cost_by_project.get(project, 0) + cost
+        self.cost_by_day[day] = self.cost_by_day.get(day, 0) + cost
+
+
+def _migrate_legacy_log(log_file: Path):
+    """
+    Carry an old ``cost_log.json`` over to the new ``.jsonl`` log, once.
+
+    The default log used to be a JSON array; without this, upgrading would
+    start a fresh log and lose the history and budget totals. The old file
+    is left in place.
+    """
+    legacy = log_file.with_suffix(".json")
+    if log_file.suffix != ".jsonl" or log_file.exists() or not legacy.exists():
+        return
+    try:
+        count = migrate_json_log(str(legacy), str(log_file))
+    except FileExistsError:
+        return  # Another process migrated it first
+    print(f"Migrated {count} cost log entries from {legacy} to {log_file}")
+
+
 class CostTracker:
     """Track and analyze API costs"""
 
-    def __init__(self, log_file: str = "cost_log.json"):
+    def __init__(
+        self,
+        log_file: str = "cost_log.jsonl",
+        storage=None,
+        buffered: bool = False,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        multiprocess: Optional[str] = None,
+        lazy: bool = False,
+        budget_guard=None,
+    ):
         """
         Initialize cost tracker.
 
         Args:
-            log_file: Path to JSON file for cost logging
+            log_file: Path to the cost log. ``.jsonl`` files are append-only,
+                ``.db`` files use SQLite, and ``.json`` files use the legacy
+                format and are rewritten on every request.
+            storage: Storage backend instance (optional, overrides the
+                backend picked from ``log_file``)
+            buffered: Write log entries from a background thread so
+                ``log_request`` never waits on disk
+            batch_size: Maximum entries per background write (buffered mode)
+            flush_interval: Maximum seconds before queued entries are written
+                (buffered mode)
+            multiprocess: "shard" to give each process its own log shard
+                (merge with ``python -m utils.cost_storage merge``), or
+                "lock" to append to one file under an advisory lock
+            lazy: Open without reading the log. Stats are computed by
+                streaming the log on first use, and the full history is
+                only loaded if ``costs`` is accessed.
+            budget_guard: BudgetGuard to feed with every logged cost
+                (optional). It is seeded with the last day of the log.
         """
-        self.log_file = Path(log_file)
-        self.costs = self._load_log()
+        if storage is None:
+            _migrate_legacy_log(Path(log_file))
+            storage = get_storage(log_file, multiprocess=multiprocess)
+        if buffered:
+            storage = BufferedStorage(storage, batch_size, flush_interval)
+
+        self.storage = storage
+        self.log_file = Path(self.storage.log_file)
+        self._costs = None
+        self._rollup = None
+        self._lock = threading.RLock()
+        self.budget_guard = budget_guard
+
+        if budget_guard is not None:
+            budget_guard.seed(self.iter_costs(start=datetime.now() - timedelta(days=1)))
+
+        if not lazy and not hasattr(self.storage, "summarize"):
+            # Load the history and build rollups in the same pass
+            self._costs = self._load_log()
+            self._rollup = CostRollup(self._costs)
+
+    @property
+    def rollup(self) -> CostRollup:
+        """Running totals (built on first access if not loaded yet)"""
+        with self._lock:
+            if self._rollup is None:
+                if hasattr(self.storage, "summarize"):
+                    # Backends that aggregate natively never load the history
+                    self._rollup = CostRollup.from_summary(self.storage.summarize())
+                elif self._costs is not None:
+                    self._rollup = CostRollup(self._costs)
+                else:
+                    self._rollup = CostRollup(self.storage.iter_entries())
+            return self._rollup
+
+    @rollup.setter
+    def rollup(self, value: CostRollup):
+        self._rollup = value
+
+    @property
+    def costs(self) -> list:
+        """Full list of log entries (loaded on first access)"""
+        with self._lock:
+            if self._costs is None:
+                self._costs = self._load_log()
+            return self._costs
+
+    @costs.setter
+    def costs(self, value: list):
+        self._costs = value
 
     def _load_log(self) -> list:
         """Load existing cost log"""
-        if self.log_file.exists():
-            with open(self.log_file, "r") as f:
-                return json.load(f)
-        return []
+        return self.storage.load()
 
     def _save_log(self):
-        """Save cost log to file"""
-        with open(self.log_file, "w") as f:
-            json.dump(self.costs, f, indent=2)
+        """Save the full cost log to file"""
+        self.storage.rewrite(self.costs)
 
     def calculate_cost(
         self, model: str, input_tokens: int, output_tokens: int
@@ -93,18 +236,26 @@ class CostTracker:
         """
         cost = self.calculate_cost(model, input_tokens, output_tokens)
 
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "model": model,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "cost": cost,
-            "project": project,
-            "notes": notes,
-        }
+        with self._lock:
+            # Timestamp under the lock so the log stays in time order
+            log_entry = {
+                "timestamp": datetime.now().isoformat(),
+                "model": model,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost": cost,
+                "project": project,
+                "notes": notes,
+            }
+
+            if self._costs is not None:
+                self._costs.append(log_entry)
+            if self._rollup is not None:
+                self._rollup.add(log_entry)
+            self.storage.append(log_entry, self._costs)
 
-        self.costs.append(log_entry)
-        self._save_log()
+        if self.budget_guard is not None:
+            self.budget_guard.record(cost, project)
 
         return cost
 
@@ -118,54 +269,108 @@ class CostTracker:
         Returns:
             Total cost in dollars
         """
-        if project:
-            filtered_costs = [c for c in self.costs if c.get("project") == project]
-        else:
-            filtered_costs = self.costs
+        with self._lock:
+            if project:
+                return self.rollup.cost_by_project.get(project, 0)
+
+            return self.rollup.total_cost
+
+    def query_costs(
+        self,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        project: Optional[str] = None,
+        model: Optional[str] = None,
+        group_by: Optional[str] = None,
+    ) -> dict:
+        """
+        Get cost totals for a time range, optionally grouped.
+
+        Runs in SQL on the SQLite backend and as a single scan otherwise.
+
+        Args:
+            start: Include requests at or after this time (datetime or ISO string)
+            end: Include requests before this time (datetime or ISO string)
+            project: Filter by project name (optional)
+            model: Filter by model name (optional)
+            group_by: "model", "project" or "day" (optional)
+
+        Returns:
+            Dict with cost, requests, input_tokens and output_tokens, or a
+            dict of those keyed by group when ``group_by`` is set
+
+        Example:
+            tracker.query_costs(start, end, project="project-4", group_by="model")
+        """
+        return self.storage.query(
+            start=start, end=end, project=project, model=model, group_by=group_by
+        )
+
+    def iter_costs(
+        self,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        project: Optional[str] = None,
+        model: Optional[str] = None,
+    ):
+        """
+        Stream log entries matching the filters with bounded memory.
+
+        On JSONL logs the scan jumps to ``start`` and stops at ``end``
+        instead of reading the whole file.
+
+        Args:
+            start: Include requests at or after this time (datetime or ISO string)
+            end: Include requests before this time (datetime or ISO string)
+            project: Filter by project name (optional)
+            model: Filter by model name (optional)
+
+        Yields:
+            Log entry dictionaries
+        """
+        return self.storage.iter_matching(
+            start=start, end=end, project=project, model=model
+        )
+
+    def get_daily_costs(self) -> dict:
+        """
+        Get total cost per day.
 
-        return sum(c["cost"] for c in filtered_costs)
+        Returns:
+            Dictionary mapping ISO date (YYYY-MM-DD) to cost in dollars
+        """
+        with self._lock:
+            return dict(self.rollup.cost_by_day)
 
     def get_stats(self) -> dict:
         """
         Get usage statistics.
 
+        Served from running totals, so the cost does not grow with history.
+
         Returns:
             Dictionary with various stats
         """
-        if not self.costs:
-            return {
-                "total_cost": 0,
-                "total_requests": 0,
-                "total_tokens": 0,
-                "avg_cost_per_request": 0,
-            }
+        with self._lock:
+            rollup = self.rollup
 
-        total_cost = sum(c["cost"] for c in self.costs)
-        total_requests = len(self.costs)
-        total_tokens = sum(
-            c["input_tokens"] + c["output_tokens"] for c in self.costs
-        )
+            if not rollup.total_requests:
+                return {
+                    "total_cost": 0,
+                    "total_requests": 0,
+                    "total_tokens": 0,
+                    "avg_cost_per_request": 0,
+                }
 
-        # Cost by model
-        cost_by_model = {}
-        for entry in self.costs:
-            model = entry["model"]
-            cost_by_model[model] = cost_by_model.get(model, 0) + entry["cost"]
-
-        # Cost by project
-        cost_by_project = {}
-        for entry in self.costs:
-            project = entry.get("project", "Unknown")
-            cost_by_project[project] = cost_by_project.get(project, 0) + entry["cost"]
-
-        return {
-            "total_cost": total_cost,
-            "total_requests": total_requests,
-            "total_tokens": total_tokens,
-            "avg_cost_per_request": total_cost / total_requests if total_requests > 0 else 0,
-            "cost_by_model": cost_by_model,
-            "cost_by_project": cost_by_project,
-        }
+            return {
+                "total_cost": rollup.total_cost,
+                "total_requests": rollup.total_requests,
+                "total_tokens": rollup.total_tokens,
+                "avg_cost_per_request": rollup.total_cost / rollup.total_requests,
+                "cost_by_model": dict(rollup.cost_by_model),
+                "cost_by_project": dict(rollup.cost_by_project),
+                "cost_by_day": dict(rollup.cost_by_day),
+            }
 
     def print_summary(self):
         """Print cost summary"""
@@ -190,13 +395,44 @@ class CostTracker:
 
         print("=" * 60)
 
+    def flush(self):
+        """Write any buffered log entries to storage"""
+        if hasattr(self.storage, "flush"):
+            self.storage.flush()
+
+    def close(self):
+        """Flush buffered entries and release the storage backend"""
+        if hasattr(self.storage, "close"):
+            self.storage.close()
+
     def reset(self):
         """Clear all cost logs"""
-        self.costs = []
-        self._save_log()
+        with self._lock:
+            self._costs = []
+            self.rollup = CostRollup()
+            self.storage.clear()
         print("Cost log has been reset.")
 
 
+_default_tracker = None
+_default_tracker_lock = threading.Lock()
+
+
+def get_default_tracker() -> CostTracker:
+    """
+    Get the shared, buffered tracker used by track_cost.
+
+    Returns:
+        CostTracker writing to the default log file
+    """
+    global _default_tracker
+
+    with _default_tracker_lock:
+        if _default_tracker is None:
+            _default_tracker = CostTracker(buffered=True, lazy=True)
+        return _default_tracker
+
+
 # Convenience function
 def track_cost(
     model: str,
@@ -213,13 +449,14 @@ def track_cost(
         input_tokens: Input token count
         output_tokens: Output token count
         project: Project name (optional)
-        tracker: Existing tracker instance (optional)
+        tracker: Existing tracker instance (optional, defaults to a shared
+            buffered tracker that is safe to use from multiple threads)
 
     Returns:
         Cost in dollars
     """
     if tracker is None:
-        tracker = CostTracker()
+        tracker = get_default_tracker()
 
     return tracker.log_request(model, input_tokens, output_tokens, project)
 
@@ -227,7 +464,7 @@ def track_cost(
 # Example usage
 if __name__ == "__main__":
     # Create tracker
-    tracker = CostTracker("example_cost_log.json")
+    tracker = CostTracker("example_cost_log.jsonl")
 
     # Log some example requests
     print("Logging example API requests...\n")
@@ -3,68 +3,248 @@ Helper functions for AI Workshop projects.
 Common utilities used across different projects.
 """
 
+import math
 import time
 import functools
-from typing import Callable, Any
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Any, Iterable, List, Optional
+
+# Number of (encoding, text) token counts remembered by count_tokens
+TOKEN_CACHE_SIZE = 4096
+
+# ANSI color codes for terminal output
+COLORS = {
+    "green": "\033[92m",
+    "red": "\033[91m",
+    "yellow": "\033[93m",
+    "blue": "\033[94m",
+    "cyan": "\033[96m",
+    "reset": "\033[0m",
+}
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait, from a Retry-After header"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form, e.g. "Wed, 21 Oct 2015 07:28:00 GMT"
+        from email.utils import parsedate_to_datetime
+
+        retry_at = parsedate_to_datetime(value)
+        return max(retry_at.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(
+    attempt: int,
+    error: Exception,
+    initial_delay: float,
+    exponential_base: float,
+    max_delay: float,
+    jitter: bool,
+) -> float:
+    """Full-jitter exponential delay, or the server's Retry-After if longer"""
+    delay = min(max_delay, initial_delay * exponential_base**attempt)
+    if jitter:
+        delay = random.uniform(0, delay)
+
+    hint = _retry_after(error)
+    if hint is not None:
+        delay = max(delay, min(hint, max_delay))
+    return delay
 
 
 def retry_with_exponential_backoff(
-    func: Callable,
+    func: Optional[Callable] = None,
     initial_delay: float = 1,
     exponential_base: float = 2,
     max_retries: int = 5,
     errors: tuple = (Exception,),
+    max_delay: float = 60,
+    jitter: bool = True,
+    limiter=None,
+    estimate_tokens: Optional[Callable[..., int]] = None,
+    verbose: bool = False,
 ):
     """
     Retry a function with exponential backoff.
     Useful for handling rate limits and temporary failures.
 
+    Delays use full jitter (a random wait up to the exponential delay) so
+    concurrent workers don't retry in lockstep, and a Retry-After header
+    on the error is honored. Works as ``@retry_with_exponential_backoff``
+    or ``@retry_with_exponential_backoff(limiter=..., max_retries=3)``.
+
     Args:
         func: Function to retry
         initial_delay: Initial delay in seconds
         exponential_base: Multiplier for delay
         max_retries: Maximum number of retry attempts
         errors: Tuple of exceptions to catch
+        max_delay: Longest single wait in seconds
+        jitter: Randomize delays (full jitter)
+        limiter: RateLimiter to acquire from before every attempt (optional)
+        estimate_tokens: Called with the function's arguments to estimate
+            the tokens each attempt uses, for the limiter (optional)
+        verbose: Print each failed attempt
 
     Returns:
         Decorated function with retry logic
     """
+    if func is None:
+        return functools.partial(
+            retry_with_exponential_backoff,
+            initial_delay=initial_delay,
+            exponential_base=exponential_base,
+            max_retries=max_retries,
+            errors=errors,
+            max_delay=max_delay,
+            jitter=jitter,
+            limiter=limiter,
+            estimate_tokens=estimate_tokens,
+            verbose=verbose,
+        )
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        delay = initial_delay
-        last_exception = None
+        tokens = estimate_tokens(*args, **kwargs) if estimate_tokens else 0
 
         for attempt in range(max_retries):
+            if limiter is not None:
+                limiter.acquire(tokens)
             try:
                 return func(*args, **kwargs)
             except errors as e:
-                last_exception = e
                 if attempt == max_retries - 1:
-                    raise last_exception
-
-                print(f"Attempt {attempt + 1} failed: {e}")
-                print(f"Retrying in {delay} seconds...")
+                    raise
+
+                delay = _backoff_delay(
+                    attempt, e, initial_delay, exponential_base, max_delay, jitter
+                )
+                if verbose:
+                    print(f"Attempt {attempt + 1} failed: {e}")
+                    print(f"Retrying in {delay:.2f} seconds...")
                 time.sleep(delay)
-                delay *= exponential_base
 
-        raise last_exception
+    return wrapper
+
+
+def async_retry_with_exponential_backoff(
+    func: Optional[Callable] = None,
+    initial_delay: float = 1,
+    exponential_base: float = 2,
+    max_retries: int = 5,
+    errors: tuple = (Exception,),
+    max_delay: float = 60,
+    jitter: bool = True,
+    limiter=None,
+    estimate_tokens: Optional[Callable[..., int]] = None,
+    verbose: bool = False,
+):
+    """
+    Asyncio version of retry_with_exponential_backoff for coroutine
+    functions. Waits with asyncio.sleep and ``limiter.acquire_async``, so a
+    limiter can be shared between threaded and async callers.
+
+    Args:
+        Same as retry_with_exponential_backoff
+
+    Returns:
+        Decorated coroutine function with retry logic
+    """
+    if func is None:
+        return functools.partial(
+            async_retry_with_exponential_backoff,
+            initial_delay=initial_delay,
+            exponential_base=exponential_base,
+            max_retries=max_retries,
+            errors=errors,
+            max_delay=max_delay,
+            jitter=jitter,
+            limiter=limiter,
+            estimate_tokens=estimate_tokens,
+            verbose=verbose,
+        )
+
+    import asyncio
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        tokens = estimate_tokens(*args, **kwargs) if estimate_tokens else 0
+
+        for attempt in range(max_retries):
+            if limiter is not None:
+                await limiter.acquire_async(tokens)
+            try:
+                return await func(*args, **kwargs)
+            except errors as e:
+                if attempt == max_retries - 1:
+                    raise
+
+                delay = _backoff_delay(
+                    attempt, e, initial_delay, exponential_base, max_delay, jitter
+                )
+                if verbose:
+                    print(f"Attempt {attempt + 1} failed: {e}")
+                    print(f"Retrying in {delay:.2f} seconds...")
+                await asyncio.sleep(delay)
 
     return wrapper
 
 
-def truncate_messages(messages: list, max_messages: int = 20) -> list:
+def truncate_messages(
+    messages: list,
+    max_messages: int = 20,
+    max_tokens: Optional[int] = None,
+    model: str = "gpt-3.5-turbo",
+) -> list:
     """
     Truncate message history to prevent context overflow.
     Keeps system message and most recent messages.
 
+    With ``max_tokens`` the limit is a token budget instead of a message
+    count: the longest recent run of messages that fits is kept (see
+    Conversation.truncate_to_tokens). A tool result is never kept without
+    the assistant message that requested it.
+
     Args:
         messages: List of message dictionaries
         max_messages: Maximum number of messages to keep
+        max_tokens: Token budget for the whole prompt (optional)
+        model: Model name for tokenizer (token budget mode)
 
     Returns:
         Truncated message list
     """
+    if max_tokens is not None:
+        from .conversation import Conversation
+
+        conversation = Conversation(messages, model=model)
+        conversation.truncate_to_tokens(max_tokens)
+        return conversation.messages
+
     if len(messages) <= max_messages:
         return messages
 
@@ -73,16 +253,94 @@ def truncate_messages(messages: list, max_messages: int = 20) -> list:
     other_messages = [msg for msg in messages if msg["role"] != "system"]
 
     # Keep most recent messages
-    recent_messages = other_messages[-(max_messages - len(system_messages)) :]
+    keep_recent = max(max_messages - len(system_messages), 0)
+    recent_messages = other_messages[-keep_recent:] if keep_recent else []
+
+    # Don't start on tool results whose tool call was cut off
+    while recent_messages and recent_messages[0]["role"] == "tool":
+        recent_messages.pop(0)
 
     return system_messages + recent_messages
 
 
+class _LRUCache:
+    """Small thread-safe LRU mapping"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def setdefault(self, key, value):
+        """Return the stored value for key, storing ``value`` if there is none"""
+        with self._lock:
+            stored = self._data.get(key)
+            if stored is None:
+                stored = self._data[key] = value
+                if len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            self._data.move_to_end(key)
+            return stored
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_token_counts = _LRUCache(TOKEN_CACHE_SIZE)
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model: str = "gpt-3.5-turbo"):
+    """
+    Get the tiktoken encoding for a model, cached per model.
+
+    Args:
+        model: Model name for tokenizer
+
+    Returns:
+        tiktoken Encoding, or None if tiktoken is not installed
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # If model not found, use cl100k_base (GPT-4 encoding)
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _cache_key(encoding_name: str, text: str) -> tuple:
+    # Key by digest so the cache does not keep whole messages alive
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16)
+    return encoding_name, digest.digest()
+
+
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     """
     Estimate token count for a given text.
     Uses tiktoken for accurate counting.
 
+    Encoders are cached per model and counts are memoized by content hash,
+    so recounting the same message is a dictionary lookup.
+
     Args:
         text: Input text
         model: Model name for tokenizer
@@ -90,20 +348,52 @@ def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     Returns:
         Estimated token count
     """
-    try:
-        import tiktoken
-
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
-    except ImportError:
+    encoding = get_encoding(model)
+    if encoding is None:
         # Fallback: rough estimation (1 token ≈ 4 characters)
         return len(text) // 4
-    except Exception:
-        # If model not found, use cl100k_base (GPT-4 encoding)
-        import tiktoken
 
-        encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
+    key = _cache_key(encoding.name, text)
+    count = _token_counts.get(key)
+    if count is None:
+        count = len(encoding.encode(text))
+        _token_counts.put(key, count)
+    return count
+
+
+def count_tokens_many(texts: Iterable[str], model: str = "gpt-3.5-turbo") -> List[int]:
+    """
+    Count tokens for several texts at once.
+    Cache misses are encoded together with tiktoken's batch encoder.
+
+    Args:
+        texts: Input texts
+        model: Model name for tokenizer
+
+    Returns:
+        Token counts in the same order as ``texts``
+    """
+    texts = list(texts)
+    encoding = get_encoding(model)
+    if encoding is None:
+        return [len(text) // 4 for text in texts]
+
+    keys = [_cache_key(encoding.name, text) for text in texts]
+    counts = [_token_counts.get(key) for key in keys]
+
+    missing = [i for i, count in enumerate(counts) if count is None]
+    if missing:
+        encoded = encoding.encode_batch([texts[i] for i in missing])
+        for i, tokens in zip(missing, encoded):
+            counts[i] = len(tokens)
+            _token_counts.put(keys[i], counts[i])
+
+    return counts
+
+
+def clear_token_cache():
+    """Forget memoized token counts (encoders stay cached)"""
+    _token_counts.clear()
 
 
 def format_cost(cost: float) -> str:
@@ -132,17 +422,8 @@ def print_colored(text: str, color: str = "green"):
         text: Text to print
         color: Color name (green, red, yellow, blue, cyan)
     """
-    colors = {
-        "green": "\033[92m",
-        "red": "\033[91m",
-        "yellow": "\033[93m",
-        "blue": "\033[94m",
-        "cyan": "\033[96m",
-        "reset": "\033[0m",
-    }
-
-    color_code = colors.get(color, colors["reset"])
-    print(f"{color_code}{text}{colors['reset']}")
+    color_code = COLORS.get(color, COLORS["reset"])
+    print(f"{color_code}{text}{COLORS['reset']}")
 
 
 def create_system_prompt(
@@ -197,23 +478,52 @@ def create_system_prompt(
     return " ".join(prompt_parts)
 
 
-def streaming_print(text_generator, prefix: str = "AI: "):
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Values in ascending order
+        q: Percentile (0-100)
+
+    Returns:
+        The value at the percentile (0.0 for an empty list)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def streaming_print(text_generator, prefix: str = "AI: ", color: Optional[str] = None) -> str:
     """
     Print streaming text with a prefix.
 
     Args:
-        text_generator: Generator that yields text chunks
+        text_generator: Generator that yields text chunks (e.g. a ChatStream)
         prefix: Prefix to print before text
+        color: Color name for the text (optional, see print_colored)
+
+    Returns:
+        Full text
     """
+    if color is not None:
+        print(COLORS.get(color, COLORS["reset"]), end="")
     print(prefix, end="", flush=True)
-    full_text = ""
 
-    for chunk in text_generator:
-        print(chunk, end="", flush=True)
-        full_text += chunk
-
-    print()  # New line at the end
-    return full_text
+    # Collect chunks and join once; += on a str would copy the text so far
+    # for every chunk
+    chunks = []
+    try:
+        for chunk in text_generator:
+            print(chunk, end="", flush=True)
+            chunks.append(chunk)
+    finally:
+        if color is not None:
+            print(COLORS["reset"], end="")
+        print()  # New line at the end
+
+    return "".join(chunks)
 
 
 # Example usage
@@ -0,0 +1,488 @@
+"""
+Offline OpenAI-compatible mock server for tests and benchmarks.
+Deterministic chat, tool calls, streaming and embeddings with simulated latency and errors.
+
+Run it and point the projects at it:
+
+    python -m utils.mock_server --port 8000 --latency lognormal:0.3,0.5
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=mock python chatbot.py
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+# Vocabulary for generated replies
+WORDS = (
+    "the model answers questions about tokens context prompts embeddings agents "
+    "tools retrieval costs latency streaming memory budget chunks vectors search "
+    "results summary example helpful simple because therefore however and with "
+    "for each when this that can will should data system user response request"
+).split()
+
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Build a latency sampler (seconds) from a spec string.
+
+    Specs: "fixed:S", "uniform:LOW,HIGH", "normal:MEAN,STD",
+    "exponential:MEAN" and "lognormal:MEDIAN,SIGMA".
+
+    Args:
+        spec: Distribution spec
+        rng: Random source (shared, so runs are reproducible with a seed)
+
+    Returns:
+        Function returning a delay in seconds
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+
+    if kind == "fixed":
+        (delay,) = values or [0.0]
+        return lambda: delay
+    if kind == "uniform":
+        low, high = values
+        return lambda: rng.uniform(low, high)
+    if kind == "normal":
+        mean, std = values
+        return lambda: max(rng.gauss(mean, std), 0.0)
+    if kind == "exponential":
+        (mean,) = values
+        return lambda: rng.expovariate(1 / mean) if mean > 0 else 0.0
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def _digest(*parts) -> bytes:
+    return hashlib.blake2b(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8"), digest_size=16
+    ).digest()
+
+
+def _approx_tokens(text: str) -> int:
+    """Rough token count (no tokenizer download needed)"""
+    return max(len(text) // 4, 1) if text else 0
+
+
+def _content_text(content) -> str:
+    """Flatten string or multi-part message content"""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def generate_text(seed: bytes, max_tokens: Optional[int], words: int = 40) -> List[str]:
+    """Deterministic reply, returned as the list of stream deltas"""
+    rng = random.Random(seed)
+    count = min(words, max_tokens) if max_tokens else words
+    deltas = [rng.choice(WORDS) for _ in range(count)]
+    if deltas:
+        deltas[0] = deltas[0].capitalize()
+        deltas[-1] += "."
+    return [word if i == 0 else " " + word for i, word in enumerate(deltas)]
+
+
+def embed_text(text: str, dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS) -> List[float]:
+    """
+    Deterministic unit vector for a text.
+
+    Words are hashed into buckets (feature hashing), so texts that share
+    words get similar vectors and similarity search behaves sensibly.
+    """
+    vector = [0.0] * dimensions
+    for word in re.findall(r"\w+", text.lower()):
+        h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+        vector[h % dimensions] += 1.0 if (h >> 63) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _choose_tool(tools: list, tool_choice, text: str) -> Optional[dict]:
+    """Pick the tool whose name or description best matches the user text"""
+    functions = [t["function"] for t in tools if t.get("type") == "function"]
+    if not functions or tool_choice == "none":
+        return None
+    if isinstance(tool_choice, dict):
+        name = tool_choice["function"]["name"]
+        return next((f for f in functions if f["name"] == name), None)
+
+    words = set(re.findall(r"\w+", text.lower()))
+
+    def score(function):
+        keywords = set(re.findall(r"[a-z]+", function["name"].lower()))
+        keywords |= set(re.findall(r"\w+", function.get("description", "").lower()))
+        return len(words & keywords)
+
+    best = max(functions, key=score)
+    if score(best) == 0 and tool_choice != "required":
+        return None
+    return best
+
+
+def _tool_arguments(function: dict, text: str) -> dict:
+    """Fill a function's parameters from the user's message"""
+    properties = function.get("parameters", {}).get("properties", {})
+    required = function.get("parameters", {}).get("required", list(properties)[:1])
+    numbers = re.findall(r"-?\d+(?:\.\d+)?", text)
+    capitalized = re.findall(r"\b[A-Z][a-z]+\b", text)
+
+    arguments = {}
+    for name in required:
+        kind = properties.get(name, {}).get("type", "string")
+        if kind in ("number", "integer"):
+            value = float(numbers.pop(0)) if numbers else 1
+            arguments[name] = int(value) if kind == "integer" else value
+        elif kind == "boolean":
+            arguments[name] = True
+        elif name in ("location", "city") and capitalized:
+            arguments[name] = capitalized[-1]
+        elif name == "expression" and numbers:
+            expressions = re.findall(r"[\d.(][\d.\s+\-*/()]*", text)
+            arguments[name] = max(expressions, key=len).strip()
+        else:
+            arguments[name] = text
+    return arguments
+
+
+class MockState:
+    """Settings and counters shared by all request handlers"""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        token_latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        reply_words: int = 40,
+        seed: int = 0,
+    ):
+        """
+        Initialize mock state.
+
+        Args:
+            latency: Time-to-first-byte distribution (see parse_latency)
+            token_latency: Delay between streamed chunks
+            error_rate: Fraction of requests that fail
+            error_status: Status for failures (429 sends Retry-After)
+            reply_words: Words per generated reply
+            seed: Seed for latency and error sampling
+        """
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.latency = parse_latency(latency, self.rng)
+        self.token_latency = parse_latency(token_latency, self.rng)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.reply_words = reply_words
+        self.requests = Counter()
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def sample(self, sampler: Callable[[], float]) -> float:
+        with self._lock:
+            return sampler()
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def count(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] += 1
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Handle OpenAI-style /v1 requests"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so client connection pools are exercised
+    state: MockState = None
+
+    def log_message(self, format, *args):
+        pass  # Quiet by default
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, headers: Optional[dict] = None):
+        error_type = "rate_limit_exceeded" if status == 429 else "server_error"
+        self._send_json(
+            status,
+            {"error": {"message": message, "type": error_type, "code": error_type}},
+            headers,
+        )
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(
+                200,
+                {"object": "list", "data": [{"id": "mock-model", "object": "model"}]},
+            )
+        else:
+            self._send_error(404, f"Unknown path {self.path}")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "Invalid JSON body")
+            return
+
+        path = self.path.rstrip("/")
+        routes = {
+            "/v1/chat/completions": self._chat,
+            "/v1/embeddings": self._embeddings,
+        }
+        route = routes.get(path)
+        if route is None:
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+
+        state = self.state
+        state.count(path)
+        time.sleep(state.sample(state.latency))
+
+        if state.should_fail():
+            headers = {"Retry-After": "1"} if state.error_status == 429 else None
+            self._send_error(state.error_status, "Simulated failure", headers)
+            return
+
+        route(body)
+
+    def _chat(self, body: dict):
+        messages = body.get("messages", [])
+        model = body.get("model", "mock-model")
+        seed = _digest(self.state.seed, model, messages, body.get("tools"))
+        created = int(time.time())
+        completion_id = "chatcmpl-" + seed.hex()[:24]
+
+        prompt_tokens = sum(
+            4 + _approx_tokens(_content_text(m.get("content"))) for m in messages
+        )
+        last = messages[-1] if messages else {}
+        user_text = _content_text(last.get("content"))
+
+        tool = None
+        if body.get("tools") and last.get("role") == "user":
+            tool = _choose_tool(body["tools"], body.get("tool_choice", "auto"), user_text)
+
+        if tool is not None:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "call_" + seed.hex()[:24],
+                        "type": "function",
+                        "function": {
+                            "name": tool["name"],
+                            "arguments": json.dumps(_tool_arguments(tool, user_text)),
+                        },
+                    }
+                ],
+            }
+            deltas = []
+            finish_reason = "tool_calls"
+            completion_tokens = _approx_tokens(message["tool_calls"][0]["function"]["arguments"]) + 5
+        else:
+            deltas = generate_text(seed, body.get("max_tokens"), self.state.reply_words)
+            message = {"role": "assistant", "content": "".join(deltas)}
+            finish_reason = "stop"
+            completion_tokens = len(deltas)
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            self._stream_chat(completion_id, created, model, message, deltas, finish_reason,
+                              usage if include_usage else None)
+            return
+
+        self._send_json(
+            200,
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}
+                ],
+                "usage": usage,
+            },
+        )
+
+    def _stream_chat(self, completion_id, created, model, message, deltas, finish_reason, usage):
+        """Send a chat completion as server-sent events"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta, finish=None, chunk_usage=None, choices=True):
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": (
+                    [{"index": 0, "delta": delta, "finish_reason": finish, "logprobs": None}]
+                    if choices
+                    else []
+                ),
+            }
+            if chunk_usage is not None:
+                event["usage"] = chunk_usage
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            chunk({"role": "assistant", "content": ""})
+            if message.get("tool_calls"):
+                call = message["tool_calls"][0]
+                chunk({"tool_calls": [{"index": 0, **call}]})
+            for delta in deltas:
+                time.sleep(self.state.sample(self.state.token_latency))
+                chunk({"content": delta})
+            chunk({}, finish=finish_reason)
+            if usage is not None:
+                chunk(None, chunk_usage=usage, choices=False)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client stopped reading
+
+    def _embeddings(self, body: dict):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = body.get("dimensions") or DEFAULT_EMBEDDING_DIMENSIONS
+
+        data = [
+            {"object": "embedding", "index": i, "embedding": embed_text(str(text), dimensions)}
+            for i, text in enumerate(inputs)
+        ]
+        tokens = sum(_approx_tokens(str(text)) for text in inputs)
+        self._send_json(
+            200,
+            {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "mock-embedding"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            },
+        )
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    # The default listen backlog (5) resets connections under concurrent load
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class MockServer:
+    """
+    Mock server running in a background thread.
+
+    Example:
+        with MockServer(latency="uniform:0.05,0.2") as server:
+            client = Config.get_openai_client(api_key="mock", base_url=server.base_url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **settings):
+        """
+        Initialize mock server.
+
+        Args:
+            host: Interface to bind
+            port: Port (0 picks a free one)
+            **settings: MockState settings (latency, token_latency,
+                error_rate, error_status, reply_words, seed)
+        """
+        self.state = MockState(**settings)
+        handler = type("BoundMockHandler", (MockHandler,), {"state": self.state})
+        self.httpd = _ThreadingServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="mock-openai-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run an offline OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. lognormal:0.3,0.5")
+    parser.add_argument("--token-latency", default="fixed:0", help="Delay between stream chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--reply-words", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        token_latency=args.token_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        reply_words=args.reply_words,
+        seed=args.seed,
+    )
+    print(f"Mock OpenAI server on {server.base_url} (Ctrl+C to stop)")
+    print(f"  OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=mock")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
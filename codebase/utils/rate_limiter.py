@@ -0,0 +1,189 @@
+"""
+Client-side rate limiting for AI API calls.
+Token buckets for requests-per-minute and tokens-per-minute quotas.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Bucket that refills continuously up to ``capacity``"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Initialize token bucket.
+
+        Args:
+            capacity: Maximum burst size
+            refill_per_second: Refill rate
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.available = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self.available = min(self.capacity, self.available + elapsed * self.refill_per_second)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` is available (0 if it is now)"""
+        self._refill(now)
+        # A single request larger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_per_second
+
+    def take(self, amount: float):
+        """Remove ``amount`` (may go negative when correcting estimates)"""
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute limiter.
+
+    Call ``acquire()`` (or ``await acquire_async()``) before each API call.
+    One instance can be shared by threads and asyncio tasks alike: the
+    bucket state is guarded by a lock that is only held for bookkeeping,
+    never while waiting.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            requests_per_minute: Request quota (optional, unlimited if None)
+            tokens_per_minute: Token quota (optional, unlimited if None)
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60)
+            if requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+            if tokens_per_minute
+            else None
+        )
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take capacity if available; otherwise return seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.wait_time(1, now))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.wait_time(tokens, now))
+
+            if wait == 0.0:
+                if self.requests is not None:
+                    self.requests.take(1)
+                if self.tokens is not None and tokens:
+                    self.tokens.take(tokens)
+            return wait
+
+    def acquire(self, tokens: int = 0):
+        """
+        Block until one request and ``tokens`` tokens are available.
+
+        Args:
+            tokens: Estimated tokens for the request (prompt + max output)
+        """
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0):
+        """Asyncio version of acquire(); waits without blocking the loop"""
+        import asyncio
+
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Correct the token bucket once a request's real usage is known.
+
+        Args:
+            estimated_tokens: Tokens passed to acquire()
+            actual_tokens: Tokens the API reported using
+        """
+        if self.tokens is None:
+            return
+        with self._lock:
+            self.tokens._refill(time.monotonic())
+            delta = actual_tokens - estimated_tokens
+            self.tokens.available = min(self.tokens.capacity, self.tokens.available - delta)
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide limiter configured from Config.
+
+    Uses Config.REQUESTS_PER_MINUTE and Config.TOKENS_PER_MINUTE (0 means
+    unlimited).
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    global _shared_limiter
+
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            from .config import Config
+
+            _shared_limiter = RateLimiter(
+                requests_per_minute=Config.REQUESTS_PER_MINUTE or None,
+                tokens_per_minute=Config.TOKENS_PER_MINUTE or None,
+            )
+        return _shared_limiter
+
+
+# Example usage
+if __name__ == "__main__":
+    import asyncio
+
+    # 600 requests/minute: a burst of up to 600, then 10 requests/second
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=1_000_000)
+
+    start = time.perf_counter()
+    for _ in range(600):
+        limiter.acquire(tokens=500)
+    print(f"Burst of 600 requests: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for _ in range(20):
+        limiter.acquire(tokens=500)
+    print(f"Next 20 requests (threaded code): {time.perf_counter() - start:.2f}s")
+
+    async def worker():
+        for _ in range(5):
+            await limiter.acquire_async(tokens=500)
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(4)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    print(f"4 async workers x 5 requests, same limiter: {time.perf_counter() - start:.2f}s")
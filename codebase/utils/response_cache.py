@@ -0,0 +1,344 @@
+"""
+Response cache for chat completions.
+Exact-match, size-bounded LRU on disk (SQLite) with TTLs and hit/miss counters.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# Request arguments that don't change the response (left out of the key)
+TRANSPORT_ARGS = ("stream", "stream_options", "timeout", "extra_headers", "extra_query", "extra_body")
+
+
+def _jsonable(value):
+    """Convert SDK objects (e.g. assistant messages with tool calls) to plain data"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def cache_key(request: dict) -> str:
+    """
+    Canonical hash of a chat completion request.
+
+    Covers the model, messages, tools and every sampling parameter; key
+    order and whitespace don't matter.
+
+    Args:
+        request: Keyword arguments for chat.completions.create
+
+    Returns:
+        Hex digest
+    """
+    canonical = {k: _jsonable(v) for k, v in request.items() if k not in TRANSPORT_ARGS}
+    data = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=32).hexdigest()
+
+
+def is_deterministic(request: dict) -> bool:
+    """True for requests that should give the same answer every time"""
+    return (
+        request.get("temperature") == 0
+        and request.get("n", 1) == 1
+        and not request.get("stream")
+    )
+
+
+class ResponseCache:
+    """
+    Exact-match cache of chat completion responses.
+
+    By default only deterministic requests (temperature 0, single choice,
+    not streamed) are cached; pass ``cache_all=True`` to cache every
+    non-streamed request, or ``cache=True`` / ``cache=False`` on a single
+    call to override. Least recently used entries are evicted once the
+    stored responses exceed ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/responses.db",
+        max_bytes: int = 100 * 1024 * 1024,
+        ttl: Optional[float] = 7 * 86400,
+        cache_all: bool = False,
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            path: SQLite database file (":memory:" for a process-local cache)
+            max_bytes: Total size of stored responses before eviction
+            ttl: Seconds a response stays valid (None for no expiry)
+            cache_all: Also cache non-deterministic requests
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache_all = cache_all
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed);
+            """
+        )
+
+    def _total_size(self) -> int:
+        # Read from the DB each time: other processes may share the file
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def should_cache(self, request: dict) -> bool:
+        """Whether a request is eligible under this cache's policy"""
+        if request.get("stream") or request.get("n", 1) != 1:
+            return False
+        return self.cache_all or is_deterministic(request)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a stored response.
+
+        Args:
+            key: Key from cache_key()
+
+        Returns:
+            Response JSON, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, size, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                self.expirations += 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """
+        Store a response, evicting least recently used entries if needed.
+
+        Args:
+            key: Key from cache_key()
+            response: Response JSON
+        """
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            # Write lock up front so the total can't change under us
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, response, size, now, now),
+                )
+                total = self._total_size()
+
+                while total > self.max_bytes:
+                    rows = self.conn.execute(
+                        "SELECT key, size FROM responses WHERE key != ? ORDER BY accessed LIMIT 64",
+                        (key,),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    for old_key, old_size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        self.conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                        total -= old_size
+                        self.evictions += 1
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+
+    def create(self, client, cache: Optional[bool] = None, **request):
+        """
+        chat.completions.create with caching.
+
+        Args:
+            client: OpenAI client
+            cache: Force caching on or off for this call (optional)
+            **request: Arguments for chat.completions.create
+
+        Returns:
+            ChatCompletion (rebuilt from the cache on a hit)
+        """
+        use_cache = self.should_cache(request) if cache is None else cache and not request.get("stream")
+        if not use_cache:
+            return client.chat.completions.create(**request)
+
+        from openai.types.chat import ChatCompletion
+
+        key = cache_key(request)
+        stored = self.get(key)
+        if stored is not None:
+            return ChatCompletion.model_validate_json(stored)
+
+        response = client.chat.completions.create(**request)
+        self.put(key, response.model_dump_json())
+        return response
+
+    def wrap(self, client) -> "CachingClient":
+        """Wrap a client so its chat.completions.create uses this cache"""
+        return CachingClient(client, self)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": entries,
+                "bytes": size,
+            }
+
+    def clear(self):
+        """Remove every stored response"""
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class _CachingCompletions:
+    def __init__(self, completions, client, cache: ResponseCache):
+        self._completions = completions
+        self._client = client
+        self._cache = cache
+
+    def create(self, cache: Optional[bool] = None, **request):
+        return self._cache.create(self._client, cache=cache, **request)
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class _CachingChat:
+    def __init__(self, client, cache: ResponseCache):
+        self._chat = client.chat
+        self.completions = _CachingCompletions(client.chat.completions, client, cache)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class CachingClient:
+    """
+    Drop-in client wrapper: ``client.chat.completions.create`` goes through
+    the cache, everything else (embeddings, ...) goes to the real client.
+    """
+
+    def __init__(self, client, cache: ResponseCache):
+        self.client = client
+        self.cache = cache
+        self.chat = _CachingChat(client, cache)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the process-wide cache configured from Config.
+
+    Uses Config.RESPONSE_CACHE_PATH, RESPONSE_CACHE_MAX_MB and
+    RESPONSE_CACHE_TTL.
+
+    Returns:
+        Shared ResponseCache instance
+    """
+    global _shared_cache
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            from .config import Config
+
+            _shared_cache = ResponseCache(
+                path=Config.RESPONSE_CACHE_PATH,
+                max_bytes=int(Config.RESPONSE_CACHE_MAX_MB * 1024 * 1024),
+                ttl=Config.RESPONSE_CACHE_TTL or None,
+            )
+        return _shared_cache
+
+
+# Example usage
+if __name__ == "__main__":
+    from .config import Config
+    from .mock_server import MockServer
+
+    cache = ResponseCache(path=":memory:")
+
+    with MockServer(latency="fixed:0.05") as server:
+        client = cache.wrap(Config.get_openai_client(api_key="mock", base_url=server.base_url))
+        request = dict(
+            model="gpt-3.5-turbo",
+            temperature=0,
+            messages=[{"role": "user", "content": "What is the vacation policy?"}],
+        )
+
+        for attempt in range(3):
+            start = time.perf_counter()
+            response = client.chat.completions.create(**request)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Call {attempt + 1}: {elapsed:8.2f} ms - {response.choices[0].message.content[:40]}...")
+
+        # temperature 0.7 is not cached unless asked for
+        client.chat.completions.create(**{**request, "temperature": 0.7})
+
+    print(f"\nCache stats: {cache.stats()}")
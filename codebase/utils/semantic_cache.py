@@ -0,0 +1,256 @@
+"""
+Semantic response cache.
+Answers paraphrased questions from memory by nearest-neighbour search over
+question embeddings (needs numpy).
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+Embedder = Callable[[str], Sequence[float]]
+
+# Words that say little about what a question is asking
+STOPWORDS = frozenset(
+    "a an the is are was were be do does did i me my we our you your it its of to in on "
+    "for at by with about what how when where which who why can could should would will "
+    "tell please get".split()
+)
+
+
+@lru_cache(maxsize=65536)
+def _feature(token: str, dimensions: int):
+    """Bucket and sign for a hashed feature"""
+    h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+    return h % dimensions, 1.0 if (h >> 63) & 1 else -1.0
+
+
+class HashingEmbedder:
+    """
+    Offline embedder based on feature hashing.
+
+    Hashes content words and their character trigrams into a fixed-size
+    unit vector, so texts that share words (or word stems) score high.
+    Needs no network or model download; use it for tests and demos, and a
+    real embedding model for paraphrase-level matching.
+    """
+
+    def __init__(self, dimensions: int = 512, trigram_weight: float = 0.5):
+        """
+        Initialize embedder.
+
+        Args:
+            dimensions: Vector size
+            trigram_weight: Weight of character trigrams relative to words
+        """
+        self.dimensions = dimensions
+        self.trigram_weight = trigram_weight
+
+    def __call__(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        words = [w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+        for word in words:
+            index, sign = _feature(word, self.dimensions)
+            vector[index] += sign
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                index, sign = _feature(padded[i:i + 3], self.dimensions)
+                vector[index] += sign * self.trigram_weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class OpenAIEmbedder:
+    """Embed questions with the OpenAI embeddings API"""
+
+    def __init__(self, client=None, model: str = "text-embedding-3-small"):
+        """
+        Initialize embedder.
+
+        Args:
+            client: OpenAI client (defaults to the shared Config client)
+            model: Embedding model
+        """
+        if client is None:
+            from .config import Config
+
+            client = Config.get_openai_client()
+        self.client = client
+        self.model = model
+
+    def __call__(self, text: str) -> List[float]:
+        response = self.client.embeddings.create(model=self.model, input=text)
+        return response.data[0].embedding
+
+
+class SemanticCache:
+    """
+    In-memory cache of answers, looked up by question similarity.
+
+    Question vectors live in one preallocated matrix, so a lookup is a
+    single matrix-vector product over every cached question. When the cache
+    is full the least recently used entry's row is reused.
+
+    Cache answers that depend only on the question (e.g. RAG answers for a
+    fixed document set); keep one cache per prompt template or model.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[Embedder] = None,
+        threshold: float = 0.9,
+        max_entries: int = 1000,
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            embed: Function from text to vector (defaults to HashingEmbedder)
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Entries kept before LRU eviction
+        """
+        self.embed = embed or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._vectors = None  # (max_entries, dimensions), allocated on first put
+        self._entries = []  # row -> (question, answer)
+        self._lru = OrderedDict()  # row -> None, least recently used first
+
+    def _normalize(self, question: str, vector: Optional[Sequence[float]]) -> np.ndarray:
+        vector = np.asarray(self.embed(question) if vector is None else vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _nearest(self, vector: np.ndarray):
+        """Best row and its similarity, or (None, 0.0) when empty"""
+        if not self._entries:
+            return None, 0.0
+        scores = self._vectors[: len(self._entries)] @ vector
+        row = int(np.argmax(scores))
+        return row, float(scores[row])
+
+    def lookup(self, question: str, vector: Optional[Sequence[float]] = None):
+        """
+        Find the closest cached question.
+
+        Args:
+            question: Incoming question
+            vector: Its embedding, if already computed (skips embed())
+
+        Returns:
+            (answer, matched question, similarity), or None on a miss
+        """
+        vector = self._normalize(question, vector)
+        with self._lock:
+            row, similarity = self._nearest(vector)
+            if row is None or similarity < self.threshold:
+                self.misses += 1
+                return None
+            self._lru.move_to_end(row)
+            self.hits += 1
+            cached_question, answer = self._entries[row]
+            return answer, cached_question, similarity
+
+    def get(self, question: str, vector: Optional[Sequence[float]] = None) -> Optional[str]:
+        """
+        Cached answer for a question or a close paraphrase.
+
+        Args:
+            question: Incoming question
+            vector: Its embedding, if already computed (skips embed())
+
+        Returns:
+            Answer, or None on a miss
+        """
+        match = self.lookup(question, vector)
+        return match[0] if match else None
+
+    def put(self, question: str, answer: str, vector: Optional[Sequence[float]] = None):
+        """
+        Cache an answer.
+
+        Args:
+            question: Question that was answered
+            answer: The answer
+            vector: Question embedding, if already computed (skips embed())
+        """
+        vector = self._normalize(question, vector)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            row, similarity = self._nearest(vector)
+            if row is None or similarity < 0.999:
+                if len(self._entries) < self.max_entries:
+                    row = len(self._entries)
+                    self._entries.append(None)
+                else:
+                    row, _ = self._lru.popitem(last=False)
+                    self.evictions += 1
+
+            self._vectors[row] = vector
+            self._entries[row] = (question, answer)
+            self._lru[row] = None
+            self._lru.move_to_end(row)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
+
+    def clear(self):
+        """Remove every cached answer"""
+        with self._lock:
+            self._entries.clear()
+            self._lru.clear()
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    cache = SemanticCache(threshold=0.5)
+    cache.put("What is the vacation policy?", "20 days of paid vacation per year.")
+    cache.put("How many days can I work from home?", "Up to 3 days per week.")
+
+    for question in [
+        "what's the vacation policy",
+        "How many vacation days do I get?",
+        "Can I work from home on Fridays?",
+        "Tell me about health insurance",
+    ]:
+        match = cache.lookup(question)
+        if match:
+            answer, matched, similarity = match
+            print(f"HIT  {question!r} ~ {matched!r} ({similarity:.2f}): {answer}")
+        else:
+            print(f"MISS {question!r}")
+
+    # Lookup cost with a full cache
+    big = SemanticCache(threshold=0.9, max_entries=5000)
+    for i in range(5000):
+        big.put(f"question number {i} about topic {i % 97}", f"answer {i}")
+    start = time.perf_counter()
+    for i in range(100):
+        big.get(f"question about topic {i}")
+    print(f"\nLookup over {big.stats()['entries']:,} entries: "
+          f"{(time.perf_counter() - start) * 10:.2f} ms")
+    print(f"Stats: {big.stats()}")
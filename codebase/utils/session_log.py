@@ -0,0 +1,297 @@
+"""
+Append-only conversation log, one JSON record per line.
+Every turn is written as it happens, so a crash loses at most the turns
+since the last fsync, and a session can be resumed by replaying its log.
+"""
+
+import gzip
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+def _session_path(directory: str, session_id: str, compress: bool) -> Path:
+    return Path(directory) / (f"{session_id}.jsonl.gz" if compress else f"{session_id}.jsonl")
+
+
+def find_session(session_id: str, directory: str = "sessions") -> Path:
+    """
+    Locate a session's log, compressed or not.
+
+    Args:
+        session_id: Session to find
+        directory: Directory holding session logs
+
+    Returns:
+        Path to the log
+
+    Raises:
+        FileNotFoundError: If there is no log for the session
+    """
+    for compress in (False, True):
+        path = _session_path(directory, session_id, compress)
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"No session '{session_id}' in {directory}/")
+
+
+class SessionLog:
+    """
+    Per-session JSONL log of messages and usage.
+
+    Records are flushed to the OS on every write, but fsync (the expensive
+    part) is batched: it runs once ``fsync_every`` records are pending or
+    ``fsync_interval`` seconds have passed, and on close.
+
+    Record types:
+        {"type": "session", "started": ...}
+        {"type": "message", "message": {...}, "tokens": n}
+        {"type": "pop"}                  # last message removed
+        {"type": "truncate", "max_tokens": n}
+        {"type": "compact", "start": i, "end": j, "message": {...}, "tokens": n}
+        {"type": "usage", "model": ..., "input_tokens": n, "output_tokens": n, "cost": x}
+    """
+
+    def __init__(
+        self,
+        session_id: Optional[str] = None,
+        directory: str = "sessions",
+        compress: bool = False,
+        fsync_every: int = 8,
+        fsync_interval: float = 1.0,
+    ):
+        """
+        Open (or create) a session log for appending.
+
+        Args:
+            session_id: Session name (defaults to a timestamp); an existing
+                session's log is appended to
+            directory: Directory for session logs
+            compress: Write ``.jsonl.gz`` (ignored when resuming an existing log)
+            fsync_every: Records written between fsyncs
+            fsync_interval: Maximum seconds between fsyncs
+        """
+        self.session_id = session_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        try:
+            self.path = find_session(self.session_id, directory)
+        except FileNotFoundError:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self.path = _session_path(directory, self.session_id, compress)
+
+        self.compressed = self.path.suffix == ".gz"
+        is_new = not self.path.exists()
+        if not is_new:
+            self._repair()
+        # gzip appends a new member per open; readers see one continuous stream
+        self._file = gzip.open(self.path, "ab") if self.compressed else open(self.path, "ab")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        if is_new:
+            self.write({"type": "session", "started": datetime.now().isoformat()})
+
+    def _repair(self):
+        """Drop a torn last record left by a crash, so appends start clean"""
+        if self.compressed:
+            lines = []
+            try:
+                with gzip.open(self.path, "rb") as f:
+                    for line in f:
+                        lines.append(line)
+                return
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                pass
+            # Recompress everything readable (a torn member can't be appended to)
+            temp = self.path.with_name(self.path.name + ".tmp")
+            with gzip.open(temp, "wb") as f:
+                f.writelines(line for line in lines if line.endswith(b"\n"))
+            os.replace(temp, self.path)
+            return
+
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            # Scan back to the end of the last complete line
+            while end > 0:
+                start = max(end - 4096, 0)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(start + newline + 1)
+                    return
+                end = start
+            f.truncate(0)
+
+    def write(self, record: dict):
+        """Append one record"""
+        self._file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._file.flush()
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def message(self, message: dict, tokens: Optional[int] = None):
+        """Log a message added to the conversation"""
+        record = {"type": "message", "message": dict(message)}
+        if tokens is not None:
+            record["tokens"] = tokens
+        self.write(record)
+
+    def pop(self):
+        """Log that the last message was removed"""
+        self.write({"type": "pop"})
+
+    def truncate(self, max_tokens: int):
+        """Log a truncate_to_tokens call that dropped messages"""
+        self.write({"type": "truncate", "max_tokens": max_tokens})
+
+    def compact(self, start: int, end: int, message: dict, tokens: int):
+        """Log that messages[start:end] were replaced by a summary message"""
+        self.write(
+            {"type": "compact", "start": start, "end": end, "message": dict(message), "tokens": tokens}
+        )
+
+    def usage(self, model: str, input_tokens: int, output_tokens: int, cost: float):
+        """Log the usage and cost of a request"""
+        self.write(
+            {
+                "type": "usage",
+                "model": model,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost": cost,
+            }
+        )
+
+    def sync(self):
+        """Force written records to disk"""
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Sync and close the log"""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def read(session_id: str, directory: str = "sessions") -> Iterator[dict]:
+        """
+        Stream a session's records.
+
+        Skips a torn last line and stops quietly at a truncated gzip
+        stream, which is what a crash mid-write leaves behind.
+
+        Args:
+            session_id: Session to read
+            directory: Directory holding session logs
+
+        Yields:
+            Records in the order they were written
+        """
+        path = find_session(session_id, directory)
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as f:
+            try:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                return
+
+    @classmethod
+    def restore(cls, session_id: str, conversation, directory: str = "sessions") -> dict:
+        """
+        Rebuild a conversation and its running totals from a session log.
+
+        Messages are appended with their logged token counts, so nothing
+        is re-tokenized.
+
+        Args:
+            session_id: Session to replay
+            conversation: Empty Conversation to fill
+            directory: Directory holding session logs
+
+        Returns:
+            Totals: started, requests, input_tokens, output_tokens, cost
+        """
+        totals = {"started": None, "requests": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+
+        for record in cls.read(session_id, directory):
+            kind = record.get("type")
+            if kind == "message":
+                conversation.append(record["message"], record.get("tokens"))
+            elif kind == "pop":
+                conversation.pop()
+            elif kind == "truncate":
+                conversation.truncate_to_tokens(record["max_tokens"])
+            elif kind == "compact":
+                conversation.replace(
+                    record["start"], record["end"], record["message"], record["tokens"]
+                )
+            elif kind == "usage":
+                totals["requests"] += 1
+                totals["input_tokens"] += record["input_tokens"]
+                totals["output_tokens"] += record["output_tokens"]
+                totals["cost"] += record["cost"]
+            elif kind == "session":
+                totals["started"] = record["started"]
+
+        return totals
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    from .conversation import Conversation
+
+    directory = tempfile.mkdtemp()
+
+    for compress in (False, True):
+        conversation = Conversation([{"role": "system", "content": "You are helpful"}])
+        with SessionLog("demo", directory, compress=compress) as log:
+            log.message(conversation[0], conversation.token_counts[0])
+            start = time.perf_counter()
+            for i in range(500):
+                tokens = conversation.add("user", f"Message {i}")
+                log.message(conversation[-1], tokens)
+                tokens = conversation.add("assistant", f"Reply {i}")
+                log.message(conversation[-1], tokens)
+                log.usage("gpt-3.5-turbo", conversation.prompt_tokens, tokens, 0.0001)
+            elapsed = time.perf_counter() - start
+            path = log.path
+
+        restored = Conversation()
+        start = time.perf_counter()
+        totals = SessionLog.restore("demo", restored, directory)
+        print(f"{path.name}: {path.stat().st_size:,} bytes, "
+              f"written in {elapsed * 1000:.1f} ms, restored in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+        print(f"  {len(restored)} messages, {restored.total_tokens:,} tokens, "
+              f"{totals['requests']} requests, ${totals['cost']:.4f}")
+        os.remove(path)
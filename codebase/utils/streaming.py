@@ -0,0 +1,155 @@
+"""
+Streaming chat completions for AI Workshop projects.
+Yields text as it arrives and measures time-to-first-token and throughput.
+"""
+
+import time
+from typing import Iterator, List, Optional
+
+from .helpers import count_tokens
+
+
+class ChatStream:
+    """
+    A streamed chat completion.
+
+    Iterate over it to get text deltas as the model produces them. The
+    deltas are collected in a list and joined once, so building the full
+    reply stays linear in its length. After iteration, ``text`` holds the
+    reply and the timing attributes are filled in.
+
+    Attributes:
+        text: Full reply text (complete once iteration finishes)
+        time_to_first_token: Seconds from the request to the first text
+        total_time: Seconds from the request to the last chunk
+        output_tokens: Reply tokens (from the API's usage when available)
+        usage: Usage object from the final chunk, if the API sent one
+        finish_reason: Why the model stopped ("stop", "length", ...)
+    """
+
+    def __init__(
+        self,
+        client,
+        messages: List[dict],
+        model: str = "gpt-3.5-turbo",
+        include_usage: bool = True,
+        **kwargs,
+    ):
+        """
+        Start a streamed chat completion.
+
+        Args:
+            client: OpenAI client
+            messages: Chat messages
+            model: Model name
+            include_usage: Ask the API for token usage in the final chunk
+            **kwargs: Other arguments for chat.completions.create
+                (temperature, max_tokens, ...)
+        """
+        self.model = model
+        self.time_to_first_token = None
+        self.total_time = None
+        self.usage = None
+        self.finish_reason = None
+        self._parts = []
+        self._text = None
+
+        if include_usage:
+            kwargs["stream_options"] = {"include_usage": True}
+
+        self._start = time.perf_counter()
+        self._response = client.chat.completions.create(
+            model=model, messages=messages, stream=True, **kwargs
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._response:
+            if chunk.usage is not None:
+                self.usage = chunk.usage
+            if not chunk.choices:
+                continue
+
+            choice = chunk.choices[0]
+            if choice.finish_reason is not None:
+                self.finish_reason = choice.finish_reason
+
+            delta = choice.delta.content
+            if delta:
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - self._start
+                self._parts.append(delta)
+                yield delta
+
+        self.total_time = time.perf_counter() - self._start
+        self._text = "".join(self._parts)
+
+    @property
+    def text(self) -> str:
+        """Reply text (received so far, if the stream is still running)"""
+        if self._text is not None:
+            return self._text
+        return "".join(self._parts)
+
+    @property
+    def output_tokens(self) -> int:
+        """Reply tokens, counted locally if the API did not report usage"""
+        if self.usage is not None:
+            return self.usage.completion_tokens
+        return count_tokens(self.text, self.model)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation speed after the first token"""
+        if self.total_time is None or self.time_to_first_token is None:
+            return None
+        generating = self.total_time - self.time_to_first_token
+        if generating <= 0:
+            return None
+        return self.output_tokens / generating
+
+    def stats(self) -> str:
+        """One-line summary of the stream's timing"""
+        if self.time_to_first_token is None:
+            return "No output"
+        speed = self.tokens_per_second
+        speed = f"{speed:.0f} tok/s" if speed is not None else "n/a"
+        return (
+            f"TTFT: {self.time_to_first_token * 1000:.0f}ms | "
+            f"Total: {self.total_time:.2f}s | Speed: {speed}"
+        )
+
+
+def stream_chat(client, messages: List[dict], model: str = "gpt-3.5-turbo", **kwargs) -> ChatStream:
+    """
+    Stream a chat completion.
+
+    Example:
+        stream = stream_chat(client, messages)
+        reply = streaming_print(stream)
+        print(stream.stats())
+
+    Args:
+        client: OpenAI client
+        messages: Chat messages
+        model: Model name
+        **kwargs: Other arguments for chat.completions.create
+
+    Returns:
+        ChatStream to iterate over
+    """
+    return ChatStream(client, messages, model=model, **kwargs)
+
+
+# Example usage
+if __name__ == "__main__":
+    from .config import Config
+    from .helpers import streaming_print
+
+    client = Config.get_openai_client()
+    stream = stream_chat(
+        client,
+        [{"role": "user", "content": "Write a haiku about streaming."}],
+        max_tokens=100,
+    )
+    streaming_print(stream)
+    print(stream.stats())
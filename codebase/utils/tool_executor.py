@@ -0,0 +1,144 @@
+"""
+Run the tool calls from one assistant message concurrently.
+Results come back as tool messages in the original tool_call order.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Callable, Dict, List, Mapping, Optional
+
+
+def _call_fields(tool_call):
+    """(id, function name, arguments JSON) from an SDK object or a dict"""
+    if isinstance(tool_call, dict):
+        function = tool_call["function"]
+        return tool_call["id"], function["name"], function.get("arguments") or "{}"
+    return tool_call.id, tool_call.function.name, tool_call.function.arguments or "{}"
+
+
+class ToolExecutor:
+    """
+    Executes tool calls on a thread pool with per-tool timeouts.
+
+    All calls from one assistant message start together, so three slow
+    tools take as long as the slowest one rather than the sum. A call that
+    misses its deadline is reported to the model as an error; calls still
+    queued are cancelled, while one already running finishes in the
+    background and its result is discarded (Python threads can't be
+    stopped). Errors never raise: they become the tool message's content,
+    so the model can explain or retry.
+    """
+
+    def __init__(
+        self,
+        functions: Mapping[str, Callable[..., object]],
+        timeout: float = 10.0,
+        timeouts: Optional[Dict[str, float]] = None,
+        max_workers: int = 8,
+    ):
+        """
+        Initialize tool executor.
+
+        Args:
+            functions: Tool name -> function called with the parsed arguments
+                (a ToolRegistry also works)
+            timeout: Seconds a tool may run by default
+            timeouts: Per-tool overrides, e.g. ``{"search_information": 30}``
+            max_workers: Tool calls running at once
+        """
+        self.functions = functions
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.max_workers = max_workers
+        self._pool = None
+
+    def _run_one(self, name: str, arguments: str) -> str:
+        function = self.functions.get(name)
+        if function is None:
+            return f"Error: Unknown function {name}"
+        try:
+            kwargs = json.loads(arguments)
+        except json.JSONDecodeError as e:
+            return f"Error: Invalid arguments for {name}: {e}"
+        try:
+            result = function(**kwargs)
+        except Exception as e:
+            return f"Error: {type(e).__name__}: {e}"
+        return result if isinstance(result, str) else json.dumps(result, default=str)
+
+    def run(self, tool_calls) -> List[dict]:
+        """
+        Execute tool calls concurrently.
+
+        Args:
+            tool_calls: ``message.tool_calls`` from a chat completion
+
+        Returns:
+            Tool messages, one per call, in the same order as ``tool_calls``
+        """
+        calls = [_call_fields(tool_call) for tool_call in tool_calls]
+        if not calls:
+            return []
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="tool"
+            )
+
+        start = time.monotonic()
+        futures = [self._pool.submit(self._run_one, name, arguments) for _, name, arguments in calls]
+
+        results = []
+        for (call_id, name, _), future in zip(calls, futures):
+            timeout = self.timeouts.get(name, self.timeout)
+            remaining = start + timeout - time.monotonic()
+            try:
+                content = future.result(timeout=max(remaining, 0))
+            except TimeoutError:
+                future.cancel()
+                content = f"Error: {name} timed out after {timeout:g}s"
+            results.append(
+                {"role": "tool", "tool_call_id": call_id, "name": name, "content": content}
+            )
+        return results
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker threads (tools still running are abandoned)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+# Example usage
+if __name__ == "__main__":
+
+    def slow_lookup(city: str) -> str:
+        time.sleep(1.0)
+        return f"Sunny in {city}"
+
+    def stuck(query: str) -> str:
+        time.sleep(5.0)
+        return "never seen"
+
+    calls = [
+        {"id": f"call_{i}", "type": "function",
+         "function": {"name": "slow_lookup", "arguments": json.dumps({"city": city})}}
+        for i, city in enumerate(["Delhi", "Mumbai", "Chennai"])
+    ]
+    calls.append({"id": "call_3", "type": "function",
+                  "function": {"name": "stuck", "arguments": '{"query": "x"}'}})
+    calls.append({"id": "call_4", "type": "function",
+                  "function": {"name": "missing", "arguments": "{}"}})
+
+    with ToolExecutor({"slow_lookup": slow_lookup, "stuck": stuck}, timeout=1.5) as executor:
+        start = time.perf_counter()
+        for message in executor.run(calls):
+            print(f"{message['tool_call_id']}: {message['content']}")
+        print(f"\n5 tool calls (3 x 1s, one stuck) in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,428 @@
+"""
+Decorator-based registry for function-calling tools.
+Builds each tool's JSON schema and argument validator once from its type
+hints and docstring, dispatches calls and picks the tools relevant to a message.
+"""
+
+import enum
+import inspect
+import json
+import math
+import re
+import typing
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Words that say nothing about which tool is meant
+_STOPWORDS = frozenset(
+    "a an and are can for from get give how i in is it me my of on or please "
+    "show tell the this to what whats when where which with you your".split()
+)
+
+
+class ToolArgumentError(ValueError):
+    """Raised when a tool call's arguments don't match the tool's schema"""
+
+
+def _terms(text: str) -> set:
+    """Lowercase words (first 5 letters, so "calculate" matches "calculation")"""
+    return {
+        word[:5] for word in _WORD.findall(text.lower().replace("_", " "))
+        if word not in _STOPWORDS
+    }
+
+
+def _param_docs(docstring: str) -> Dict[str, str]:
+    """Parameter descriptions from a Google-style "Args:" section"""
+    docs = {}
+    in_args = False
+    for line in docstring.splitlines():
+        stripped = line.strip()
+        if stripped in ("Args:", "Arguments:", "Parameters:"):
+            in_args = True
+        elif in_args:
+            match = re.match(r"(\w+)(?:\s*\(.*?\))?:\s*(.*)", stripped)
+            if match:
+                docs[match.group(1)] = match.group(2)
+            elif stripped.endswith(":") or not stripped:
+                in_args = False  # Returns:, Raises: or end of section
+    return docs
+
+
+def _type_schema(annotation) -> dict:
+    """JSON schema for a type hint"""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is Union:
+        # Optional[X] -> X; the parameter is made optional by its default
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            return _type_schema(options[0])
+        return {"anyOf": [_type_schema(arg) for arg in options]}
+    if origin is typing.Literal:
+        return {"type": _type_schema(type(args[0]))["type"], "enum": list(args)}
+    if origin in (list, tuple, set, frozenset):
+        schema = {"type": "array"}
+        if args and args[0] is not Ellipsis:
+            schema["items"] = _type_schema(args[0])
+        return schema
+    if origin is dict or annotation is dict:
+        return {"type": "object"}
+    if inspect.isclass(annotation) and issubclass(annotation, enum.Enum):
+        return {"type": "string", "enum": [member.value for member in annotation]}
+    if annotation in (list, tuple, set, frozenset):
+        return {"type": "array"}
+
+    types = {str: "string", bool: "boolean", int: "integer", float: "number"}
+    if annotation not in types:
+        raise TypeError(f"Unsupported tool parameter type: {annotation!r}")
+    return {"type": types[annotation]}
+
+
+def _compile_check(schema: dict) -> Callable[[object], bool]:
+    """Turn a parameter schema into a fast isinstance-style check"""
+    if "anyOf" in schema:
+        checks = [_compile_check(option) for option in schema["anyOf"]]
+        return lambda value: any(check(value) for check in checks)
+    if "enum" in schema:
+        allowed = frozenset(schema["enum"])
+        return lambda value: value in allowed
+
+    kind = schema["type"]
+    if kind == "string":
+        return lambda value: isinstance(value, str)
+    if kind == "boolean":
+        return lambda value: isinstance(value, bool)
+    if kind == "integer":
+        return lambda value: isinstance(value, int) and not isinstance(value, bool)
+    if kind == "number":
+        return lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind == "object":
+        return lambda value: isinstance(value, dict)
+    if "items" in schema:
+        item_check = _compile_check(schema["items"])
+        return lambda value: isinstance(value, list) and all(item_check(v) for v in value)
+    return lambda value: isinstance(value, list)
+
+
+class Tool:
+    """
+    A registered function with its schema and argument validator.
+
+    Calling a Tool validates the keyword arguments before calling the
+    function, so it can be used anywhere a plain function map is expected
+    (e.g. ToolExecutor).
+    """
+
+    def __init__(
+        self,
+        function: Callable[..., object],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        timeout: Optional[float] = None,
+        tags: Iterable[str] = (),
+    ):
+        """
+        Initialize tool.
+
+        Args:
+            function: Function with type-hinted parameters
+            name: Tool name (default: the function name)
+            description: Tool description (default: docstring summary)
+            timeout: Seconds the tool may run (default: the executor's)
+            tags: Labels for selecting groups of tools
+        """
+        self.function = function
+        self.name = name or function.__name__
+        self.timeout = timeout
+        self.tags = frozenset(tags)
+
+        docstring = inspect.getdoc(function) or ""
+        self.description = description or docstring.split("\n\n")[0].replace("\n", " ")
+        param_docs = _param_docs(docstring)
+        hints = typing.get_type_hints(function)
+
+        properties = {}
+        required = []
+        self._checks = {}
+        for param in inspect.signature(function).parameters.values():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            schema = _type_schema(hints.get(param.name, str))
+            if param.name in param_docs:
+                schema["description"] = param_docs[param.name]
+            properties[param.name] = schema
+            self._checks[param.name] = (_compile_check(schema), schema)
+            if param.default is param.empty:
+                required.append(param.name)
+        self._required = tuple(required)
+
+        parameters = {"type": "object", "properties": properties}
+        if required:
+            parameters["required"] = required
+        self.schema = {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": parameters},
+        }
+
+        # Words a user might use when they want this tool
+        self.terms = _terms(" ".join(
+            [self.name, self.description, *self.tags]
+            + [schema.get("description", "") for schema in properties.values()]
+        ))
+
+    def validate(self, arguments: dict) -> dict:
+        """
+        Check arguments against the schema.
+
+        Args:
+            arguments: Parsed arguments from the model
+
+        Returns:
+            The arguments, unchanged
+
+        Raises:
+            ToolArgumentError: Missing, unexpected or wrongly typed arguments
+        """
+        if not isinstance(arguments, dict):
+            raise ToolArgumentError(f"{self.name} expects a JSON object of arguments")
+        missing = [name for name in self._required if name not in arguments]
+        if missing:
+            raise ToolArgumentError(f"{self.name} is missing {', '.join(missing)}")
+        for name, value in arguments.items():
+            entry = self._checks.get(name)
+            if entry is None:
+                raise ToolArgumentError(f"{self.name} has no parameter {name!r}")
+            check, schema = entry
+            if value is None and name not in self._required:
+                continue  # Optional argument left unset
+            if not check(value):
+                expected = schema.get("enum") or schema.get("type", "a valid value")
+                raise ToolArgumentError(f"{self.name}: {name} must be {expected}, got {value!r}")
+        return arguments
+
+    def __call__(self, **kwargs):
+        return self.function(**self.validate(kwargs))
+
+    def __repr__(self) -> str:
+        return f"Tool({self.name!r})"
+
+
+class ToolRegistry(Mapping):
+    """
+    Tools registered with the ``@registry.tool`` decorator.
+
+    Schemas are generated once at registration and handed out as-is on
+    every request. The registry is a mapping of name -> Tool, so it can be
+    passed straight to ToolExecutor. ``relevant()`` picks the few tools a
+    message is likely to need, so a registry of dozens of tools doesn't
+    put every schema in every prompt.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+        # frozenset of names (or None for all) -> schema list; only for
+        # schemas() calls, whose subsets are few and fixed in the code
+        self._schemas = {}
+        self._idf = None
+
+    def tool(self, function=None, **options):
+        """
+        Register a function as a tool (usable as ``@tool`` or ``@tool(...)``).
+
+        Args:
+            function: Function to register
+            **options: name, description, timeout or tags (see Tool)
+
+        Returns:
+            The function, unchanged
+        """
+        def register(function):
+            self.add(Tool(function, **options))
+            return function
+
+        return register(function) if function is not None else register
+
+    def add(self, tool: Tool):
+        """Register an already built Tool"""
+        self._tools[tool.name] = tool
+        self._schemas.clear()
+        self._idf = None
+
+    def __getitem__(self, name: str) -> Tool:
+        return self._tools[name]
+
+    def __iter__(self):
+        return iter(self._tools)
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    @property
+    def timeouts(self) -> Dict[str, float]:
+        """Per-tool timeouts, for ToolExecutor(timeouts=...)"""
+        return {name: t.timeout for name, t in self._tools.items() if t.timeout is not None}
+
+    def schemas(self, names: Optional[Iterable[str]] = None, tags: Iterable[str] = ()) -> List[dict]:
+        """
+        Tool schemas for the ``tools`` request parameter.
+
+        Args:
+            names: Only these tools (default: all)
+            tags: Only tools with at least one of these tags
+
+        Returns:
+            Cached schema list (don't modify it)
+        """
+        if names is None and tags:
+            names = [name for name, t in self._tools.items() if t.tags & set(tags)]
+        key = None if names is None else frozenset(names)
+        schemas = self._schemas.get(key)
+        if schemas is None:
+            schemas = self._schemas[key] = self._select(key)
+        return schemas
+
+    def _select(self, names: Optional[frozenset]) -> List[dict]:
+        """Schemas of the named tools (all if None), in registration order"""
+        return [t.schema for name, t in self._tools.items() if names is None or name in names]
+
+    def relevant(self, text: str, limit: int = 8, always: Iterable[str] = ()) -> List[dict]:
+        """
+        Schemas of the tools that best match a message.
+
+        Tools are ranked by the words they share with the text, rarer words
+        counting more. With no match at all every tool is offered, so the
+        model is never left without the tool it needs.
+
+        Args:
+            text: The user's message
+            limit: Most tools to offer
+            always: Tools to include regardless of score
+
+        Returns:
+            Schema list for the request
+        """
+        if len(self._tools) <= limit:
+            return self.schemas()
+
+        if self._idf is None:
+            counts = {}
+            for t in self._tools.values():
+                for term in t.terms:
+                    counts[term] = counts.get(term, 0) + 1
+            self._idf = {term: math.log(1 + len(self._tools) / n) for term, n in counts.items()}
+
+        words = _terms(text)
+        scores = {}
+        for name, t in self._tools.items():
+            score = sum(self._idf[term] for term in words & t.terms)
+            if score > 0:
+                scores[name] = score
+        if not scores:
+            return self.schemas()
+
+        chosen = list(always)
+        for name in sorted(scores, key=scores.get, reverse=True):
+            if len(chosen) >= limit:
+                break
+            if name not in chosen:
+                chosen.append(name)
+        # Not cached: the subsets differ per message and would pile up
+        return self._select(frozenset(chosen))
+
+    def parse_arguments(self, name: str, arguments: Union[str, dict, None]) -> dict:
+        """
+        Parse and validate one tool call's arguments.
+
+        Args:
+            name: Tool name
+            arguments: JSON string (as sent by the model) or dict
+
+        Returns:
+            The validated arguments
+
+        Raises:
+            KeyError: Unknown tool
+            ToolArgumentError: Invalid JSON or arguments
+        """
+        tool = self._tools[name]
+        if isinstance(arguments, str) or arguments is None:
+            try:
+                arguments = json.loads(arguments or "{}")
+            except json.JSONDecodeError as e:
+                raise ToolArgumentError(f"Invalid arguments for {name}: {e}") from e
+        return tool.validate(arguments)
+
+    def dispatch(self, name: str, arguments: Union[str, dict, None]):
+        """
+        Validate and run one tool call.
+
+        Args:
+            name: Tool name
+            arguments: JSON string (as sent by the model) or dict
+
+        Returns:
+            The tool's return value
+
+        Raises:
+            KeyError: Unknown tool
+            ToolArgumentError: Invalid JSON or arguments
+        """
+        return self._tools[name].function(**self.parse_arguments(name, arguments))
+
+    def executor(self, timeout: float = 10.0, max_workers: int = 8):
+        """
+        ToolExecutor that runs this registry's tools in parallel.
+
+        Args:
+            timeout: Default seconds per tool (tools may set their own)
+            max_workers: Tool calls running at once
+
+        Returns:
+            ToolExecutor
+        """
+        from .tool_executor import ToolExecutor
+
+        return ToolExecutor(self, timeout=timeout, timeouts=self.timeouts, max_workers=max_workers)
+
+
+# Example usage
+if __name__ == "__main__":
+    from typing import Literal
+
+    registry = ToolRegistry()
+
+    @registry.tool
+    def get_weather(location: str, unit: Literal["celsius", "fahrenheit"] = "celsius") -> str:
+        """
+        Get the current weather for a city.
+
+        Args:
+            location: City name, e.g. Delhi
+            unit: Temperature unit
+        """
+        return f"Sunny, 28° {unit} in {location}"
+
+    @registry.tool(tags=["math"], timeout=2)
+    def calculate(expression: str, precision: int = 2) -> str:
+        """Evaluate a math expression such as '847 * 923'."""
+        return f"{expression} = ..."
+
+    for i in range(30):
+        registry.add(Tool(lambda: "", name=f"crm_lookup_{i}",
+                          description=f"Look up customer record field {i}"))
+
+    print(json.dumps(registry["get_weather"].schema, indent=2))
+    print(registry.dispatch("get_weather", '{"location": "Delhi"}'))
+    for bad in ['{"unit": "celsius"}', '{"location": 5}', '{"location": "x", "unit": "kelvin"}']:
+        try:
+            registry.dispatch("get_weather", bad)
+        except ToolArgumentError as e:
+            print(f"Rejected: {e}")
+
+    for text in ["What's the weather in Mumbai?", "Calculate 847 * 923", "Hello!"]:
+        chosen = [s["function"]["name"] for s in registry.relevant(text, limit=3)]
+        print(f"{text!r}: {len(chosen)} of {len(registry)} tools {chosen[:3]}")